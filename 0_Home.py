@@ -1,5 +1,9 @@
+import logging
+import threading
 import streamlit as st
 
+logger = logging.getLogger(__name__)
+
 st.set_page_config(page_title="Macro Economic Analytics Prototype", layout="wide")
 
 st.title("Macro Economic Analytics Prototype")
@@ -18,8 +22,28 @@ Navigate to Explore Data to start.
 """)
 
 @st.cache_resource
-def init_rag():
-    from rag.ingest import ingest_rag_data
-    ingest_rag_data()  # Builds vectorstore on first run
-
-init_rag()
+def init_rag() -> dict:
+    # Background thread so the landing page doesn't wait on langchain/Chroma imports. It outlives any one
+    # session and has no script context, so it reports through this shared status (and logging), not st.*.
+    status = {"state": "running", "failures": {}}
+
+    def _ingest():
+        try:
+            from rag.ingest import ingest_rag_data
+            status["failures"] = ingest_rag_data()  # Builds vectorstore on first run
+        except Exception as e:
+            logger.exception("RAG ingestion failed")
+            status["failures"] = {"ingestion": str(e)}
+        else:
+            for unit, error in status["failures"].items():
+                logger.warning("RAG ingestion of %s failed: %s", unit, error)
+        status["state"] = "done"
+    threading.Thread(target=_ingest, daemon=True).start()
+    return status
+
+rag_status = init_rag()
+if rag_status["state"] == "running":
+    st.caption("Building the AI metadata index in the background...")
+elif rag_status["failures"]:
+    st.warning("AI metadata index is incomplete—answers may lack some grounding. "
+               + "; ".join(f"{unit}: {error}" for unit, error in rag_status["failures"].items()))
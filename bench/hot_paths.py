@@ -0,0 +1,196 @@
+"""Hot-path benchmarks: parse -> cache read -> align -> analyze, on synthetic data.
+
+Generates FRED/BLS/Treasury payloads in the APIs' own shapes (utils/synthetic.py) at several sizes,
+times JSON parsing, store/memo reads, Explore-page alignment, every public function in
+utils/analytics.py and RAG retrieval, and records tracemalloc peak memory per case. Prints JSON;
+use --output to save it and diff runs to catch regressions.
+
+    python bench/hot_paths.py --sizes small,medium --repeat 5 --output hot_paths.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+warnings.filterwarnings("ignore")
+
+import numpy as np
+import pandas as pd
+
+from config.settings import CHART_MAX_POINTS
+from utils import analytics, memo, store, synthetic
+from utils.alignment import align_frames
+from utils.downsample import downsample
+from utils.bls_api import _parse_bls_response
+from utils.fred_api import PAGE_LIMIT, _parse_observations
+from utils.treasury_api import FISCALDATA_DATASETS, _parse_page
+
+# daily: one Treasury-style business-daily series (ns timestamps cap the span at ~290 years, ~75k business days)
+# panel_*: many aligned monthly series; daily_panel_*: many daily series to align (millions of points)
+SIZES = {
+    "small": {"daily": 500, "monthly": 300, "quarterly": 100, "panel_series": 5, "panel_rows": 300,
+              "bls_series": 5, "daily_panel_series": 5, "daily_panel_rows": 500},
+    "medium": {"daily": 10_000, "monthly": 600, "quarterly": 200, "panel_series": 50, "panel_rows": 600,
+               "bls_series": 50, "daily_panel_series": 20, "daily_panel_rows": 5_000},
+    "large": {"daily": 75_000, "monthly": 900, "quarterly": 300, "panel_series": 300, "panel_rows": 900,
+              "bls_series": 200, "daily_panel_series": 200, "daily_panel_rows": 10_000},
+}
+
+def _measure(fn, repeat: int) -> dict:
+    """Median/min wall time over `repeat` runs, then one extra run under tracemalloc for peak memory."""
+    fn()  # Warm-up (imports, caches, page faults)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"median_ms": statistics.median(times) * 1000, "min_ms": min(times) * 1000, "peak_kib": peak / 1024}
+
+def _legacy_alignment(frames: dict) -> pd.DataFrame:
+    """The original Explore-page alignment (outer union + reindex + ffill), kept for comparison."""
+    dfs = [df.rename(columns={"value": name}).set_index("date")[[name]] for name, df in frames.items()]
+    merged_raw = pd.concat(dfs, axis=1)
+    monthly_index = pd.period_range(start=merged_raw.index.min().to_period('M'),
+                                    end=merged_raw.index.max().to_period('M'), freq='M').to_timestamp(how='end')
+    merged = merged_raw.reindex(merged_raw.index.union(monthly_index)).ffill().loc[monthly_index].sort_index()
+    merged.index.name = 'date'
+    return merged
+
+def _cases(size: dict, store_dir: str):
+    """Yield (case name, params, zero-arg callable) for one size."""
+    daily = synthetic.synthetic_series(size["daily"], "D", seed=1, start_value=30000)
+    monthly = synthetic.synthetic_series(size["monthly"], "M", seed=2)
+    quarterly = synthetic.synthetic_series(size["quarterly"], "Q", seed=3, start_value=20000)
+    panel = synthetic.synthetic_panel(size["panel_series"], size["panel_rows"], "M", seed=4, missing=0.2)
+    daily_panel = {name: col.rename("value").rename_axis("date").reset_index()
+                   for name, col in synthetic.synthetic_panel(size["daily_panel_series"], size["daily_panel_rows"], "D", seed=5).items()}
+
+    # --- Parsing (JSON bytes -> typed frame), paged like the APIs ---
+    fred_pages = [json.dumps(synthetic.fred_observations_payload(daily, offset, PAGE_LIMIT)).encode()
+                  for offset in range(0, len(daily), PAGE_LIMIT)]
+    yield "parse.fred_observations", {"rows": len(daily), "pages": len(fred_pages)}, \
+        lambda: pd.concat([_parse_observations(json.loads(page)) for page in fred_pages], ignore_index=True)
+
+    bls_body = json.dumps(synthetic.bls_timeseries_payload(
+        {f"CES{i:010d}": synthetic.synthetic_series(240, "M", seed=i) for i in range(size["bls_series"])})).encode()
+    yield "parse.bls_timeseries", {"series": size["bls_series"], "rows_per_series": 240 + 20}, \
+        lambda: _parse_bls_response(json.loads(bls_body))
+
+    spec = FISCALDATA_DATASETS["debt_to_penny"]
+    treasury_pages = [json.dumps(synthetic.fiscaldata_payload(daily, page_number=p)).encode()
+                      for p in range(1, synthetic.fiscaldata_payload(daily)["meta"]["total-pages"] + 1)]
+    yield "parse.fiscaldata", {"rows": len(daily), "pages": len(treasury_pages)}, \
+        lambda: pd.concat([_parse_page(json.loads(page), spec) for page in treasury_pages], ignore_index=True)
+
+    # --- Cache reads ---
+    store.STORE_DIR = store_dir
+    store.put_series("bench", "daily", daily)
+    range_start, range_end = daily["date"].iloc[len(daily) // 2], daily["date"].iloc[-1]
+    yield "store.put_series", {"rows": len(daily)}, lambda: store.put_series("bench", "daily_write", daily)
+    yield "store.get_series.full", {"rows": len(daily)}, lambda: store.get_series("bench", "daily")
+    yield "store.get_series.range", {"rows": len(daily), "fraction": 0.5}, \
+        lambda: store.get_series("bench", "daily", range_start, range_end)
+    yield "memo.get_series.range", {"rows": len(daily), "fraction": 0.5}, \
+        lambda: memo.get_series("bench", "daily", range_start, range_end)
+
+    # --- Explore-page alignment: daily + monthly + quarterly onto month-ends ---
+    explore_frames = {"daily": daily, "monthly": monthly, "quarterly": quarterly}
+    points = sum(len(df) for df in explore_frames.values())
+    yield "align.legacy_union_ffill", {"points": points}, lambda: _legacy_alignment(explore_frames)
+    yield "align.align_frames.eop", {"points": points}, lambda: align_frames(explore_frames, "M", "eop")
+    yield "align.align_frames.mean", {"points": points}, lambda: align_frames(explore_frames, "M", "mean")
+    daily_points = size["daily_panel_series"] * size["daily_panel_rows"]
+    yield "align.daily_panel.legacy_union_ffill", {"points": daily_points}, lambda: _legacy_alignment(daily_panel)
+    yield "align.daily_panel.align_frames", {"points": daily_points}, lambda: align_frames(daily_panel, "M", "eop")
+
+    # --- Chart downsampling (uncached, i.e. the first render of a series/range) ---
+    yield "downsample.lttb", {"rows": len(daily), "points": CHART_MAX_POINTS}, \
+        lambda: downsample(daily, CHART_MAX_POINTS, "lttb")
+    yield "downsample.minmax", {"rows": len(daily), "points": CHART_MAX_POINTS}, \
+        lambda: downsample(daily, CHART_MAX_POINTS, "minmax")
+
+    # --- analytics.py, single-series functions ---
+    x = np.arange(len(monthly))
+    yield "analytics.linregress", {"rows": len(monthly)}, lambda: analytics.linregress(x, monthly["value"])
+    yield "analytics.calculate_changes", {"rows": len(monthly)}, lambda: analytics.calculate_changes(monthly)
+    yield "analytics.detect_trend", {"rows": len(monthly)}, lambda: analytics.detect_trend(monthly)
+    yield "analytics.detect_anomalies", {"rows": len(daily)}, lambda: analytics.detect_anomalies(daily)
+    yield "analytics.forecast_linear", {"rows": len(monthly)}, lambda: analytics.forecast_linear(monthly)
+    yield "analytics.future_dates", {"rows": len(daily)}, lambda: analytics.future_dates(daily["date"], 12)
+    yield "analytics.t_quantile", {}, lambda: analytics.t_quantile(0.975, 30)
+
+    # --- analytics.py, whole-panel functions ---
+    shape = {"series": panel.shape[1], "rows": panel.shape[0]}
+    yield "analytics.infer_panel_frequency", shape, lambda: analytics.infer_panel_frequency(panel)
+    yield "analytics.calculate_changes_panel", shape, lambda: analytics.calculate_changes_panel(panel)
+    yield "analytics.detect_anomalies_panel", shape, lambda: analytics.detect_anomalies_panel(panel)
+    yield "analytics.detect_trend_panel", shape, lambda: analytics.detect_trend_panel(panel)
+    xcorr_panel = panel.iloc[:, :min(panel.shape[1], 50)]
+    xcorr = analytics.cross_correlation_panel.__wrapped__  # Uncached, so the FFT work is what's timed
+    yield "analytics.cross_correlation_panel", {"series": xcorr_panel.shape[1], "rows": xcorr_panel.shape[0], "max_lag": 36}, \
+        lambda: xcorr(xcorr_panel, max_lag=36)
+    pair = xcorr(panel.iloc[:, :2], max_lag=36)
+    yield "analytics.lead_lag_note", {"max_lag": 36}, lambda: analytics.lead_lag_note(pair, *panel.columns[:2])
+
+def _rag_case():
+    """RAG retrieval against the persisted store, if the optional stack and an index are present."""
+    try:
+        from utils.rag import DB_PATH, retrieve_context, get_vectorstore
+        if not os.path.exists(os.path.join(PROJECT_ROOT, DB_PATH)):
+            return {"case": "rag.retrieve_context", "skipped": "no vectorstore—run rag/ingest.py first"}
+        os.chdir(PROJECT_ROOT)
+        get_vectorstore()
+    except Exception as e:
+        return {"case": "rag.retrieve_context", "skipped": f"{type(e).__name__}: {e}"}
+    queries = ["core CPI inflation", "unemployment rate methodology", "federal debt held by the public"]
+    first = _measure(lambda: retrieve_context(queries[0]), repeat=1)  # Includes the first query embedding
+    cached = _measure(lambda: [retrieve_context(q) for q in queries], repeat=5)
+    return {"case": "rag.retrieve_context", "params": {"queries": len(queries)}, "first_query": first, **cached}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="small,medium", help=f"Comma-separated subset of {','.join(SIZES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--no-rag", action="store_true", help="Skip the RAG retrieval case")
+    parser.add_argument("--output", help="Write JSON results here as well as stdout")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as store_dir:
+        for size_name in args.sizes.split(","):
+            for case, params, fn in _cases(SIZES[size_name], store_dir):
+                if args.filter in case:
+                    results.append({"case": case, "size": size_name, "params": params, **_measure(fn, args.repeat)})
+                    print(f"{size_name:>6}  {case:<42} {results[-1]['median_ms']:>10.2f} ms", file=sys.stderr)
+    if not args.no_rag and args.filter in "rag.retrieve_context":
+        results.append(_rag_case())
+
+    report = {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+if __name__ == "__main__":
+    main()
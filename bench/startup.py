@@ -0,0 +1,86 @@
+"""Cold-start import benchmark for each Streamlit page.
+
+Runs every page's top-level imports in a fresh interpreter (so nothing is warm),
+records wall time, the slowest modules from -X importtime, and whether heavy
+optional dependencies got pulled in. Prints JSON; use --output to save it.
+
+    python bench/startup.py --runs 3 --output startup.json
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies that should only load when a feature actually needs them
+HEAVY_MODULES = ["torch", "sentence_transformers", "google.generativeai", "langchain_huggingface",
+                 "langchain_community", "chromadb"]
+
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def _page_imports(path: str) -> str:
+    """Top-level import statements of a page, as source."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+def _slowest_modules(stderr: str, top: int) -> list[dict]:
+    """Parse `-X importtime` output into the modules with the largest cumulative time."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({"module": name.strip(), "cumulative_ms": int(cumulative_us) / 1000})
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+
+def benchmark_page(path: str, runs: int = 3, top: int = 10) -> dict:
+    code = _PROBE.format(root=PROJECT_ROOT, imports=_page_imports(path), heavy=HEAVY_MODULES)
+    timings, heavy, slowest = [], [], []
+    for i in range(runs):
+        args = [sys.executable] + (["-X", "importtime"] if i == 0 else []) + ["-c", code]
+        proc = subprocess.run(args, cwd=PROJECT_ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            return {"page": os.path.relpath(path, PROJECT_ROOT), "error": proc.stderr.strip().splitlines()[-1:]}
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+        heavy = result["heavy"]
+        if i == 0:
+            slowest = _slowest_modules(proc.stderr, top)
+    return {
+        "page": os.path.relpath(path, PROJECT_ROOT),
+        "import_seconds_median": statistics.median(timings),
+        "import_seconds_runs": timings,
+        "heavy_modules_loaded": heavy,
+        "slowest_modules": slowest,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", help="Write JSON results here as well as stdout")
+    args = parser.parse_args()
+
+    pages = [os.path.join(PROJECT_ROOT, "0_Home.py")] + sorted(glob.glob(os.path.join(PROJECT_ROOT, "pages", "*.py")))
+    report = {"python": sys.version.split()[0], "pages": [benchmark_page(page, runs=args.runs) for page in pages]}
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+if __name__ == "__main__":
+    main()
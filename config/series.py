@@ -0,0 +1,22 @@
+import json
+from config.settings import SERIES_CATALOG_PATH
+
+# Series offered on the Explore page: display name -> (source, series_id)
+SERIES_OPTIONS = {
+    "GDP - Gross Domestic Product (Quarterly - Billions $)": ("fred", "GDP"),
+    "CPIAUCSL - Consumer Price Index (Monthly - Index)": ("fred", "CPIAUCSL"),
+    "UNRATE - Unemployment Rate (Monthly - %)": ("fred", "UNRATE"),
+    "FEDFUNDS - Federal Funds Rate (Monthly - %)": ("fred", "FEDFUNDS"),
+    "PPIACO - Producer Price Index (Monthly - Index)": ("fred", "PPIACO"),
+    "BLS AHE Private - Average Hourly Earnings (Monthly - $)": ("bls", "CES0500000003"),
+    "Treasury Public Debt - Total Outstanding (Daily - Billions $)": ("treasury", "debt_to_penny"),
+}
+
+DEFAULT_START_YEAR = 2020  # Explore page's initial range (ends at the current year)
+
+def load_catalog(path: str | None = SERIES_CATALOG_PATH) -> dict:
+    """Extra series the refresh job keeps warm, from a JSON file of {display name: [source, series_id]}."""
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {name: tuple(spec) for name, spec in json.load(f).items()}
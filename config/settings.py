@@ -7,10 +7,54 @@ FRED_API_KEY = os.getenv("FRED_API_KEY")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 BLS_API_KEY = os.getenv("BLS_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+GEMINI_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "10"))  # Free-tier default
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+# download.bls.gov rejects requests without a descriptive User-Agent (ideally with a contact email)
+BLS_CATALOG_USER_AGENT = os.getenv("BLS_CATALOG_USER_AGENT", "macro-econ-analytics-prototype (research use)")
 
-if not FRED_API_KEY:
-    raise ValueError("FRED_API_KEY missing from .env")
-if not GOOGLE_API_KEY:
-    raise ValueError("GOOGLE_API_KEY missing from .env")
-if not BLS_API_KEY:
-    raise ValueError("BLS_API_KEY missing from .env")
\ No newline at end of file
+# Offline API stand-ins (utils/replay.py): synthetic, replay (recordings only) or record; empty = live APIs
+API_REPLAY = os.getenv("API_REPLAY", "").lower()
+API_REPLAY_DIR = os.getenv("API_REPLAY_DIR")  # Recordings directory, default data/replay
+API_REPLAY_LATENCY_MS = float(os.getenv("API_REPLAY_LATENCY_MS", "0"))  # Mean per-request latency (+/-50% jitter)
+API_REPLAY_ERROR_RATE = float(os.getenv("API_REPLAY_ERROR_RATE", "0"))  # Fraction of requests answered 503
+API_REPLAY_TIMEOUT_RATE = float(os.getenv("API_REPLAY_TIMEOUT_RATE", "0"))  # Fraction raising a read timeout
+API_REPLAY_PAGE_SIZE = int(os.getenv("API_REPLAY_PAGE_SIZE", "0")) or None  # Cap rows per page to exercise paging
+
+# Per-stage timing spans (utils/perf.py) are cheap and on by default; the sidebar panel is opt-in
+PERF_SPANS = os.getenv("PERF_SPANS", "1") not in ("", "0", "false")
+PERF_PANEL = os.getenv("PERF_PANEL", "") not in ("", "0", "false")
+MEMORY_PANEL = os.getenv("MEMORY_PANEL", "") not in ("", "0", "false")  # Per-session/process memory (utils/memory.py)
+
+# Line charts are downsampled server-side to at most this many points (utils/downsample.py): "lttb" or "minmax"
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "2000"))
+CHART_DOWNSAMPLE = os.getenv("CHART_DOWNSAMPLE", "lttb")
+
+# How long fetched series count as fresh, per source (seconds). Older data is still served at once while a
+# background thread refreshes it (utils/refresher.py).
+CACHE_TTL_SECONDS = {
+    "fred": int(os.getenv("FRED_CACHE_TTL_SECONDS", "86400")),
+    "bls": int(os.getenv("BLS_CACHE_TTL_SECONDS", "86400")),
+    "treasury": int(os.getenv("TREASURY_CACHE_TTL_SECONDS", "21600")),  # Daily data, published every business day
+}
+# Per-series overrides: (source, series_id) -> seconds
+SERIES_CACHE_TTL_SECONDS = {
+    ("fred", "GDP"): 7 * 86400,  # Quarterly, revised a few times a quarter
+}
+
+# Extra series for jobs/refresh.py beyond the Explore page's (JSON {display name: [source, series_id]})
+SERIES_CATALOG_PATH = os.getenv("SERIES_CATALOG_PATH")
+
+# Keys are validated per feature (see require), so pages that don't need a key still load
+FEATURE_KEYS = {
+    "fred": ("FRED_API_KEY",),
+    "bls": ("BLS_API_KEY",),
+    "llm": ("GOOGLE_API_KEY",),
+}
+
+def require(feature: str) -> None:
+    """Raise if any key the feature needs is missing."""
+    if API_REPLAY in ("synthetic", "replay"):
+        return  # Offline stand-ins don't check keys
+    for name in FEATURE_KEYS[feature]:
+        if not globals().get(name):
+            raise ValueError(f"{name} missing from .env")
@@ -0,0 +1,135 @@
+"""Headless refresh: fetch every configured series, then precompute what the Explore page shows.
+
+Series come from config.series.SERIES_OPTIONS plus the optional SERIES_CATALOG_PATH catalog. Stale series
+are re-fetched concurrently (BLS batched, anomalies updated incrementally); then every single-series view
+and, with --pairs, every ordered pair of Explore series is aligned and its changes, anomalies, trends,
+backtest and forecasts are written to the store's disk memo, for the default year range. Page loads then
+find them there. Progress goes to a manifest in the store so an interrupted pass can --resume.
+
+    python jobs/refresh.py                  # One pass
+    python jobs/refresh.py --every 360      # Scheduler: a pass every 6 hours
+    python jobs/refresh.py --resume         # Finish an interrupted pass
+"""
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import argparse
+import itertools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from config.series import DEFAULT_START_YEAR, SERIES_OPTIONS, load_catalog
+from utils import memo, store
+from utils.loader import load_series
+from utils.views import range_bounds, warm_view
+
+MANIFEST_NAME = "refresh_manifest.json"
+REFRESH_MAX_AGE_SECONDS = 6 * 3600  # Re-fetch series older than this, well inside the clients' 24h TTL
+DERIVED_MAX_AGE_SECONDS = 7 * 86400  # Precomputed results nobody wrote or read for a week are pruned
+MAX_VIEW_WORKERS = 4
+
+def _manifest_path() -> str:
+    return os.path.join(store.STORE_DIR, MANIFEST_NAME)
+
+def _load_manifest() -> dict:
+    try:
+        with open(_manifest_path(), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_manifest(manifest: dict) -> None:
+    tmp_path = f"{_manifest_path()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, _manifest_path())
+
+def _age(spec) -> float:
+    age = store.age_seconds(*spec)
+    return float("inf") if age is None else age
+
+def _plan_views(series: dict, pairs: bool) -> dict:
+    """Task name -> specs for every view to precompute (selection order matters to the page, so pairs are ordered)."""
+    views = {f"view:{name}": {name: spec} for name, spec in series.items()}
+    if pairs:
+        for a, b in itertools.permutations(SERIES_OPTIONS, 2):
+            views[f"view:{a} | {b}"] = {a: SERIES_OPTIONS[a], b: SERIES_OPTIONS[b]}
+    return views
+
+def refresh(resume: bool = False, pairs: bool = True, max_age: float = REFRESH_MAX_AGE_SECONDS,
+            workers: int = MAX_VIEW_WORKERS, start_year: int = DEFAULT_START_YEAR) -> int:
+    """One refresh pass; returns the number of failed tasks (they stay pending for --resume)."""
+    manifest = _load_manifest() if resume else {}
+    if not manifest or manifest.get("finished"):
+        manifest = {"started": time.time(), "tasks": {}}
+    done = manifest["tasks"]
+    failures = 0
+
+    # 1. Fetch series that are missing or older than max_age
+    series = {**SERIES_OPTIONS, **load_catalog()}
+    pending = {name: spec for name, spec in series.items() if f"fetch:{spec[0]}:{spec[1]}" not in done}
+    stale = {name: spec for name, spec in pending.items() if _age(spec) >= max_age}
+    started = time.perf_counter()
+    _, errors = load_series(stale, force_refresh=True)
+    for name, spec in pending.items():
+        if name in errors:
+            failures += 1
+            print(f"Warning: fetch {name} failed: {errors[name]}")
+        else:
+            done[f"fetch:{spec[0]}:{spec[1]}"] = time.time()
+    _save_manifest(manifest)
+    print(f"Fetched {len(stale) - len(errors)}/{len(stale)} stale series "
+          f"({len(pending) - len(stale)} fresh) in {time.perf_counter() - started:.1f}s")
+
+    # 2. Precompute views for the default range (the page keys them on data versions, so they match)
+    range_start, range_end = range_bounds(start_year, datetime.now().year)
+    views = {task: specs for task, specs in _plan_views(series, pairs).items() if task not in done}
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(warm_view, specs, range_start, range_end): task for task, specs in views.items()}
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"Warning: {task} failed: {e}")
+                continue
+            done[task] = time.time()
+            _save_manifest(manifest)
+            print(f"{task}: {result['rows']} rows, {result['forecasts']} forecasts, backtest {'ok' if result['backtest'] else 'skipped'}")
+    print(f"Precomputed {len(views)} views in {time.perf_counter() - started:.1f}s")
+
+    removed = memo.prune_persisted(DERIVED_MAX_AGE_SECONDS)
+    if removed:
+        print(f"Pruned {removed} stale precomputed results")
+    if not failures:
+        manifest["finished"] = time.time()
+    _save_manifest(manifest)
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh series and precompute Explore page results.")
+    parser.add_argument("--resume", action="store_true", help="Continue the last unfinished pass")
+    parser.add_argument("--no-pairs", action="store_true", help="Only single-series views (skip every ordered pair)")
+    parser.add_argument("--max-age", type=float, default=REFRESH_MAX_AGE_SECONDS, help="Re-fetch series older than this many seconds (0 = all)")
+    parser.add_argument("--workers", type=int, default=MAX_VIEW_WORKERS, help="Views precomputed concurrently")
+    parser.add_argument("--every", type=float, help="Keep running, one pass every this many minutes")
+    args = parser.parse_args()
+
+    resume = args.resume
+    while True:
+        started = time.time()
+        try:
+            failed = refresh(resume=resume, pairs=not args.no_pairs, max_age=args.max_age, workers=args.workers)
+        except Exception as e:
+            failed = 1
+            print(f"Warning: refresh pass failed: {e}")
+        if args.every is None:
+            sys.exit(1 if failed else 0)
+        resume = True  # A failed or interrupted pass picks up where it stopped next time
+        time.sleep(max(0.0, args.every * 60 - (time.time() - started)))
@@ -1,11 +1,15 @@
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-from utils.fred_api import get_series_observations, get_series_info
-from utils.bls_api import get_bls_series
-from utils.treasury_api import get_treasury_debt
-from utils.llm import ask_gemini
-from utils.analytics import calculate_changes, detect_trend, detect_anomalies, forecast_linear
+from utils.loader import load_series
+from utils.llm import ask_gemini_stream
+from utils.forecasting import MODELS, best_models
+from utils.views import get_view, range_bounds, view_backtest, view_forecast, view_trend
+from utils import memo, memory, perf, store
+from utils.downsample import chart_series
+from config.series import SERIES_OPTIONS, DEFAULT_START_YEAR
+from utils.scenarios import fit_panel, scenario_frame, bootstrap_fan
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
@@ -25,23 +29,13 @@ st.markdown("""
 - Forecasts/scenarios illustrative only—not financial advice.
 """)
 
-SERIES_OPTIONS = {
-    "GDP - Gross Domestic Product (Quarterly - Billions $)": ("fred", "GDP"),
-    "CPIAUCSL - Consumer Price Index (Monthly - Index)": ("fred", "CPIAUCSL"),
-    "UNRATE - Unemployment Rate (Monthly - %)": ("fred", "UNRATE"),
-    "FEDFUNDS - Federal Funds Rate (Monthly - %)": ("fred", "FEDFUNDS"),
-    "PPIACO - Producer Price Index (Monthly - Index)": ("fred", "PPIACO"),
-    "BLS AHE Private - Average Hourly Earnings (Monthly - $)": ("bls", "CES0500000003"),
-    "Treasury Public Debt - Total Outstanding (Daily - Billions $)": ("treasury", None),
-}
-
 current_year = datetime.now().year
 
 year_options = list(range(1947, current_year + 1))[::-1]  # Recent first
 
 # Locked defaults first load
 if "selected_start_year" not in st.session_state:
-    st.session_state.selected_start_year = 2020
+    st.session_state.selected_start_year = DEFAULT_START_YEAR
 if "selected_end_year" not in st.session_state:
     st.session_state.selected_end_year = current_year
 if "selected_series_names" not in st.session_state:
@@ -63,7 +57,7 @@ with st.sidebar:
     
     col1, col2 = st.columns(2)
     with col1:
-        start_index = year_options.index(st.session_state.selected_start_year) if st.session_state.selected_start_year in year_options else year_options.index(2020)
+        start_index = year_options.index(st.session_state.selected_start_year) if st.session_state.selected_start_year in year_options else year_options.index(DEFAULT_START_YEAR)
         start_year = st.selectbox("Start Year", options=year_options, index=start_index, key="start_year_select")
     with col2:
         end_index = year_options.index(st.session_state.selected_end_year) if st.session_state.selected_end_year in year_options else 0
@@ -75,73 +69,51 @@ with st.sidebar:
     
     load_button = st.button("Load / Refresh Data")
     
-    show_forecast = st.checkbox("Show 12-Month Linear Forecast (Primary)", value=False)
+    native_points = st.checkbox("Plot Native Frequency (e.g. daily Treasury)", value=False, key="native_points_checkbox")
+    
+    show_forecast = st.checkbox("Show 12-Period Forecast (Primary)", value=False)
     
+    forecast_model = "linear"
     scenario_shock = 0.0
+    show_scenario_grid = False
+    show_fan = False
     if show_forecast:
+        forecast_model = st.selectbox("Forecast Model", options=["auto"] + list(MODELS),
+                                      format_func=lambda m: "Auto (best backtest RMSE)" if m == "auto" else MODELS[m][0],
+                                      index=1, key="forecast_model_select")
         scenario_shock = st.slider("Scenario Shock (% change to primary latest value)", min_value=-50.0, max_value=50.0, value=0.0, step=0.5,
                                    key="scenario_shock_slider")
+        show_scenario_grid = st.checkbox("Show Scenario Grid (-20% to +20% shocks)", value=False)
+        show_fan = st.checkbox("Show Bootstrap Fan Chart (5-95%)", value=False)
 
 # Detect changes for auto-load
 series_changed = st.session_state.get("selected_series_names", []) != selected_names
 years_changed = st.session_state.get("selected_start_year") != start_year or st.session_state.get("selected_end_year") != end_year
 
-if load_button or series_changed or years_changed or "merged_df" not in st.session_state:
-    with st.spinner("Loading and aligning multi-source data to monthly month-end..."):
+if load_button or series_changed or years_changed or "view_request" not in st.session_state:
+    with st.spinner("Loading and aligning multi-source data to monthly month-end..."), \
+            perf.span("page.explore.load", series=len(selected_names), refresh=bool(load_button)):
         try:
-            dfs = []
-            for name in selected_names:
-                source, series_id = SERIES_OPTIONS[name]
-                if source == "fred":
-                    temp_df = get_series_observations(series_id, force_refresh=load_button or series_changed or years_changed)
-                    temp_df = temp_df[['date', 'value']]
-                elif source == "bls":
-                    temp_df = get_bls_series(series_id)
-                elif source == "treasury":
-                    temp_df = get_treasury_debt()
-                
-                temp_df['value'] = pd.to_numeric(temp_df['value'], errors='coerce')
-                temp_df["date"] = pd.to_datetime(temp_df["date"])
-                temp_df = temp_df[(temp_df["date"].dt.year >= start_year) & (temp_df["date"].dt.year <= end_year)]
-                temp_df = temp_df.dropna(subset=["value"])
-                temp_df = temp_df.rename(columns={"value": name})
-                temp_df = temp_df.set_index("date")[[name]]
-                dfs.append(temp_df)
-            
-            merged_raw = pd.concat(dfs, axis=1)
-            
-            if merged_raw.empty:
-                st.error("No raw data in selected period.")
-                st.stop()
+            range_start, range_end = range_bounds(start_year, end_year)
+            specs = {name: SERIES_OPTIONS[name] for name in selected_names}
             
-            # Unified monthly alignment (month-end index)
-            min_period = merged_raw.index.min().to_period('M')
-            max_period = merged_raw.index.max().to_period('M')
-            monthly_periods = pd.period_range(start=min_period, end=max_period, freq='M')
-            monthly_index = monthly_periods.to_timestamp(how='end')
+            # Only a refresh or a new series set touches the sources; a year change is a slice of memoized data
+            if load_button or series_changed or "view_request" not in st.session_state:
+                # All selected series fetched concurrently into the store
+                _, errors = load_series(specs, force_refresh=load_button)
+                if errors:
+                    name, err = next(iter(errors.items()))
+                    raise RuntimeError(f"{name}: {err}")
             
-            expanded_index = merged_raw.index.union(monthly_index)
-            merged_expanded = merged_raw.reindex(expanded_index)
-            merged_ffill = merged_expanded.ffill()
-            merged_df = merged_ffill.loc[monthly_index].sort_index()
-            
-            # Key fix: name the index 'date' for proper reset_index in analytics/forecast
-            merged_df.index.name = 'date'
-            
-            if merged_df.empty or merged_df.dropna(how='all').empty:
+            # Monthly panel and analytics, memoized on the series' data versions (in memory and on disk, where
+            # jobs/refresh.py precomputes the common views)
+            if get_view(specs, range_start, range_end) is None:
                 st.error("No overlapping data after monthly alignment—widen years.")
                 st.stop()
             
-            primary_name = selected_names[0]
-            primary_df = merged_df[[primary_name]].reset_index().rename(columns={primary_name: "value"})
-            primary_df, pop_label = calculate_changes(primary_df)
-            primary_df = detect_anomalies(primary_df)
-            trend_info = detect_trend(primary_df)
-            
-            st.session_state.merged_df = merged_df
+            # The session keeps only what to show; the frames are shared by every session in this process
+            st.session_state.view_request = (specs, range_start, range_end)
             st.session_state.selected_series_names = selected_names
-            st.session_state.primary_trend = trend_info
-            st.session_state.pop_label = pop_label
             st.session_state.selected_start_year = start_year
             st.session_state.selected_end_year = end_year
             st.session_state.scenario_shock = scenario_shock
@@ -154,26 +126,62 @@ if load_button or series_changed or years_changed or "merged_df" not in st.sessi
 if series_changed:
     st.rerun()
 
-# Retrieve
-merged_df = st.session_state.merged_df
+# Retrieve (a memo hit; rebuilt from the store if it was evicted or a background refresh landed)
+view = get_view(*st.session_state.view_request)
+if view is None:
+    st.error("No overlapping data after monthly alignment—widen years.")
+    st.stop()
+merged_df, data_key = view["merged_df"], view["key"]
 selected_names = st.session_state.selected_series_names
-trend_info = st.session_state.primary_trend
-pop_label = st.session_state.pop_label
-scenario_shock = st.session_state.get("scenario_shock", 0.0)
+trend_info, pop_label = view_trend(view, selected_names[0])
+st.session_state.scenario_shock = scenario_shock  # Live slider value—scenarios don't need a reload
+SCENARIO_GRID = np.arange(-20.0, 20.0 + 2.5, 2.5)
+
+def model_backtest() -> pd.DataFrame:
+    """Rolling-origin backtest of every model on every loaded series, memoized per data version and range."""
+    return view_backtest(merged_df, data_key)
+
+def primary_model() -> str:
+    if forecast_model != "auto":
+        return forecast_model
+    try:
+        return best_models(model_backtest()).get(selected_names[0], "linear")
+    except ValueError:
+        return "linear"  # Too little history to backtest
+
+def primary_forecast() -> pd.DataFrame:
+    """12-period forecast of the primary series with the selected model, memoized per data version and range."""
+    return view_forecast(merged_df, data_key, selected_names[0], primary_model())
+
+def scenario_prefix() -> str:
+    """Scenarios and the bootstrap fan shock/resample the linear trend fit; say so when another model is shown."""
+    return "" if primary_model() == "linear" else "Linear-Trend "
+
+def primary_scenarios(shocks) -> pd.DataFrame:
+    """Shocked forecasts of the primary series (one column per shock %) from the closed-form scenario engine."""
+    fit = memo.get_or_compute(("scenario_fit", data_key), lambda: fit_panel(merged_df))
+    return scenario_frame(merged_df, selected_names[0], shocks, periods=12, fit=fit)
 
 st.subheader("Multi-Source Comparison (Unified Monthly Charts)")
 
+specs, range_start, range_end = st.session_state.view_request
 for name in selected_names:
-    series_df = merged_df[[name]].reset_index().rename(columns={name: "value"})
+    # Downsampled server-side to a bounded number of points, memoized per (series, year range, points)
+    source, series_id = specs[name]
+    native_df = memo.get_series(source, series_id) if native_points else None
+    if native_df is not None:
+        series_df = chart_series(native_df, (source, series_id, store.data_version(source, series_id)), range_start, range_end)
+    else:
+        series_df = chart_series(merged_df[[name]].reset_index().rename(columns={name: "value"}), (data_key, name))
     
     fig = px.line(series_df, x="date", y="value", title=name)
     fig.update_layout(xaxis_title="Date", yaxis_title="Value")
     
     if show_forecast and name == selected_names[0]:
         try:
-            forecast_df = forecast_linear(series_df, periods=12)
+            forecast_df = primary_forecast()
             
-            fig.add_scatter(x=forecast_df["date"], y=forecast_df["yhat"], mode="lines", name="Linear Forecast", line=dict(dash="dot", color="orange"))
+            fig.add_scatter(x=forecast_df["date"], y=forecast_df["yhat"], mode="lines", name=f"{MODELS[primary_model()][0]} Forecast", line=dict(dash="dot", color="orange"))
             
             fig.add_trace(go.Scatter(
                 x=pd.concat([forecast_df["date"], forecast_df["date"][::-1]]),
@@ -184,21 +192,55 @@ for name in selected_names:
                 name="95% Confidence"
             ))
             
+            if show_fan:
+                fan = memo.get_or_compute(("fan", data_key, scenario_shock), lambda: bootstrap_fan(
+                    merged_df, name, periods=12, shock_pct=scenario_shock,
+                    fit=memo.get_or_compute(("scenario_fit", data_key), lambda: fit_panel(merged_df))))
+                for lower, upper, alpha in ((0.05, 0.95, 0.15), (0.25, 0.75, 0.3)):
+                    fig.add_trace(go.Scatter(
+                        x=list(fan.index) + list(fan.index[::-1]),
+                        y=list(fan[upper]) + list(fan[lower][::-1]),
+                        fill='toself',
+                        fillcolor=f'rgba(30,144,255,{alpha})',
+                        line=dict(color='rgba(30,144,255,0)'),
+                        name=f"{scenario_prefix()}Bootstrap {int(lower * 100)}-{int(upper * 100)}%"
+                    ))
+                fig.add_scatter(x=fan.index, y=fan[0.5], mode="lines", name=f"{scenario_prefix()}Bootstrap Median", line=dict(dash="dot", color="dodgerblue"))
+            
+            if show_scenario_grid:
+                grid = primary_scenarios(SCENARIO_GRID)
+                for i, shock in enumerate(grid.columns):
+                    fig.add_scatter(x=grid.index, y=grid[shock], mode="lines", name=f"{scenario_prefix()}Scenario Grid", legendgroup="grid",
+                                    showlegend=i == 0, hovertemplate=f"{shock:+.1f}%: %{{y:,.2f}}<extra></extra>",
+                                    line=dict(width=1, color="rgba(128,0,128,0.35)"))
+            
             if scenario_shock != 0.0:
-                shocked_df = series_df.copy()
-                shocked_df.iloc[-1, shocked_df.columns.get_loc("value")] *= (1 + scenario_shock / 100)
-                
-                shocked_forecast = forecast_linear(shocked_df, periods=12)
+                shocked_forecast = primary_scenarios([scenario_shock])
                 
-                fig.add_scatter(x=shocked_forecast["date"], y=shocked_forecast["yhat"], mode="lines", name=f"Scenario ({scenario_shock:+.1f}%)", line=dict(dash="dash", color="purple"))
+                fig.add_scatter(x=shocked_forecast.index, y=shocked_forecast[scenario_shock], mode="lines", name=f"{scenario_prefix()}Scenario ({scenario_shock:+.1f}%)", line=dict(dash="dash", color="purple"))
                 
-                st.info(f"Scenario: {scenario_shock:+.1f}% shock to primary latest value (illustrative).")
+                st.info(f"{scenario_prefix()}Scenario: {scenario_shock:+.1f}% shock to primary latest value (illustrative).")
+            
+            if scenario_prefix() and (show_fan or show_scenario_grid or scenario_shock != 0.0):
+                st.caption(f"Scenarios and the bootstrap fan are built on the linear trend fit, not the {MODELS[primary_model()][0]} forecast.")
         except Exception as e:
             st.warning(f"Forecast unavailable for {name}: {str(e)}")
     
     st.plotly_chart(fig, use_container_width=True)
 
 st.caption("Unified monthly (month-end): Daily Treasury debt uses month-end value; lower-frequency (e.g., quarterly GDP) forward-filled. Separate charts preserve native scales.")
+if native_points:
+    st.caption("Chart lines show each series at its native frequency, downsampled to keep its shape; forecasts, analytics and export stay monthly.")
+
+if show_forecast:
+    with st.expander("Forecast Model Backtest (rolling origin: 12 origins, 12-period horizon)"):
+        try:
+            metrics = model_backtest()
+            st.dataframe(metrics.drop(columns="model").rename(columns={"label": "model"}).round(3), hide_index=True)
+            best = best_models(metrics)
+            st.caption("Best by RMSE: " + "; ".join(f"{series}: {MODELS[model][0]}" for series, model in best.items()))
+        except ValueError as e:
+            st.info(f"Backtest unavailable: {str(e)}")
 
 # Step 40: Export CSV (with clean date format)
 if not merged_df.empty:
@@ -218,23 +260,25 @@ if st.button("Explain Charts (Gemini 2.5 Flash)"):
         forecast_note = " Forecast shown." if show_forecast else ""
         scenario_note = f" Scenario shock {scenario_shock:+.1f}% applied." if scenario_shock != 0.0 else ""
         context = f"{series_note} Primary trend: {trend_info.get('recent_trend', 'N/A')}{forecast_note}{scenario_note} Data aligned monthly."
-        insights = ask_gemini("Analyze for business strategy/pricing implications across series.", context, df=merged_df)
     st.markdown("**Gemini 2.5 Flash Multi-Source Insights:**")
-    st.markdown(insights)
+    st.write_stream(ask_gemini_stream("Analyze for business strategy/pricing implications across series.", context, df=merged_df))
 
 if show_forecast:
     if st.button("Explain Forecast/Scenario in Business Terms (Gemini 2.5 Flash)"):
         with st.spinner("Analyzing forecast implications..."):
-            base_forecast = forecast_linear(merged_df[[selected_names[0]]].reset_index().rename(columns={selected_names[0]: "value"}), periods=12)
-            trajectory = f"Base trajectory to {base_forecast['yhat'].iloc[-1]:,.2f} by {base_forecast['date'].iloc[-1].date()}"
+            base_forecast = primary_forecast()
+            trajectory = f"{MODELS[primary_model()][0]} base trajectory to {base_forecast['yhat'].iloc[-1]:,.2f} by {base_forecast['date'].iloc[-1].date()}"
             scenario_note = ""
             if scenario_shock != 0.0:
-                shocked_df = merged_df[[selected_names[0]]].reset_index().rename(columns={selected_names[0]: "value"}).copy()
-                shocked_df.iloc[-1, shocked_df.columns.get_loc("value")] *= (1 + scenario_shock / 100)
-                shocked_forecast = forecast_linear(shocked_df, periods=12)
-                trajectory += f"; scenario {scenario_shock:+.1f}% shock to {shocked_forecast['yhat'].iloc[-1]:,.2f}"
+                shocked_forecast = primary_scenarios([scenario_shock])
+                trajectory += f"; {scenario_prefix().lower()}scenario {scenario_shock:+.1f}% shock to {shocked_forecast[scenario_shock].iloc[-1]:,.2f}"
                 scenario_note = f" Scenario applies {scenario_shock:+.1f}% shock to primary latest value for 'what if' illustration."
+            if show_scenario_grid:
+                grid_end = primary_scenarios(SCENARIO_GRID).iloc[-1]
+                trajectory += f"; {scenario_prefix().lower()}shocks {SCENARIO_GRID[0]:+.0f}% to {SCENARIO_GRID[-1]:+.0f}% end between {grid_end.min():,.2f} and {grid_end.max():,.2f}"
             context = f"Series: {', '.join(selected_names)} Primary trend: {trend_info.get('recent_trend', 'N/A')} {trajectory}{scenario_note} Monthly aligned data."
-            insights = ask_gemini("Summarize business/pricing strategy implications of this forecast/scenario trajectory in concise bullets.", context, df=merged_df)
         st.markdown("**Gemini 2.5 Flash Forecast/Scenario Implications:**")
-        st.markdown(insights)
\ No newline at end of file
+        st.write_stream(ask_gemini_stream("Summarize business/pricing strategy implications of this forecast/scenario trajectory in concise bullets.", context, df=merged_df))
+
+perf.render_panel()
+memory.render_panel()
\ No newline at end of file
@@ -1,15 +1,21 @@
 import streamlit as st
-from utils.llm import ask_gemini
+from utils.llm import ask_gemini_stream
+from utils.analytics import cross_correlation_panel, lead_lag_note
+from utils import memory, perf
+from utils.views import get_view, view_trend
 import pandas as pd
 
 st.title("Ask Questions About the Data")
 
-if "merged_df" not in st.session_state or st.session_state.merged_df.empty:
+# The session holds only the Explore request; the frames come from the process-wide memo
+view = get_view(*st.session_state.view_request) if "view_request" in st.session_state else None
+if view is None or view["merged_df"].empty:
     st.warning("Load data on Explore Data page first.")
     st.stop()
 
-merged_df = st.session_state.merged_df
+merged_df = view["merged_df"]
 selected_names = st.session_state.selected_series_names
+trend_info, _ = view_trend(view, selected_names[0])
 show_forecast = st.session_state.get("show_forecast", False)
 
 if "messages" not in st.session_state:
@@ -28,23 +34,13 @@ if prompt := st.chat_input("Ask about the data (e.g., 'Compare wages and inflati
     lower_prompt = prompt.lower()
     if "compare wages" in lower_prompt and "inflation" in lower_prompt:
         # Wages vs CPI: compute corr/lags
-        if len(selected_names) >= 2 and "BLS AHE Private" in selected_names and "CPIAUCSL" in selected_names:
+        wages_name = next((name for name in selected_names if name.startswith("BLS AHE Private")), None)
+        cpi_name = next((name for name in selected_names if name.startswith("CPIAUCSL")), None)
+        if wages_name and cpi_name:
             df_cor = merged_df.dropna(how='any')
-            wages = df_cor["BLS AHE Private - Average Hourly Earnings (Monthly - $)"]
-            cpi = df_cor["CPIAUCSL - Consumer Price Index (Monthly - Index)"]
-            corr = wages.corr(cpi)
-            lag_data = []
-            for lag in range(-3, 4):
-                if lag < 0:
-                    shifted = cpi.shift(lag)
-                    lag_label = f"Wages lead CPI by {-lag} mo"
-                    lag_corr = wages.corr(shifted)
-                else:
-                    shifted = wages.shift(lag)
-                    lag_label = f"CPI leads Wages by {lag} mo"
-                    lag_corr = shifted.corr(cpi)
-                lag_data.append(f"{lag_label}: r={lag_corr:.2f}")
-            lag_note = "\n".join(lag_data)
+            corr = df_cor[wages_name].corr(df_cor[cpi_name])
+            lead_lag = cross_correlation_panel(merged_df, max_lag=36)  # Cached per data version, shared with Insights
+            lag_note = lead_lag_note(lead_lag, wages_name, cpi_name, labels=("Wages", "CPI"))
             context = f"Series: {', '.join(selected_names)}. Overall corr: r={corr:.2f}. Lags:\n{lag_note}"
             user_prompt = "Analyze wage vs inflation for business/pricing (spiral risk, implications) in bullets."
         else:
@@ -52,9 +48,11 @@ if prompt := st.chat_input("Ask about the data (e.g., 'Compare wages and inflati
             user_prompt = prompt
     elif "debt sustainability" in lower_prompt:
         # Debt sustainability: compute debt/GDP if loaded
-        if len(selected_names) >= 2 and "GDP" in selected_names and "Treasury Public Debt" in selected_names:
+        debt_name = next((name for name in selected_names if name.startswith("Treasury Public Debt")), None)
+        gdp_name = next((name for name in selected_names if name.startswith("GDP")), None)
+        if debt_name and gdp_name:
             df_ratio = merged_df.copy()
-            df_ratio['Debt/GDP Ratio (%)'] = (df_ratio['Treasury Public Debt - Total Outstanding (Daily - Billions $)'] / df_ratio['GDP - Gross Domestic Product (Quarterly - Billions $)']) * 100
+            df_ratio['Debt/GDP Ratio (%)'] = (df_ratio[debt_name] / df_ratio[gdp_name]) * 100
             recent_ratio = df_ratio['Debt/GDP Ratio (%)'].iloc[-1]
             context = f"Series: {', '.join(selected_names)}. Latest Debt/GDP: {recent_ratio:.1f}%"
             user_prompt = "Analyze debt sustainability for business/pricing (ratio risks, implications) in bullets."
@@ -66,12 +64,11 @@ if prompt := st.chat_input("Ask about the data (e.g., 'Compare wages and inflati
         user_prompt = prompt
     
     forecast_note = " Forecast shown." if show_forecast else ""
-    full_context = f"{context} Primary trend: {st.session_state.primary_trend.get('recent_trend', 'N/A')}{forecast_note}"
+    full_context = f"{context} Primary trend: {trend_info.get('recent_trend', 'N/A')}{forecast_note}"
     
-    with st.chat_message("assistant"):
-        with st.spinner("Gemini 2.5 Flash thinking..."):
-            response = ask_gemini(user_prompt, full_context, df=merged_df)
-        st.markdown(response)
+    with st.chat_message("assistant"), perf.span("page.ask.answer"):
+        # Stream tokens as they arrive instead of spinning for the whole generation
+        response = st.write_stream(ask_gemini_stream(user_prompt, full_context, df=merged_df))
     
     st.session_state.messages.append({"role": "assistant", "content": response})
 
@@ -84,4 +81,7 @@ with st.expander("Suggested Questions"):
     - Forecast outlook for unemployment?
     """)
 
-st.info("Context includes current data + analytics + RAG metadata. Gemini grounds responses.")
\ No newline at end of file
+st.info("Context includes current data + analytics + RAG metadata. Gemini grounds responses.")
+
+perf.render_panel()
+memory.render_panel()
\ No newline at end of file
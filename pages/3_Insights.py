@@ -1,21 +1,32 @@
 import streamlit as st
-from utils.llm import ask_gemini
+from utils.llm import ask_gemini_many
+from utils.analytics import detect_trend, cross_correlation_panel, lead_lag_note
+from utils import memory, perf
+from utils.views import get_view, view_trend
 import pandas as pd
 
 st.title("Insights Dashboard")
 
-if "merged_df" not in st.session_state or st.session_state.merged_df.empty:
+# The session holds only the Explore request; the frames come from the process-wide memo
+view = get_view(*st.session_state.view_request) if "view_request" in st.session_state else None
+if view is None or view["merged_df"].empty:
     st.warning("No data loaded. Visit Explore Data page and load a series first.")
     st.stop()
 
-merged_df = st.session_state.merged_df
+merged_df = view["merged_df"]
 selected_names = st.session_state.selected_series_names
-trend_info = st.session_state.get("primary_trend", {})
-pop_label = st.session_state.get("pop_label", "PoP %")
 
 # Primary for single or default
 primary_name = selected_names[0]
+trend_info, pop_label = view_trend(view, primary_name)
 primary_df = merged_df[[primary_name]].reset_index().rename(columns={primary_name: "value"})
+analytics = view["analytics"]
+primary_df = primary_df.assign(
+    yoy_pct=analytics["yoy_pct"][primary_name].to_numpy(),
+    pop_pct=analytics["pop_pct"][primary_name].to_numpy(),
+    z_score=analytics["z_score"][primary_name].to_numpy(),
+    anomaly=analytics["anomaly"][primary_name].to_numpy(),
+)
 latest_date = primary_df['date'].iloc[-1].date()
 latest_value = primary_df['value'].iloc[-1]
 latest_yoy = primary_df["yoy_pct"].iloc[-1] if "yoy_pct" in primary_df.columns and not pd.isna(primary_df["yoy_pct"].iloc[-1]) else "N/A"
@@ -33,7 +44,7 @@ st.markdown(f"""
 
 st.subheader("Anomalies & Risks (Primary)")
 if not anoms.empty:
-    st.write(f"{len(anoms)} anomalies detected in period (z-score > 2.5):")
+    st.write(f"{len(anoms)} anomalies detected in period (|z-score| > 2.5 vs. the last 36 observations at the series' native frequency):")
     st.dataframe(anoms[["date", "value", "z_score"]].sort_values("date", ascending=False).head(10))
 else:
     st.success("No significant anomalies in selected period—stable primary series.")
@@ -46,29 +57,20 @@ if len(selected_names) == 2:
     df1_name, df2_name = selected_names
     corr = df_cor.corr().iloc[0,1]
     
+    lead_lag = cross_correlation_panel(merged_df, max_lag=36)  # Cached per data version, shared with Ask Questions
+    names = {prefix: next((name for name in selected_names if name.startswith(prefix)), None)
+             for prefix in ("BLS AHE Private", "CPIAUCSL", "GDP", "Treasury Public Debt")}
+    
     # Wages vs CPI: spiral risk
-    if "BLS AHE Private" in selected_names and "CPIAUCSL" in selected_names:
-        wages = df_cor["BLS AHE Private - Average Hourly Earnings (Monthly - $)"]
-        cpi = df_cor["CPIAUCSL - Consumer Price Index (Monthly - Index)"]
-        lag_data = []
-        for lag in range(-3, 4):
-            if lag < 0:
-                shifted = cpi.shift(lag)
-                lag_label = f"Wages lead CPI by {-lag} mo"
-                lag_corr = wages.corr(shifted)
-            else:
-                shifted = wages.shift(lag)
-                lag_label = f"CPI leads Wages by {lag} mo"
-                lag_corr = shifted.corr(cpi)
-            lag_data.append(f"{lag_label}: r={lag_corr:.2f}")
-        lag_note = "\n".join(lag_data)
+    if names["BLS AHE Private"] and names["CPIAUCSL"]:
+        lag_note = lead_lag_note(lead_lag, names["BLS AHE Private"], names["CPIAUCSL"], labels=("Wages", "CPI"))
         multi_factor_context = f"Overall corr r={corr:.2f}. Lags:\n{lag_note}"
         multi_factor_prompt = "Using only the provided data + RAG metadata, analyze wage vs inflation for multi-factor insights (spiral risk, pricing implications) in bullets."
     
     # Debt/GDP: sustainability
-    elif "GDP" in selected_names and "Treasury Public Debt" in selected_names:
+    elif names["GDP"] and names["Treasury Public Debt"]:
         df_ratio = df_cor.copy()
-        df_ratio['Debt/GDP Ratio (%)'] = (df_ratio['Treasury Public Debt - Total Outstanding (Daily - Billions $)'] / df_ratio['GDP - Gross Domestic Product (Quarterly - Billions $)']) * 100
+        df_ratio['Debt/GDP Ratio (%)'] = (df_ratio[names["Treasury Public Debt"]] / df_ratio[names["GDP"]]) * 100
         recent_ratio = df_ratio['Debt/GDP Ratio (%)'].iloc[-1]
         ratio_trend = detect_trend(df_ratio.reset_index().rename(columns={'Debt/GDP Ratio (%)': 'value'})).get('recent_trend', 'N/A')
         multi_factor_context = f"Latest Debt/GDP: {recent_ratio:.1f}% ({ratio_trend} trend)"
@@ -76,20 +78,28 @@ if len(selected_names) == 2:
     
     # General fallback
     else:
-        multi_factor_context = f"Overall corr r={corr:.2f}"
+        best = lead_lag["best"].iloc[0]
+        lead_note = "coincident" if best["lag"] == 0 else f"{best['leader']} leads by {abs(best['lag'])} mo"
+        multi_factor_context = f"Overall corr r={corr:.2f}. Strongest lead/lag (±36 mo): {lead_note}, r={best['corr']:.2f}"
         multi_factor_prompt = "Using only the provided data + RAG metadata, analyze series correlation for multi-factor insights (risks, pricing implications) in bullets."
 
+# Both Gemini calls are independent—run them concurrently
+context = f"Series: {', '.join(selected_names)} Latest primary: {latest_value:,.3f} ({latest_date}) Trend: {trend_info.get('recent_trend', 'N/A')} YoY: {latest_yoy if isinstance(latest_yoy, str) else f'{latest_yoy:.2f}%'} Anomalies: {len(anoms)}"
+gemini_requests = [("Using only the provided data + RAG metadata, summarize business strategy implications (pricing, margins, demand, risk) in concise bullets.", context, primary_df)]
+if len(selected_names) == 2 and multi_factor_prompt:
+    gemini_requests.append((multi_factor_prompt, multi_factor_context, merged_df.reset_index()))
+with st.spinner("Gemini 2.5 Flash summarizing implications..."), perf.span("page.insights.gemini", requests=len(gemini_requests)):
+    answers = ask_gemini_many(gemini_requests)
+
 st.subheader("Business Implications (Primary)")
-with st.spinner("Gemini 2.5 Flash summarizing implications..."):
-    context = f"Series: {', '.join(selected_names)} Latest primary: {latest_value:,.3f} ({latest_date}) Trend: {trend_info.get('recent_trend', 'N/A')} YoY: {latest_yoy if isinstance(latest_yoy, str) else f'{latest_yoy:.2f}%'} Anomalies: {len(anoms)}"
-    implications = ask_gemini("Using only the provided data + RAG metadata, summarize business strategy implications (pricing, margins, demand, risk) in concise bullets.", context, df=primary_df)
-st.markdown(implications)
+st.markdown(answers[0])
 
 # Multi-factor if applicable
-if len(selected_names) == 2 and multi_factor_prompt:
+if len(answers) > 1:
     st.subheader("Multi-Factor Insights (Cross-Series)")
-    with st.spinner("Gemini 2.5 Flash analyzing multi-factors..."):
-        multi_implications = ask_gemini(multi_factor_prompt, multi_factor_context, df=merged_df.reset_index())
-    st.markdown(multi_implications)
+    st.markdown(answers[1])
+
+st.caption("Insights auto-generated from current data + analytics. Refresh on Explore page for updates.")
 
-st.caption("Insights auto-generated from current data + analytics. Refresh on Explore page for updates.")
\ No newline at end of file
+perf.render_panel()
+memory.render_panel()
\ No newline at end of file
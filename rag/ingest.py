@@ -4,12 +4,18 @@ import sys
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
-from utils.fred_api import get_series_info
+import argparse
+import hashlib
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.fred_api import fetch_series_info
+from utils.http_client import request
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings  # Local, no quota
 from langchain_community.vectorstores import Chroma
-import requests
-from config.settings import BLS_API_KEY
+from config.settings import BLS_API_KEY, FRED_API_KEY, BLS_CATALOG_USER_AGENT, require
 
 # Popular FRED series (keep as is)
 POPULAR_SERIES = [
@@ -34,41 +40,8 @@ Core vs Headline: Core excludes food/energy volatility—Fed's preferred for pol
 Core PCE: Personal Consumption Expenditures price index, Fed's favored inflation measure—less volatile than CPI, better for long-term pricing strategy.
 """
 
-DB_PATH = "rag/vectorstore"
-
-def ingest_rag_data():
-    docs = []
-    
-    # FRED metadata (keep existing logic)
-    for series_id in POPULAR_SERIES:
-        try:
-            meta = get_series_info(series_id)
-            text = f"""
-Series: {meta.get('title', 'N/A')}
-ID: {series_id}
-Description: {meta.get('notes') or meta.get('title', 'N/A')}
-Units: {meta.get('units', 'N/A')}
-Frequency: {meta.get('frequency', 'N/A')}
-Seasonal Adjustment: {meta.get('seasonal_adjustment', 'N/A')}
-"""
-            docs.append({"text": text, "source": f"FRED Metadata {series_id}"})
-        except Exception as e:
-            print(f"Warning: FRED metadata fetch failed for {series_id}: {e}")
-    
-    # Add curated notes as chunk
-    docs.append({"text": CURATED_NOTES, "source": "Curated Econ Notes"})
-    
-    # BLS metadata fetch for wages
-    bls_series_id = "CES0500000003"
-    bls_url = "https://api.bls.gov/publicAPI/v2/surveys"  # Example catalog, or timeseries for specific
-    headers = {"Content-type": "application/json"}
-    payload = {"registrationkey": BLS_API_KEY}
-    try:
-        response = requests.post(bls_url, json=payload, headers=headers)
-        response.raise_for_status()
-        bls_data = response.json()
-        # Extract or hardcode (fallback if API doesn't have detailed notes)
-        bls_metadata = """
+# Hardcoded BLS notes (API doesn't have detailed notes)
+BLS_AHE_METADATA = """
 Series: Average Hourly Earnings of All Employees, Total Private (CES0500000003)
 ID: CES0500000003
 Description: Average hourly earnings of all employees on private nonfarm payrolls, seasonally adjusted. Measures wage growth in the private sector.
@@ -77,14 +50,9 @@ Frequency: Monthly
 Seasonal Adjustment: Seasonally Adjusted
 Notes: From U.S. Bureau of Labor Statistics. Key for tracking wage inflation and labor costs, potential for wage-price spirals.
 """
-        docs.append({"text": bls_metadata, "source": f"BLS Metadata {bls_series_id}"})
-    except Exception as e:
-        print(f"Warning: BLS metadata fetch failed: {e}")
-        # Hardcode fallback
-        docs.append({"text": bls_metadata, "source": f"BLS Fallback {bls_series_id}"})
-
-    # Treasury metadata (hardcode from dictionary/API)
-    treasury_metadata = """
+
+# Treasury metadata (hardcode from dictionary/API)
+TREASURY_METADATA = """
 Series: Debt to the Penny
 ID: Debt to the Penny
 Description: Daily total public debt outstanding of the U.S. Treasury.
@@ -93,29 +61,260 @@ Units: Dollars
 Frequency: Daily
 Notes: From U.S. Department of the Treasury. Measures gross federal debt; key for debt/GDP ratios and sustainability analysis. High ratios may signal fiscal pressure affecting interest rates and economic growth.
 """
-    docs.append({"text": treasury_metadata, "source": "Treasury Metadata Debt to Penny"})
 
-    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    chunks = []
-    for doc in docs:
-        split = splitter.split_text(doc["text"])
-        for i, chunk in enumerate(split):
-            chunks.append({"text": chunk, "source": doc["source"], "chunk_id": i})
-    
-    # Local embeddings—no API quota
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    
-    texts = [c["text"] for c in chunks]
-    metadatas = [{"source": c["source"], "chunk_id": c["chunk_id"]} for c in chunks]
-    
+DB_PATH = "rag/vectorstore"
+CHECKPOINT_PATH = os.path.join(DB_PATH, "ingest_checkpoint.json")
+INGEST_TTL_SECONDS = 86400  # Metadata barely changes—skip units ingested within a day
+
+FRED_BASE_URL = "https://api.stlouisfed.org/fred"
+FRED_PAGE_LIMIT = 1000  # Max rows per category/release listing page
+BLS_SURVEYS_URL = "https://api.bls.gov/publicAPI/v2/surveys"
+BLS_CATALOG_URL = "https://download.bls.gov/pub/time.series/{survey}/{survey}.series"
+
+MAX_FETCH_WORKERS = 4  # Units fetched concurrently (HTTP is further capped per source)
+QUEUE_MAX_DOCS = 2000  # Backpressure: fetchers pause when the embedder falls behind
+EMBED_BATCH_SIZE = 512
+
+_DONE = object()
+_FAILED = object()
+
+def _chunk_id(unit: str, source: str, text: str) -> str:
+    """Stable chunk ID from its content, so re-ingesting the same text is a no-op."""
+    return hashlib.sha256(f"{unit}\n{source}\n{text}".encode("utf-8")).hexdigest()
+
+def _fred_doc(series_id: str, meta: dict) -> dict:
+    text = f"""
+Series: {meta.get('title', 'N/A')}
+ID: {series_id}
+Description: {meta.get('notes') or meta.get('title', 'N/A')}
+Units: {meta.get('units', 'N/A')}
+Frequency: {meta.get('frequency', 'N/A')}
+Seasonal Adjustment: {meta.get('seasonal_adjustment', 'N/A')}
+"""
+    return {"text": text, "source": f"FRED Metadata {series_id}"}
+
+def _core_docs():
+    """Popular FRED series plus curated/hardcoded notes (what the app always ships with)."""
+    failed = []
+    for series_id in POPULAR_SERIES:
+        try:
+            meta = fetch_series_info(series_id)
+        except Exception as e:
+            failed.append(f"{series_id} ({e})")
+            continue
+        yield _fred_doc(series_id, meta)
+
+    yield {"text": CURATED_NOTES, "source": "Curated Econ Notes"}
+    yield {"text": BLS_AHE_METADATA, "source": "BLS Metadata CES0500000003"}
+    yield {"text": TREASURY_METADATA, "source": "Treasury Metadata Debt to Penny"}
+
+    if failed:
+        raise ValueError(f"FRED metadata fetch failed for {', '.join(failed)}")
+
+def _fred_listing_docs(endpoint: str, id_param: str, id_value: int):
+    """Every series under a FRED category/release, paged FRED_PAGE_LIMIT at a time."""
+    require("fred")
+    offset = 0
+    while True:
+        params = {
+            id_param: id_value,
+            "api_key": FRED_API_KEY,
+            "file_type": "json",
+            "limit": FRED_PAGE_LIMIT,
+            "offset": offset,
+        }
+        data = request("GET", f"{FRED_BASE_URL}/{endpoint}", source="fred", params=params).json()
+        for meta in data["seriess"]:
+            yield _fred_doc(meta["id"], meta)
+        offset += len(data["seriess"])
+        if not data["seriess"] or offset >= int(data.get("count", 0)):
+            break
+
+def _bls_survey_list_docs():
+    """One doc per BLS survey from the /surveys endpoint."""
+    require("bls")
+    headers = {"Content-type": "application/json"}
+    data = request("POST", BLS_SURVEYS_URL, source="bls", json={"registrationkey": BLS_API_KEY}, headers=headers).json()
+    for survey in data["Results"]["survey"]:
+        text = f"""
+BLS Survey: {survey['survey_name']}
+Abbreviation: {survey['survey_abbreviation']}
+Notes: From U.S. Bureau of Labor Statistics. Series IDs in this survey start with {survey['survey_abbreviation']}.
+"""
+        yield {"text": text, "source": f"BLS Survey {survey['survey_abbreviation']}"}
+
+def _bls_catalog_docs(survey: str):
+    """Every series in a BLS survey, streamed line by line from its time.series catalog file."""
+    abbr = survey.lower()
+    response = request("GET", BLS_CATALOG_URL.format(survey=abbr), source="bls", timeout=120, stream=True,
+                       headers={"User-Agent": BLS_CATALOG_USER_AGENT})
+    response.encoding = response.encoding or "utf-8"
+    lines = response.iter_lines(decode_unicode=True)
+    header = [column.strip() for column in next(lines).split("\t")]
+    for line in lines:
+        if not line.strip():
+            continue
+        row = dict(zip(header, (value.strip() for value in line.split("\t"))))
+        series_id = row.get("series_id", "")
+        fields = "\n".join(f"{key.replace('_', ' ').title()}: {value}" for key, value in row.items()
+                           if value and key not in ("series_id", "series_title"))
+        text = f"""
+Series: {row.get('series_title') or series_id}
+ID: {series_id}
+Survey: {abbr.upper()}
+{fields}
+"""
+        yield {"text": text, "source": f"BLS Catalog {series_id}"}
+
+def _plan_units(fred_categories=(), fred_releases=(), bls_surveys=()) -> dict:
+    """Units of ingestion work, each a doc generator that is checkpointed and pruned as a whole."""
+    units = {"core": _core_docs, "bls_surveys": _bls_survey_list_docs}
+    for category_id in fred_categories:
+        units[f"fred_category:{category_id}"] = lambda c=category_id: _fred_listing_docs("category/series", "category_id", c)
+    for release_id in fred_releases:
+        units[f"fred_release:{release_id}"] = lambda r=release_id: _fred_listing_docs("release/series", "release_id", r)
+    for survey in bls_surveys:
+        units[f"bls_catalog:{survey.upper()}"] = lambda s=survey: _bls_catalog_docs(s)
+    return units
+
+def _load_checkpoint() -> dict:
+    try:
+        with open(CHECKPOINT_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_checkpoint(checkpoint: dict) -> None:
+    tmp_path = f"{CHECKPOINT_PATH}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, CHECKPOINT_PATH)
+
+def ingest_rag_data(force: bool = False, fred_categories=(), fred_releases=(), bls_surveys=()):
+    """Sync metadata into the local vector store.
+
+    Each unit (core notes, a FRED category/release, a BLS survey catalog) streams docs from a bounded
+    pool of fetchers into batched embedding. Only chunks whose content hash isn't stored yet get embedded,
+    a completed unit prunes its own stale chunks, and completed units are checkpointed so an interrupted
+    run resumes where it left off. Returns {unit: error message} for the units that failed.
+    """
+    units = _plan_units(fred_categories, fred_releases, bls_surveys)
     os.makedirs(DB_PATH, exist_ok=True)
-    
-    # Load existing DB and add new chunks incrementally
-    vectordb = Chroma(persist_directory=DB_PATH, embedding_function=embeddings)
-    vectordb.add_texts(texts=texts, metadatas=metadatas)
-    vectordb.persist()
-    
-    print(f"Success: RAG DB updated incrementally with {len(chunks)} new BLS/Treasury chunks (FRED preserved).")
+
+    checkpoint = _load_checkpoint()
+    vectordb = Chroma(persist_directory=DB_PATH)  # Lookups/deletes only—needs no embedding model
+    if not checkpoint:
+        legacy_ids = vectordb.get(include=[])["ids"]
+        if legacy_ids:
+            # Store predates unit-tagged chunks—rebuild it once
+            vectordb.delete(ids=legacy_ids)
+
+    completed = checkpoint.setdefault("units", {})
+    pending = {
+        name: docs_fn for name, docs_fn in units.items()
+        if force or time.time() - completed.get(name, 0) >= INGEST_TTL_SECONDS
+    }
+    if not pending:
+        print("RAG DB ingested within the last day—skipping.")
+        return {}
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
+    docs_queue = queue.Queue(maxsize=QUEUE_MAX_DOCS)
+    stop = threading.Event()
+    writer = {"db": None}
+    stats = {"new": 0, "unchanged": 0, "stale": 0}
+    failures = {}
+
+    def _put(item):
+        while not stop.is_set():
+            try:
+                docs_queue.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def _produce(name, docs_fn):
+        try:
+            for doc in docs_fn():
+                if stop.is_set():
+                    return
+                _put((name, doc))
+            _put((name, _DONE))
+        except Exception as e:
+            print(f"Warning: {name} ingestion failed: {e}")
+            failures[name] = str(e)
+            _put((name, _FAILED))
+
+    def _flush(batch):
+        batch = dict(batch)  # De-dupe identical chunks within the batch
+        if not batch:
+            return
+        existing = set(vectordb.get(ids=list(batch), include=[])["ids"])
+        new_ids = [chunk_id for chunk_id in batch if chunk_id not in existing]
+        stats["unchanged"] += len(batch) - len(new_ids)
+        if not new_ids:
+            return
+        if writer["db"] is None:
+            # Local embeddings—no API quota. Shares the retriever's process-wide model.
+            from utils.rag import get_embeddings
+            writer["db"] = Chroma(persist_directory=DB_PATH, embedding_function=get_embeddings())
+        writer["db"].add_texts(
+            texts=[batch[i][0] for i in new_ids],
+            metadatas=[batch[i][1] for i in new_ids],
+            ids=new_ids,
+        )
+        stats["new"] += len(new_ids)
+
+    def _prune(name, keep_ids):
+        stored = set(vectordb.get(where={"unit": name}, include=[])["ids"])
+        stale_ids = list(stored - keep_ids)
+        for i in range(0, len(stale_ids), EMBED_BATCH_SIZE):
+            vectordb.delete(ids=stale_ids[i:i + EMBED_BATCH_SIZE])
+        stats["stale"] += len(stale_ids)
+
+    seen = {name: set() for name in pending}
+    batch = []
+    with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as pool:
+        for name, docs_fn in pending.items():
+            pool.submit(_produce, name, docs_fn)
+        try:
+            remaining = len(pending)
+            while remaining:
+                name, item = docs_queue.get()
+                if item is _DONE or item is _FAILED:
+                    _flush(batch)
+                    batch = []
+                    if item is _DONE:
+                        _prune(name, seen[name])
+                        completed[name] = time.time()
+                        _save_checkpoint(checkpoint)
+                    del seen[name]
+                    remaining -= 1
+                    continue
+
+                for i, chunk in enumerate(splitter.split_text(item["text"])):
+                    chunk_id = _chunk_id(name, item["source"], chunk)
+                    seen[name].add(chunk_id)
+                    batch.append((chunk_id, (chunk, {"source": item["source"], "chunk_id": i, "unit": name})))
+                if len(batch) >= EMBED_BATCH_SIZE:
+                    _flush(batch)
+                    batch = []
+        finally:
+            stop.set()  # Unblock fetchers if embedding failed
+
+    if writer["db"] is not None:
+        writer["db"].persist()
+    _save_checkpoint(checkpoint)  # Marks the store as unit-tagged even if every unit failed
+
+    print(f"Success: RAG DB synced—{stats['new']} new, {stats['stale']} stale removed, {stats['unchanged']} unchanged.")
+    return failures
 
 if __name__ == "__main__":
-    ingest_rag_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build or refresh the local RAG vector store.")
+    parser.add_argument("--fred-category", type=int, action="append", default=[], help="FRED category ID (repeatable)")
+    parser.add_argument("--fred-release", type=int, action="append", default=[], help="FRED release ID (repeatable)")
+    parser.add_argument("--bls-survey", action="append", default=[], help="BLS survey abbreviation, e.g. CE (repeatable)")
+    parser.add_argument("--resume", action="store_true", help="Skip units completed within the last day")
+    args = parser.parse_args()
+    ingest_rag_data(force=not args.resume, fred_categories=args.fred_category,
+                    fred_releases=args.fred_release, bls_surveys=args.bls_survey)
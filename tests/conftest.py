@@ -0,0 +1,29 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def tmp_store(tmp_path, monkeypatch):
+    """Point the series store at an empty temp directory (and forget anything memoized from another store)."""
+    from utils import memo, store
+    monkeypatch.setattr(store, "STORE_DIR", str(tmp_path))
+    memo.clear()
+    yield tmp_path
+    memo.clear()
+
+@pytest.fixture
+def monthly_panel():
+    """Small wide frame on month-ends: trend + seasonality + noise, a later-starting column and a quarterly one."""
+    rng = np.random.default_rng(42)
+    index = pd.date_range("2005-01-31", periods=120, freq="ME")
+    t = np.arange(len(index), dtype=float)
+    trend = 100 + 0.5 * t + 3 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 0.5, len(t))
+    late = 50 + np.cumsum(rng.normal(0.1, 1.0, len(t)))
+    late[:30] = np.nan
+    quarterly = pd.Series(200 + np.cumsum(rng.normal(1.0, 2.0, len(t))), index=index)
+    quarterly[~index.month.isin([3, 6, 9, 12])] = np.nan
+    return pd.DataFrame({"trend": trend, "late": late, "quarterly": quarterly.ffill()}, index=pd.DatetimeIndex(index, name="date"))
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils import memo, store
+from utils.alignment import align_frames, align_store_series, period_grid, resample_series
+
+def _frame(dates, values):
+    return pd.DataFrame({"date": pd.to_datetime(dates), "value": np.asarray(values, dtype=float)})
+
+def test_period_grid_spans_touched_periods_with_last_nanosecond_ends():
+    starts, ends = period_grid("2020-01-15", "2020-03-01", "M")
+    assert list(starts) == list(pd.to_datetime(["2020-01-01", "2020-02-01", "2020-03-01"]))
+    assert ends[-1] == pd.Timestamp("2020-03-31 23:59:59.999999999")
+    starts, ends = period_grid("2020-02-10", "2020-11-30", "Q")
+    assert list(starts) == list(pd.to_datetime(["2020-01-01", "2020-04-01", "2020-07-01", "2020-10-01"]))
+
+@pytest.mark.parametrize("how, expected", [
+    ("eop", [3.0, 3.0, 5.0, 5.0]),         # Carried forward through the empty month
+    ("last", [3.0, np.nan, 5.0, np.nan]),
+    ("mean", [2.0, np.nan, 4.5, np.nan]),  # The NaN observation is skipped
+    ("sum", [6.0, np.nan, 9.0, np.nan]),
+])
+def test_resample_aggregations(how, expected):
+    df = _frame(["2020-01-01", "2020-01-15", "2020-01-31", "2020-03-01", "2020-03-20", "2020-03-31"],
+                [1, 2, 3, 4, np.nan, 5])
+    starts, ends = period_grid("2020-01-01", "2020-04-30", "M")
+    np.testing.assert_array_equal(resample_series(df, starts, ends, how), expected)
+
+def test_resample_rejects_unknown_aggregation():
+    starts, ends = period_grid("2020-01-01", "2020-01-31", "M")
+    with pytest.raises(ValueError):
+        resample_series(_frame(["2020-01-01"], [1]), starts, ends, "median")
+
+def test_align_frames_mixes_frequencies():
+    daily = _frame(pd.date_range("2020-01-01", "2020-03-31", freq="D"), np.arange(91))
+    quarterly = _frame(["2020-01-01"], [100])
+    wide = align_frames({"d": daily, "q": quarterly}, freq="M", how={"d": "mean"})
+    assert list(wide.columns) == ["d", "q"]
+    np.testing.assert_array_equal(wide["d"], [15.0, 45.0, 75.0])
+    np.testing.assert_array_equal(wide["q"], [100.0, 100.0, 100.0])
+    assert wide.index[-1] == pd.Timestamp("2020-03-31 23:59:59.999999999")
+
+def test_slice_range_bounds_are_inclusive():
+    df = _frame(pd.date_range("2020-01-01", periods=5, freq="D"), range(5))
+    assert list(memo.slice_range(df, "2020-01-02", "2020-01-04")["value"]) == [1.0, 2.0, 3.0]
+    assert len(memo.slice_range(df)) == 5
+    by_index = df.set_index("date")
+    assert list(memo.slice_range(by_index, end="2020-01-01", column=None)["value"]) == [0.0]
+
+def test_memo_key_follows_data_version(tmp_store):
+    store.put_series("fred", "X", _frame(["2020-01-01", "2020-02-01"], [1, 2]))
+    first = align_store_series({"x": ("fred", "X")}, persist=True)
+    calls = []
+    assert memo.get_or_compute(("probe", memo.versions([("fred", "X")])), lambda: calls.append(1) or 1) == 1
+    assert memo.get_or_compute(("probe", memo.versions([("fred", "X")])), lambda: calls.append(1) or 2) == 1
+    store.merge_series("fred", "X", _frame(["2020-03-01"], [3]))
+    assert memo.get_or_compute(("probe", memo.versions([("fred", "X")])), lambda: calls.append(1) or 3) == 3
+    assert len(calls) == 2
+    assert len(align_store_series({"x": ("fred", "X")}, persist=True)) == len(first) + 1
+    memo.clear()  # A fresh process reads the persisted panel back
+    disk_hits = memo.stats()["disk_hits"]
+    np.testing.assert_array_equal(align_store_series({"x": ("fred", "X")}, persist=True)["x"], [1.0, 2.0, 3.0])
+    assert memo.stats()["disk_hits"] == disk_hits + 1
+
+def test_memo_values_are_read_only():
+    value = memo.get_or_compute(("frozen-test",), lambda: {"a": np.arange(3.0)})
+    with pytest.raises(ValueError):
+        value["a"][0] = 1.0
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.analytics import (calculate_changes, calculate_changes_panel, detect_anomalies, detect_anomalies_panel,
+                             detect_trend, detect_trend_panel, infer_panel_frequency)
+
+def _column(wide, name):
+    return wide[[name]].reset_index().rename(columns={name: "value"})
+
+def test_infer_panel_frequency_spots_forward_filled_quarterly(monthly_panel):
+    frequency = infer_panel_frequency(monthly_panel)
+    assert frequency.loc["trend", "rows_per_period"] == 1
+    assert frequency.loc["quarterly", "rows_per_period"] == 3
+    assert frequency.loc["quarterly", "pop_label"] == "QoQ %"
+
+def test_changes_panel_matches_single_series(monthly_panel):
+    panel = calculate_changes_panel(monthly_panel)
+    for name in ("trend", "late"):
+        single, label = calculate_changes(_column(monthly_panel, name))
+        np.testing.assert_allclose(panel["yoy_pct"][name].to_numpy(), single["yoy_pct"].to_numpy(), equal_nan=True)
+        np.testing.assert_allclose(panel["pop_pct"][name].to_numpy(), single["pop_pct"].to_numpy(), equal_nan=True)
+        assert panel["pop_labels"][name] == label
+
+def test_changes_panel_quarterly_pop_is_three_rows_back(monthly_panel):
+    panel = calculate_changes_panel(monthly_panel)
+    q = monthly_panel["quarterly"]
+    expected = (q / q.shift(3) - 1) * 100
+    np.testing.assert_allclose(panel["pop_pct"]["quarterly"].to_numpy(), expected.to_numpy(), equal_nan=True)
+
+def test_anomalies_panel_matches_single_series(monthly_panel):
+    panel = detect_anomalies_panel(monthly_panel)
+    for name in monthly_panel.columns:
+        single = detect_anomalies(_column(monthly_panel, name))
+        np.testing.assert_allclose(panel["z_score"][name].to_numpy(), single["z_score"].to_numpy(), equal_nan=True)
+        assert (panel["anomaly"][name].to_numpy() == single["anomaly"].to_numpy()).all()
+
+def test_trend_panel_matches_single_series(monthly_panel):
+    panel = detect_trend_panel(monthly_panel)
+    for name in monthly_panel.columns:
+        single = detect_trend(_column(monthly_panel, name))
+        assert panel.loc[name, "recent_slope"] == pytest.approx(single["recent_slope"], rel=1e-9, abs=1e-12)
+        assert panel.loc[name, "recent_trend"] == single["recent_trend"]
+
+def test_trend_panel_with_too_few_points():
+    wide = pd.DataFrame({"a": [np.nan] * 11 + [1.0]}, index=pd.date_range("2020-01-31", periods=12, freq="ME"))
+    assert detect_trend_panel(wide).loc["a", "recent_trend"] == "Insufficient data"
@@ -0,0 +1,93 @@
+import threading
+import numpy as np
+import pandas as pd
+from utils import anomalies, store
+
+def _series(n, seed=0, start="1990-01-31"):
+    rng = np.random.default_rng(seed)
+    values = np.cumsum(rng.normal(0, 1, n))
+    values[40] = np.nan  # A missing observation holds a window slot without counting
+    return pd.DataFrame({"date": pd.date_range(start, periods=n, freq="ME"), "value": values})
+
+def _full_recompute(df):
+    rolling = df["value"].rolling(window=anomalies.WINDOW, min_periods=anomalies.MIN_PERIODS)
+    return ((df["value"] - rolling.mean()) / rolling.std()).to_numpy()
+
+def _stored_z(series_id):
+    return store.get_series("fred", f"{series_id}.zscore")["value"].to_numpy()
+
+def test_first_run_matches_rolling(tmp_store):
+    df = _series(200)
+    store.put_series("fred", "X", df)
+    anomalies.update_anomalies("fred", "X")
+    np.testing.assert_allclose(_stored_z("X"), _full_recompute(df), equal_nan=True)
+
+def test_append_matches_full_recompute(tmp_store):
+    df = _series(260)
+    store.put_series("fred", "X", df.iloc[:200])
+    anomalies.update_anomalies("fred", "X")
+    for end in (201, 230, 260):  # One row, then batches
+        store.put_series("fred", "X", df.iloc[:end])
+        anomalies.update_anomalies("fred", "X")
+        np.testing.assert_allclose(_stored_z("X"), _full_recompute(df.iloc[:end]), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+def test_revision_matches_full_recompute(tmp_store):
+    df = _series(260)
+    store.put_series("fred", "X", df.iloc[:240])
+    anomalies.update_anomalies("fred", "X")
+
+    revised = df.copy()
+    revised.loc[225:, "value"] += 5.0  # Revise recent history and append in the same refresh
+    store.put_series("fred", "X", revised)
+    anomalies.update_anomalies("fred", "X")
+    np.testing.assert_allclose(_stored_z("X"), _full_recompute(revised), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+def test_revision_older_than_tail_rebuilds(tmp_store, monkeypatch):
+    monkeypatch.setattr(anomalies, "TAIL_ROWS", 20)
+    df = _series(200)
+    store.put_series("fred", "X", df)
+    anomalies.update_anomalies("fred", "X")
+
+    revised = df.copy()
+    revised.loc[10, "value"] = 100.0
+    store.put_series("fred", "X", revised)
+    anomalies.update_anomalies("fred", "X")
+    np.testing.assert_allclose(_stored_z("X"), _full_recompute(revised), equal_nan=True)
+
+def test_concurrent_updates_of_one_series(tmp_store):
+    df = _series(300)
+    store.put_series("fred", "X", df.iloc[:150])
+    errors = []
+
+    def worker(k):
+        for r in range(15):
+            try:
+                if k == 0:
+                    store.put_series("fred", "X", df.iloc[:150 + 10 * r])
+                anomalies.update_anomalies("fred", "X")
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+    store.put_series("fred", "X", df)
+    anomalies.update_anomalies("fred", "X")
+    np.testing.assert_allclose(_stored_z("X"), _full_recompute(df), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+def test_panel_places_quarterly_anomaly_once(tmp_store):
+    dates = pd.date_range("1990-03-31", periods=120, freq="QE")
+    values = np.r_[np.linspace(0, 10, 100), 50.0, np.linspace(10, 12, 19)]
+    store.put_series("fred", "Q", pd.DataFrame({"date": dates, "value": values}))
+    anomalies.update_anomalies("fred", "Q")
+
+    index = pd.date_range("1990-01-31", "2019-12-31", freq="ME")
+    panel = anomalies.anomalies_panel({"q": ("fred", "Q")}, index)
+    flagged = panel["anomaly"]["q"]
+    assert flagged.sum() == 1
+    assert flagged.idxmax() == dates[100]
+    assert panel["z_score"]["q"][~index.month.isin([3, 6, 9, 12])].isna().all()
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from utils.bls_api import _parse_bls_response
+
+def _series(series_id, rows):
+    return {"seriesID": series_id, "data": [{"year": y, "period": p, "value": v} for y, p, v in rows]}
+
+def _response(*series):
+    return {"status": "REQUEST_SUCCEEDED", "Results": {"series": list(series)}}
+
+def _by_series(df, series_id):
+    rows = df[df["series_id"] == series_id]
+    return [d.strftime("%Y-%m-%d") for d in rows["date"]], rows["value"].to_numpy()
+
+def test_period_codes_map_to_period_starts():
+    df = _parse_bls_response(_response(
+        _series("MONTHLY", [("2023", "M13", "9.0"), ("2023", "M03", "3.0"), ("2023", "M02", "-"), ("2023", "M01", "1.0")]),
+        _series("QUARTERLY", [("2022", "Q05", "9.0"), ("2022", "Q04", "4"), ("2022", "Q03", "3"), ("2022", "Q02", "2"),
+                              ("2022", "Q01", "1")]),
+        _series("SEMI", [("2021", "S03", "9.0"), ("2021", "S02", "2"), ("2021", "S01", "1")]),
+        _series("ANNUAL", [("2021", "A01", "7"), ("2020", "A01", "6")]),
+    ))
+    dates, values = _by_series(df, "MONTHLY")
+    assert dates == ["2023-01-01", "2023-02-01", "2023-03-01"]  # M13 average dropped, sorted ascending
+    np.testing.assert_array_equal(values, [1.0, np.nan, 3.0])  # "-" (not available) becomes NaN
+    assert _by_series(df, "QUARTERLY")[0] == ["2022-01-01", "2022-04-01", "2022-07-01", "2022-10-01"]
+    assert _by_series(df, "SEMI")[0] == ["2021-01-01", "2021-07-01"]
+    dates, values = _by_series(df, "ANNUAL")
+    assert dates == ["2020-01-01", "2021-01-01"]
+    np.testing.assert_array_equal(values, [6.0, 7.0])
+
+def test_annual_averages_kept_for_annual_only_series():
+    df = _parse_bls_response(_response(_series("AVG", [("2022", "M13", "5"), ("2021", "M13", "4")])))
+    dates, values = _by_series(df, "AVG")
+    assert dates == ["2021-01-01", "2022-01-01"]
+    np.testing.assert_array_equal(values, [4.0, 5.0])
+
+def test_unknown_periods_dropped_and_empty_response():
+    df = _parse_bls_response(_response(_series("X", [("2022", "X01", "1"), ("2022", "M01", "2")])))
+    assert _by_series(df, "X")[0] == ["2022-01-01"]
+    assert _parse_bls_response(_response()).empty
+
+def test_failed_request_raises():
+    with pytest.raises(ValueError, match="BLS error"):
+        _parse_bls_response({"status": "REQUEST_NOT_PROCESSED", "message": "Daily threshold reached"})
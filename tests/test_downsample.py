@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils import memo
+from utils.downsample import METHODS, chart_series, downsample, lttb, minmax
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.arange(n, dtype=float), np.cumsum(rng.normal(0, 1, n))
+
+@pytest.mark.parametrize("method", sorted(METHODS))
+@pytest.mark.parametrize("n, n_out", [(1000, 100), (1001, 37), (50, 10), (10_000, 2000)])
+def test_output_bounded_sorted_and_keeps_endpoints(method, n, n_out):
+    x, y = _series(n)
+    idx = METHODS[method](x, y, n_out)
+    assert len(idx) <= n_out
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert np.all(np.diff(idx) > 0)
+
+def test_lttb_returns_exactly_n_out_points():
+    x, y = _series(1000)
+    assert len(lttb(x, y, 100)) == 100
+
+def test_small_inputs_are_returned_whole():
+    x, y = _series(20)
+    np.testing.assert_array_equal(lttb(x, y, 20), np.arange(20))
+    np.testing.assert_array_equal(minmax(x, y, 50), np.arange(20))
+
+def test_minmax_keeps_the_extremes():
+    x, y = _series(5000, seed=1)
+    idx = minmax(x, y, 200)
+    assert y[idx].max() == y.max() and y[idx].min() == y.min()
+
+def test_lttb_keeps_a_lone_spike():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[437] = 50.0
+    assert 437 in lttb(x, y, 50)
+
+def test_downsample_frames():
+    df = pd.DataFrame({"date": pd.date_range("2000-01-01", periods=3000, freq="D"), "value": _series(3000)[1]})
+    df.loc[5, "value"] = np.nan
+    small = df.iloc[:100]
+    assert downsample(small, max_points=200) is small  # Already small enough: untouched, NaN kept
+    out = downsample(df, max_points=300, method="minmax")
+    assert len(out) <= 300 and out["value"].notna().all()
+    assert out["date"].iloc[-1] == df["date"].iloc[-1]
+    with pytest.raises(ValueError):
+        downsample(df, method="nope")
+
+def test_chart_series_slices_then_memoizes():
+    memo.clear()
+    df = pd.DataFrame({"date": pd.date_range("2000-01-01", periods=3000, freq="D"), "value": _series(3000)[1]})
+    out = chart_series(df, ("test", "daily", 1), "2001-01-01", "2001-12-31", max_points=100)
+    assert len(out) <= 100
+    assert out["date"].iloc[0] == pd.Timestamp("2001-01-01") and out["date"].iloc[-1] == pd.Timestamp("2001-12-31")
+    hits = memo.stats()["hits"]
+    assert chart_series(df, ("test", "daily", 1), "2001-01-01", "2001-12-31", max_points=100) is out
+    assert memo.stats()["hits"] == hits + 1
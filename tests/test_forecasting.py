@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.analytics import forecast_linear
+from utils.forecasting import MODELS, backtest, best_models, forecast, season_length
+
+def _frame(values, start="2010-01-31", freq="ME"):
+    return pd.DataFrame({"date": pd.date_range(start, periods=len(values), freq=freq), "value": values})
+
+def _wide(columns, start="2010-01-31"):
+    n = len(next(iter(columns.values())))
+    return pd.DataFrame(columns, index=pd.DatetimeIndex(pd.date_range(start, periods=n, freq="ME"), name="date"))
+
+@pytest.mark.parametrize("model", list(MODELS))
+def test_every_model_forecasts(model, monthly_panel):
+    df = monthly_panel[["trend"]].reset_index().rename(columns={"trend": "value"})
+    out = forecast(df, model, periods=12)
+    assert list(out.columns) == ["date", "yhat", "yhat_lower", "yhat_upper"]
+    assert len(out) == 12 and out["date"].iloc[0] > df["date"].iloc[-1]
+    assert np.isfinite(out[["yhat", "yhat_lower", "yhat_upper"]].to_numpy()).all()
+    assert (out["yhat_lower"] < out["yhat"]).all() and (out["yhat"] < out["yhat_upper"]).all()
+    assert (out["yhat_upper"] - out["yhat_lower"]).iloc[-1] >= (out["yhat_upper"] - out["yhat_lower"]).iloc[0]
+
+def test_linear_matches_forecast_linear(monthly_panel):
+    df = monthly_panel[["trend"]].reset_index().rename(columns={"trend": "value"})
+    ours, reference = forecast(df, "linear"), forecast_linear(df)
+    np.testing.assert_allclose(ours["yhat"], reference["yhat"], rtol=1e-9)
+    np.testing.assert_allclose(ours["yhat_upper"], reference["yhat_upper"], rtol=1e-6)
+
+def test_models_recover_exact_patterns():
+    t = np.arange(60, dtype=float)
+    line = _frame(5 + 2 * t)
+    future = 5 + 2 * np.arange(60, 72)
+    for model in ("linear", "ar", "holt_winters"):
+        np.testing.assert_allclose(forecast(line, model)["yhat"], future, rtol=1e-6, atol=1e-6)
+
+    seasonal = _frame(np.tile(np.arange(12, dtype=float), 5))
+    np.testing.assert_allclose(forecast(seasonal, "seasonal_naive")["yhat"], np.arange(12, dtype=float))
+
+def test_forecast_needs_history():
+    with pytest.raises(ValueError):
+        forecast(_frame(np.arange(8.0)), "ar")
+
+def test_season_length():
+    assert season_length(pd.date_range("2000-01-31", periods=24, freq="ME")) == 12
+    assert season_length(pd.date_range("2000-03-31", periods=12, freq="QE")) == 4
+    assert season_length(pd.date_range("2000-12-31", periods=10, freq="YE")) is None
+
+def test_backtest_scores_every_series_and_model(monthly_panel):
+    metrics = backtest(monthly_panel, horizon=6, origins=5, window=48)
+    assert len(metrics) == len(monthly_panel.columns) * len(MODELS)
+    assert set(metrics["model"]) == set(MODELS)
+    assert (metrics["origins"] == 5).all()
+    assert (metrics[["mae", "rmse"]] >= 0).all().all() and (metrics["rmse"] >= metrics["mae"]).all()
+
+def test_backtest_matches_one_origin_by_hand():
+    rng = np.random.default_rng(3)
+    wide = _wide({"x": np.cumsum(rng.normal(0, 1, 80)) + 100})
+    metrics = backtest(wide, models=["linear"], horizon=4, origins=1, window=30)
+    values = wide["x"].to_numpy()
+    train, actual = values[-34:-4], values[-4:]
+    yhat = forecast(_frame(train), "linear", periods=4)["yhat"].to_numpy()
+    assert metrics.loc[0, "mae"] == pytest.approx(np.abs(yhat - actual).mean(), rel=1e-9)
+
+def test_backtest_skips_windows_with_gaps_and_picks_best():
+    t = np.arange(96, dtype=float)
+    seasonal = 10 + np.tile(np.arange(12, dtype=float), 8)
+    gappy = seasonal.copy()
+    gappy[-8] = np.nan  # Touches the last origins' test windows
+    metrics = backtest(_wide({"seasonal": seasonal, "gappy": gappy, "line": 1 + 0.5 * t}),
+                       horizon=6, origins=4, window=48)
+    by = metrics.set_index(["series", "model"])
+    assert by.loc[("seasonal", "seasonal_naive"), "rmse"] == pytest.approx(0.0, abs=1e-9)
+    assert by.loc[("gappy", "seasonal_naive"), "origins"] < 4
+    best = best_models(metrics)
+    assert best["seasonal"] in ("seasonal_naive", "holt_winters")  # Both reproduce a pure season exactly
+    assert best["line"] in ("linear", "ar", "holt_winters")
+
+def test_backtest_needs_history():
+    with pytest.raises(ValueError):
+        backtest(_wide({"x": np.arange(20.0)}), horizon=12, origins=12)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.scenarios import bootstrap_fan, fit_panel, scenario_frame, shock_grid
+
+def _shocked(wide, shocks):
+    """wide with each column's latest observation scaled by (1 + shock / 100)."""
+    out = wide.copy()
+    for name, shock in zip(wide.columns, shocks):
+        last = out[name].last_valid_index()
+        out.loc[last, name] *= 1 + shock / 100
+    return out
+
+def test_closed_form_shock_equals_refit(monthly_panel):
+    fit = fit_panel(monthly_panel)
+    shocks = np.array([[-20.0, 5.0, 0.0], [0.0, 0.0, 0.0], [12.5, -7.5, 30.0]])  # Joint shocks, one row per scenario
+    grid = shock_grid(fit, shocks, periods=12)
+    for s, row in enumerate(shocks):
+        refit = fit_panel(_shocked(monthly_panel, row))
+        np.testing.assert_allclose(grid["slope"][s], refit["slope"], rtol=1e-9)
+        np.testing.assert_allclose(grid["intercept"][s], refit["intercept"], rtol=1e-9)
+        np.testing.assert_allclose(grid["sse"][s], refit["sse"], rtol=1e-7)
+        future_x = np.arange(refit["rows"], refit["rows"] + 12)
+        expected = refit["intercept"][:, None] + refit["slope"][:, None] * future_x[None, :]
+        np.testing.assert_allclose(grid["yhat"][s], expected, rtol=1e-9)
+
+def test_scenario_frame_single_column(monthly_panel):
+    frame = scenario_frame(monthly_panel, "late", [-10.0, 0.0, 10.0], periods=6)
+    assert list(frame.columns) == [-10.0, 0.0, 10.0]
+    assert len(frame) == 6 and frame.index[0] > monthly_panel.index[-1]
+    refit = fit_panel(_shocked(monthly_panel, [0.0, 10.0, 0.0]))
+    j = refit["columns"].index("late")
+    x = refit["rows"] + 5
+    assert frame[10.0].iloc[-1] == pytest.approx(refit["intercept"][j] + refit["slope"][j] * x, rel=1e-9)
+    assert (frame[10.0] > frame[-10.0]).all()  # Shocking the latest value up lifts the fitted trend
+
+def test_bootstrap_fan_is_ordered_and_centered(monthly_panel):
+    fan = bootstrap_fan(monthly_panel, "trend", periods=12, n_paths=2000, seed=1)
+    assert list(fan.columns) == [0.05, 0.25, 0.5, 0.75, 0.95]
+    assert (fan.diff(axis=1).iloc[:, 1:] >= 0).all().all()
+    fit = fit_panel(monthly_panel)
+    future_x = np.arange(fit["rows"], fit["rows"] + 12)
+    point = fit["intercept"][0] + fit["slope"][0] * future_x
+    spread = (fan[0.95] - fan[0.05]).to_numpy()
+    assert np.all(np.abs(fan[0.5].to_numpy() - point) < 0.25 * spread)
+    pd.testing.assert_frame_equal(fan, bootstrap_fan(monthly_panel, "trend", periods=12, n_paths=2000, seed=1))
+
+def test_bootstrap_fan_needs_history():
+    wide = pd.DataFrame({"a": [1.0, 2.0]}, index=pd.date_range("2020-01-31", periods=2, freq="ME"))
+    with pytest.raises(ValueError):
+        bootstrap_fan(wide, "a")
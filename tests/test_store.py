@@ -0,0 +1,63 @@
+import os
+import numpy as np
+import pandas as pd
+from utils import store
+
+def _frame(dates, values):
+    return pd.DataFrame({"date": pd.to_datetime(dates), "value": np.asarray(values, dtype=float)})
+
+def test_round_trip_sorts_and_types(tmp_store):
+    store.put_series("fred", "X", _frame(["2020-03-01", "2020-01-01", "2020-02-01"], [3, 1, np.nan]))
+    df = store.get_series("fred", "X")
+    assert list(df["date"]) == list(pd.to_datetime(["2020-01-01", "2020-02-01", "2020-03-01"]))
+    np.testing.assert_array_equal(df["value"].to_numpy(), [1.0, np.nan, 3.0])
+    assert df["date"].dtype == "datetime64[ns]" and df["value"].dtype == "float64"
+    assert store.last_date("fred", "X") == pd.Timestamp("2020-03-01")
+
+def test_missing_and_empty_series(tmp_store):
+    assert store.get_series("fred", "nope") is None
+    assert store.last_date("fred", "nope") is None
+    store.put_series("fred", "empty", _frame([], []))
+    assert store.get_series("fred", "empty").empty
+    assert store.last_date("fred", "empty") is None
+
+def test_range_bounds_are_inclusive(tmp_store):
+    store.put_series("fred", "X", _frame(pd.date_range("2020-01-01", periods=10, freq="D"), range(10)))
+    df = store.get_series("fred", "X", start="2020-01-03", end="2020-01-05")
+    assert list(df["value"]) == [2.0, 3.0, 4.0]
+
+def test_merge_appends_and_revisions_win(tmp_store):
+    store.put_series("fred", "X", _frame(["2020-01-01", "2020-02-01", "2020-03-01"], [1, 2, 3]))
+    store.merge_series("fred", "X", _frame(["2020-03-01", "2020-04-01"], [30, 4]))
+    assert list(store.get_series("fred", "X")["value"]) == [1.0, 2.0, 30.0, 4.0]
+    # Rows on/after `since` missing from the fetch are dropped (the source withdrew them)
+    store.merge_series("fred", "X", _frame(["2020-04-01"], [40]), since="2020-02-01")
+    assert list(store.get_series("fred", "X")["value"]) == [1.0, 40.0]
+
+def test_merge_into_missing_series_stores_it(tmp_store):
+    store.merge_series("bls", "Y", _frame(["2021-01-01"], [5]))
+    assert list(store.get_series("bls", "Y")["value"]) == [5.0]
+
+def test_version_survives_no_op_refresh(tmp_store):
+    store.put_series("treasury", "debt", _frame(["2020-01-01", "2020-02-01"], [1, 2]))
+    version = store.data_version("treasury", "debt")
+    os.utime(os.path.join(tmp_store, "treasury", "debt.npy"), (0, 0))  # Written long ago
+    assert store.age_seconds("treasury", "debt") > 1e6
+    store.touch("treasury", "debt")
+    assert store.age_seconds("treasury", "debt") < 60
+    assert store.data_version("treasury", "debt") == version
+    store.merge_series("treasury", "debt", _frame(["2020-02-01"], [2]))  # Re-fetched rows, nothing new
+    assert store.data_version("treasury", "debt") == version
+
+def test_version_changes_on_real_write(tmp_store):
+    store.put_series("fred", "X", _frame(["2020-01-01"], [1]))
+    version = store.data_version("fred", "X")
+    store.merge_series("fred", "X", _frame(["2020-02-01"], [2]))
+    appended = store.data_version("fred", "X")
+    store.merge_series("fred", "X", _frame(["2020-02-01"], [2.5]))  # Revision of the same row
+    assert len({version, appended, store.data_version("fred", "X")}) == 3
+    assert store.data_version("fred", "nope") is None
+
+def test_touch_ignores_missing_series(tmp_store):
+    store.touch("fred", "nope")
+    assert store.age_seconds("fred", "nope") is None
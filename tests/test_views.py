@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from utils import store
+from utils.anomalies import update_anomalies
+from utils.views import build_view, get_view, range_bounds
+
+def _put_monthly(source, series_id, start="2015-01-01", periods=120):
+    dates = pd.date_range(start, periods=periods, freq="MS")
+    store.put_series(source, series_id, pd.DataFrame({"date": dates, "value": np.arange(periods, dtype=float)}))
+
+def test_range_bounds_cover_whole_years():
+    start, end = range_bounds(2020, 2022)
+    assert start == pd.Timestamp("2020-01-01")
+    assert end == pd.Timestamp("2022-12-31 23:59:59.999999999")
+
+def test_view_keeps_the_final_month(tmp_store):
+    _put_monthly("fred", "A")
+    view = build_view({"a": ("fred", "A")}, *range_bounds(2020, 2022))
+    index = view["merged_df"].index
+    assert len(index) == 36
+    assert index[0].to_period("M") == pd.Period("2020-01", "M")
+    assert index[-1].to_period("M") == pd.Period("2022-12", "M")
+    assert view["analytics"]["z_score"].index[-1] == index[-1]
+
+def test_view_picks_up_zscores_written_after_the_series(tmp_store):
+    _put_monthly("fred", "A")
+    specs = {"a": ("fred", "A")}
+    bounds = range_bounds(2016, 2024)
+    assert get_view(specs, *bounds)["analytics"]["z_score"]["a"].isna().all()  # Series written, z-scores not yet
+    update_anomalies("fred", "A")
+    assert get_view(specs, *bounds)["analytics"]["z_score"]["a"].notna().any()
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+from utils import memo, perf
+
+# Resample mixed-frequency series straight onto a common period grid. Each target period only
+# binary-searches its boundaries in the source dates, so "last"/"eop" cost O(periods * log points)
+# regardless of how many daily observations a series has; "mean"/"sum" add one cumulative sum.
+FREQUENCIES = {"W": "W", "M": "M", "Q": "Q", "A": "Y"}
+AGGREGATIONS = ("last", "eop", "mean", "sum")
+
+def period_grid(start, end, freq: str = "M") -> tuple[pd.DatetimeIndex, pd.DatetimeIndex]:
+    """(period starts, period ends) of every `freq` period touching [start, end].
+
+    Ends are the last nanosecond of each period, matching Period.to_timestamp(how="end").
+    """
+    periods = pd.period_range(start=pd.Timestamp(start).to_period(FREQUENCIES[freq]),
+                              end=pd.Timestamp(end).to_period(FREQUENCIES[freq]), freq=FREQUENCIES[freq])
+    return periods.to_timestamp(how="start"), periods.to_timestamp(how="end")
+
+def resample_series(df: pd.DataFrame, starts: pd.DatetimeIndex, ends: pd.DatetimeIndex, how: str = "eop") -> np.ndarray:
+    """Aggregate a sorted date/value frame onto the periods [starts[i], ends[i]].
+
+    last: last observation inside the period (NaN if none)
+    eop:  last observation on or before the period end, i.e. carried forward (NaN before the first one)
+    mean/sum: over the observations inside the period (NaN if none)
+    """
+    if how not in AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation: {how}")
+    dates = df["date"].to_numpy(dtype="datetime64[ns]")
+    values = df["value"].to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    if not valid.all():
+        dates, values = dates[valid], values[valid]
+
+    hi = np.searchsorted(dates, ends.to_numpy(dtype="datetime64[ns]"), side="right")
+    out = np.full(len(ends), np.nan)
+    if how == "eop":
+        has = hi > 0
+        out[has] = values[hi[has] - 1]
+        return out
+
+    lo = np.searchsorted(dates, starts.to_numpy(dtype="datetime64[ns]"), side="left")
+    count = hi - lo
+    has = count > 0
+    if how == "last":
+        out[has] = values[hi[has] - 1]
+        return out
+
+    cumsum = np.concatenate([[0.0], np.cumsum(values)])
+    totals = cumsum[hi] - cumsum[lo]
+    out[has] = totals[has] if how == "sum" else totals[has] / count[has]
+    return out
+
+@perf.timed()
+def align_frames(frames: dict, freq: str = "M", how="eop", start=None, end=None) -> pd.DataFrame:
+    """Align {name: date/value frame} onto one `freq` grid; `how` is one aggregation or {name: aggregation}.
+
+    The grid spans the earliest to the latest observation across all frames (clipped to [start, end]).
+    Returns a frame indexed by period end (named "date") with one column per name, in the given order.
+    """
+    frames = {name: df.sort_values("date") if not df["date"].is_monotonic_increasing else df
+              for name, df in frames.items()}
+    non_empty = [df for df in frames.values() if not df.empty]
+    if not non_empty:
+        return pd.DataFrame(columns=list(frames), index=pd.DatetimeIndex([], name="date"), dtype=float)
+
+    first = min(df["date"].iloc[0] for df in non_empty)
+    last = max(df["date"].iloc[-1] for df in non_empty)
+    if start is not None:
+        first = max(first, pd.Timestamp(start))
+    if end is not None:
+        last = min(last, pd.Timestamp(end))
+    starts, ends = period_grid(first, last, freq)
+
+    columns = {}
+    for name, df in frames.items():
+        agg = how.get(name, "eop") if isinstance(how, dict) else how
+        columns[name] = resample_series(df, starts, ends, agg)
+    return pd.DataFrame(columns, index=pd.DatetimeIndex(ends, name="date"))
+
+@perf.timed()
+def align_store_series(specs: dict, freq: str = "M", how="eop", start=None, end=None,
+                       persist: bool = False) -> pd.DataFrame:
+    """align_frames over stored series, memoized by (series set, range, frequency, aggregation, data version).
+
+    specs maps column name to (source, series_id). Any rewrite of a stored series changes its version
+    and misses the memo, so callers always see current data. persist=True also uses the memo's disk layer.
+    """
+    spec_items = tuple((name, tuple(spec)) for name, spec in specs.items())
+    how_map = how if isinstance(how, dict) else {name: how for name in specs}
+    start = None if start is None else pd.Timestamp(start)
+    end = None if end is None else pd.Timestamp(end)
+    key = ("aligned", spec_items, memo.versions(specs.values()), freq, tuple(sorted(how_map.items())), start, end)
+
+    def _align():
+        frames = {name: memo.get_series(source, series_id, start, end) for name, (source, series_id) in spec_items}
+        missing = [name for name, df in frames.items() if df is None]
+        if missing:
+            raise ValueError(f"Not in the local store: {', '.join(missing)}")
+        return align_frames(frames, freq, how_map, start, end)
+
+    return memo.get_or_compute(key, _align, persist=persist).copy()
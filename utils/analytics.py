@@ -1,8 +1,31 @@
 import pandas as pd
 import numpy as np
-from scipy.stats import linregress
 import streamlit as st
+from statistics import NormalDist
+from utils import perf
 
+def linregress(x, y) -> tuple[float, float, float, float, float]:
+    """OLS fit of y on x: (slope, intercept, r_value, p_value, std_err).
+
+    Same results as scipy.stats.linregress, in plain NumPy so importing analytics doesn't pull in scipy.stats
+    (the slowest import on every page). p_value is not computed and is returned as NaN.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    xm = x - x.mean()
+    ym = y - y.mean()
+    ssxm = np.dot(xm, xm)
+    ssym = np.dot(ym, ym)
+    ssxym = np.dot(xm, ym)
+
+    slope = ssxym / ssxm
+    intercept = y.mean() - slope * x.mean()
+    r = 0.0 if ssxm == 0 or ssym == 0 else float(np.clip(ssxym / np.sqrt(ssxm * ssym), -1.0, 1.0))
+    std_err = 0.0 if n <= 2 else float(np.sqrt((1 - r ** 2) * ssym / ssxm / (n - 2)))
+    return slope, intercept, r, np.nan, std_err
+
+@perf.timed()
 def calculate_changes(df: pd.DataFrame) -> tuple[pd.DataFrame, str]:
     df = df.copy().sort_values("date")
     
@@ -24,6 +47,7 @@ def calculate_changes(df: pd.DataFrame) -> tuple[pd.DataFrame, str]:
     
     return df, pop_label
 
+@perf.timed()
 def detect_trend(df: pd.DataFrame, window: int = 12) -> dict:
     df = df.copy().sort_values("date")
     recent = df.tail(window)
@@ -41,6 +65,7 @@ def detect_trend(df: pd.DataFrame, window: int = 12) -> dict:
         "recent_slope": slope
     }
 
+@perf.timed()
 def detect_anomalies(df: pd.DataFrame, window: int = 36, threshold: float = 2.5) -> pd.DataFrame:
     df = df.copy()
     rolling = df["value"].rolling(window=window, min_periods=12)
@@ -52,6 +77,250 @@ def detect_anomalies(df: pd.DataFrame, window: int = 36, threshold: float = 2.5)
     
     return df
 
+# --- Whole-panel versions: operate on the wide, date-indexed frame (one column per series) ---
+
+_POP_LABELS = {365: "DoD %", 261: "DoD %", 252: "DoD %", 52: "WoW %", 12: "MoM %", 4: "QoQ %", 1: "YoY %"}
+
+def _rows_per_year(index: pd.DatetimeIndex) -> int:
+    """Rows per year of a date index (monthly index -> 12, quarterly -> 4, business-daily -> ~261)."""
+    if len(index) < 2:
+        return 12
+    days = np.median(np.diff(index.values).astype("timedelta64[s]").astype(float)) / 86400
+    if days > 300:
+        return 1
+    if days > 60:
+        return 4
+    if days > 20:
+        return 12
+    if days > 5:
+        return 52
+    span_days = (index[-1] - index[0]).days
+    return max(1, int(round((len(index) - 1) * 365.25 / span_days)))
+
+@perf.timed()
+def infer_panel_frequency(wide: pd.DataFrame) -> pd.DataFrame:
+    """Native frequency of every column, even after alignment to a common index.
+
+    A forward-filled quarterly series on a monthly index changes roughly every 3rd row, so rows per native
+    period is estimated from how often each column's value actually changes (snapped to 1/3/12 on a
+    monthly index). Returns a frame indexed by column with rows_per_period, periods_per_year and pop_label.
+    """
+    rows_per_year = _rows_per_year(wide.index)
+    values = wide.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    changed = np.zeros_like(valid)
+    changed[1:] = valid[1:] & (values[1:] != values[:-1])
+    changed[0] = valid[0]
+
+    raw = valid.sum(axis=0) / np.maximum(changed.sum(axis=0), 1)
+    candidates = np.array([1, 3, 12] if rows_per_year == 12 else [1])
+    rows_per_period = candidates[np.abs(raw[:, None] - candidates[None, :]).argmin(axis=1)]
+    periods_per_year = rows_per_year // rows_per_period
+
+    return pd.DataFrame({
+        "rows_per_period": rows_per_period,
+        "periods_per_year": periods_per_year,
+        "pop_label": [_POP_LABELS.get(p, "PoP %") for p in periods_per_year],
+    }, index=wide.columns)
+
+def _lagged(values: np.ndarray, shifts: np.ndarray) -> np.ndarray:
+    """values shifted down by a per-column number of rows (NaN where the lag runs off the top)."""
+    rows = np.arange(values.shape[0])[:, None] - shifts[None, :]
+    out = values[np.clip(rows, 0, None), np.arange(values.shape[1])[None, :]]
+    out[rows < 0] = np.nan
+    return out
+
+@perf.timed()
+def calculate_changes_panel(wide: pd.DataFrame, frequency: pd.DataFrame | None = None) -> dict:
+    """YoY and period-over-period % change for every column in one pass.
+
+    YoY compares against the same date a year earlier on the frame's index; PoP compares against the previous
+    native period of each column (e.g. 3 rows back for quarterly GDP on a monthly index).
+    Returns {"yoy_pct": DataFrame, "pop_pct": DataFrame, "pop_labels": {column: label}}.
+    """
+    if frequency is None:
+        frequency = infer_panel_frequency(wide)
+    values = wide.to_numpy(dtype=float)
+    yoy_shift = np.full(values.shape[1], _rows_per_year(wide.index))
+    pop_shift = frequency["rows_per_period"].to_numpy()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        yoy = (values / _lagged(values, yoy_shift) - 1) * 100
+        pop = (values / _lagged(values, pop_shift) - 1) * 100
+
+    return {
+        "yoy_pct": pd.DataFrame(yoy, index=wide.index, columns=wide.columns),
+        "pop_pct": pd.DataFrame(pop, index=wide.index, columns=wide.columns),
+        "pop_labels": frequency["pop_label"].to_dict(),
+    }
+
+@perf.timed()
+def detect_anomalies_panel(wide: pd.DataFrame, window: int = 36, threshold: float = 2.5) -> dict:
+    """Rolling z-scores and anomaly flags for every column (same rule as detect_anomalies).
+
+    Returns {"z_score": DataFrame, "anomaly": DataFrame of bools}.
+    """
+    rolling = wide.rolling(window=window, min_periods=12)
+    z_score = (wide - rolling.mean()) / rolling.std()
+    return {"z_score": z_score, "anomaly": z_score.abs() > threshold}
+
+@perf.timed()
+def detect_trend_panel(wide: pd.DataFrame, window: int = 12) -> pd.DataFrame:
+    """OLS slope and R² over the last `window` rows of every column, NaN-aware, in closed form.
+
+    Returns a frame indexed by column with recent_slope, r_squared and recent_trend (same labels as detect_trend).
+    """
+    recent = wide.tail(window).to_numpy(dtype=float)
+    mask = ~np.isnan(recent)
+    y = np.where(mask, recent, 0.0)
+    x = np.arange(recent.shape[0], dtype=float)[:, None] * mask
+    n = mask.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = x.sum(axis=0) / n
+        y_mean = y.sum(axis=0) / n
+        dx = (x - x_mean) * mask
+        dy = (y - y_mean) * mask
+        sxx = (dx * dx).sum(axis=0)
+        syy = (dy * dy).sum(axis=0)
+        sxy = (dx * dy).sum(axis=0)
+        slope = sxy / sxx
+        r_squared = np.where((sxx > 0) & (syy > 0), sxy ** 2 / (sxx * syy), 0.0)
+
+    direction = np.where(slope > 0, "upward", np.where(slope < 0, "downward", "flat"))
+    labels = [f"{d} (R²={r2:.2f})" if count >= 2 else "Insufficient data"
+              for d, r2, count in zip(direction, r_squared, n)]
+    return pd.DataFrame({
+        "recent_slope": np.where(n >= 2, slope, 0.0),
+        "r_squared": r_squared,
+        "recent_trend": labels,
+    }, index=wide.columns)
+
+# --- Lead/lag: cross-correlation of every pair of columns over a lag range ---
+
+def _next_pow2(n: int) -> int:
+    return 1 << max(0, int(n - 1).bit_length())
+
+def _xcorr(u_hat: np.ndarray, v_hat: np.ndarray, size: int, lags: np.ndarray) -> np.ndarray:
+    """sum_t u[t] * v[t + lag] for every lag, from the rFFTs of u and v (rows are pairs)."""
+    full = np.fft.irfft(np.conj(u_hat) * v_hat, n=size, axis=-1)
+    return full[..., lags % size]
+
+@st.cache_data(show_spinner=False, max_entries=32)
+@perf.timed()
+def cross_correlation_panel(wide: pd.DataFrame, max_lag: int = 36, min_periods: int = 12) -> dict:
+    """Pearson correlation of every column pair at every lag in [-max_lag, max_lag], via FFT.
+
+    corr at lag k is corr(a[t], b[t + k]) over rows where both are present (same as a.corr(b.shift(-k))),
+    so k > 0 means a leads b by k rows. Lags with fewer than min_periods overlapping rows are NaN.
+    Cached per data version (Streamlit hashes the frame's contents).
+    Returns {"lags": array, "matrix": DataFrame (pair (a, b) x lag), "best": DataFrame per pair with the
+    lag of largest |corr|, its corr and a "leader" column}.
+    """
+    columns = list(wide.columns)
+    lags = np.arange(-max_lag, max_lag + 1)
+    pairs = [(i, j) for i in range(len(columns)) for j in range(i + 1, len(columns))]
+    pair_index = pd.MultiIndex.from_tuples([(columns[i], columns[j]) for i, j in pairs], names=["a", "b"])
+    if not pairs:
+        return {"lags": lags, "matrix": pd.DataFrame(index=pair_index, columns=lags, dtype=float),
+                "best": pd.DataFrame(index=pair_index, columns=["lag", "corr", "leader"])}
+
+    values = wide.to_numpy(dtype=float).T  # column x time
+    mask = ~np.isnan(values)
+    # Standardize first: correlation is unchanged and the windowed sums stay well conditioned
+    with np.errstate(invalid="ignore"):
+        centered = (values - np.nanmean(values, axis=1, keepdims=True)) / np.nanstd(values, axis=1, keepdims=True)
+    x = np.where(mask, centered, 0.0)
+    x = np.where(np.isfinite(x), x, 0.0)
+
+    # Zero padding past max_lag is enough: wrapped-around terms are all zero for the lags we keep
+    size = _next_pow2(values.shape[1] + max_lag)
+    m_hat = np.fft.rfft(mask.astype(float), n=size)
+    x_hat = np.fft.rfft(x, n=size)
+    x2_hat = np.fft.rfft(x * x, n=size)
+
+    i, j = (np.array(idx) for idx in zip(*pairs))
+    n = np.rint(_xcorr(m_hat[i], m_hat[j], size, lags))
+    sum_a = _xcorr(x_hat[i], m_hat[j], size, lags)
+    sum_b = _xcorr(m_hat[i], x_hat[j], size, lags)
+    sum_aa = _xcorr(x2_hat[i], m_hat[j], size, lags)
+    sum_bb = _xcorr(m_hat[i], x2_hat[j], size, lags)
+    sum_ab = _xcorr(x_hat[i], x_hat[j], size, lags)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * sum_ab - sum_a * sum_b
+        var = (n * sum_aa - sum_a ** 2) * (n * sum_bb - sum_b ** 2)
+        corr = np.clip(cov / np.sqrt(np.where(var > 0, var, np.nan)), -1.0, 1.0)
+    corr[n < max(min_periods, 2)] = np.nan
+
+    matrix = pd.DataFrame(corr, index=pair_index, columns=lags)
+    has_any = ~np.isnan(corr).all(axis=1)
+    best_pos = np.nanargmax(np.where(np.isnan(corr), -1.0, np.abs(corr)), axis=1)
+    best_lag = np.where(has_any, lags[best_pos], 0)
+    best_corr = np.where(has_any, corr[np.arange(len(pairs)), best_pos], np.nan)
+    leader = [a if lag > 0 else b if lag < 0 else "coincident" for (a, b), lag in zip(pair_index, best_lag)]
+    best = pd.DataFrame({"lag": best_lag, "corr": best_corr, "leader": leader}, index=pair_index)
+    return {"lags": lags, "matrix": matrix, "best": best}
+
+def lead_lag_note(result: dict, a: str, b: str, labels: tuple[str, str] | None = None,
+                  show_lags: int = 3, unit: str = "mo") -> str:
+    """Text summary of one pair from cross_correlation_panel: r at lags -show_lags..show_lags plus the best lag."""
+    label_a, label_b = labels or (a, b)
+    if (a, b) in result["matrix"].index:
+        row, sign = result["matrix"].loc[(a, b)], 1
+    else:
+        row, sign = result["matrix"].loc[(b, a)], -1
+
+    def corr_at(lag):
+        return row.get(sign * lag, np.nan)
+
+    def describe(lag):
+        if lag > 0:
+            return f"{label_a} leads {label_b} by {lag} {unit}"
+        if lag < 0:
+            return f"{label_b} leads {label_a} by {-lag} {unit}"
+        return "Coincident"
+
+    lines = [f"{describe(lag)}: r={corr_at(lag):.2f}" for lag in range(-show_lags, show_lags + 1)]
+    scan = pd.Series({lag: corr_at(lag) for lag in sign * row.index.to_numpy()}).dropna()
+    if not scan.empty:
+        best_lag = int(scan.abs().idxmax())
+        lines.append(f"Strongest (±{int(row.index.max())} {unit} scan): {describe(best_lag)}, r={scan[best_lag]:.2f}")
+    return "\n".join(lines)
+
+def t_quantile(p: float, dof: float) -> float:
+    """Student-t quantile via the Cornish-Fisher expansion around the normal quantile (stdlib only, no scipy)."""
+    z = NormalDist().inv_cdf(p)
+    if not np.isfinite(dof) or dof <= 0:
+        return z
+    g1 = (z ** 3 + z) / 4
+    g2 = (5 * z ** 5 + 16 * z ** 3 + 3 * z) / 96
+    g3 = (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / 384
+    g4 = (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / 92160
+    return z + g1 / dof + g2 / dof ** 2 + g3 / dof ** 3 + g4 / dof ** 4
+
+def _date_step(dates: pd.Series) -> pd.DateOffset:
+    """Calendar step between observations: business/calendar days, weeks, or 1/3/12 months (month-end aware)."""
+    last_date = dates.iloc[-1]
+    diffs = dates.diff().dt.days.median()
+    if np.isnan(diffs):
+        diffs = 30
+    if diffs <= 3:
+        weekdays_only = (pd.DatetimeIndex(dates).dayofweek < 5).all()
+        return pd.offsets.BDay() if weekdays_only else pd.offsets.Day()
+    if diffs <= 10:
+        return pd.offsets.Week(weekday=last_date.dayofweek)
+    months = 1 if diffs < 60 else 3 if diffs < 200 else 12
+    return pd.offsets.MonthEnd(months) if last_date.is_month_end else pd.DateOffset(months=months)
+
+def future_dates(dates: pd.Series, periods: int) -> pd.DatetimeIndex:
+    """The next `periods` dates after a sorted date column, stepping like the data (daily through annual)."""
+    dates = pd.Series(pd.to_datetime(dates)).reset_index(drop=True)
+    last_date = dates.iloc[-1]
+    step = _date_step(dates)
+    return pd.DatetimeIndex([last_date + step * k for k in range(1, periods + 1)])
+
+@perf.timed()
 def forecast_linear(df: pd.DataFrame, periods: int = 12) -> pd.DataFrame:
     """Linear trend extrapolation forecast with OLS prediction interval."""
     if len(df) < 12:
@@ -66,27 +335,23 @@ def forecast_linear(df: pd.DataFrame, periods: int = 12) -> pd.DataFrame:
     future_x = np.arange(len(df), len(df) + periods)
     yhat = slope * future_x + intercept
     
-    # Prediction interval (95%)
+    # Prediction interval (95%): residual variance, not the slope's standard error, with a t quantile for n-2 dof
     mean_x = x.mean()
     n = len(x)
-    t = 1.96  # Approx for large n
-    pred_var = std_err**2 * (1 + 1/n + (future_x - mean_x)**2 / np.sum((x - mean_x)**2))
+    sxx = np.sum((x - mean_x)**2)
+    resid_var = std_err**2 * sxx  # std_err = s / sqrt(Sxx)
+    t = t_quantile(0.975, n - 2)
+    pred_var = resid_var * (1 + 1/n + (future_x - mean_x)**2 / sxx)
     conf = t * np.sqrt(pred_var)
     
     yhat_lower = yhat - conf
     yhat_upper = yhat + conf
     
-    # Future dates
-    last_date = df["date"].iloc[-1]
-    diffs = df["date"].diff().dt.days.median()
-    freq = 'MS' if diffs < 60 else 'QS'
-    future_dates = pd.date_range(start=last_date + pd.DateOffset(months=1 if diffs < 60 else 3), periods=periods, freq=freq)
-    
     forecast_df = pd.DataFrame({
-        "date": future_dates,
+        "date": future_dates(df["date"], periods),
         "yhat": yhat,
         "yhat_lower": yhat_lower,
         "yhat_upper": yhat_upper
     })
     
-    return forecast_df
\ No newline at end of file
+    return forecast_df
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+from utils import store
+
+# Rolling z-score anomaly detection kept up to date incrementally. Next to each stored series we keep
+# its z-scores (as the "<id>.zscore" store series) and a small JSON state: the windowed Welford
+# statistics plus the tail of values they were computed from, so an append only touches the new rows.
+# The window counts observations at the series' own frequency (36 days, months or quarters), not calendar time.
+WINDOW = 36
+MIN_PERIODS = 12
+THRESHOLD = 2.5
+TAIL_ROWS = 512  # Recent values kept in the state to detect revisions (covers FRED's 180-day window for daily data)
+
+_locks_guard = threading.Lock()
+_locks = {}  # (source, series_id) -> Lock serializing updates (loader threads and the background refresher)
+
+def _zscore_key(series_id: str) -> str:
+    return f"{series_id}.zscore"
+
+def _state_path(source: str, series_id: str) -> str:
+    return os.path.join(store.STORE_DIR, source, f"{series_id}.anomaly.json")
+
+class _WindowStats:
+    """Count/mean/M2 over the last `window` rows (NaNs hold a slot but don't count), updated Welford-style."""
+
+    def __init__(self, window: int, values=(), n: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.window = window
+        self.values = list(values)[-window:]
+        self.n, self.mean, self.m2 = n, mean, m2
+
+    @classmethod
+    def from_values(cls, window: int, values) -> "_WindowStats":
+        stats = cls(window)
+        for x in list(values)[-window:]:
+            stats.push(x)
+        return stats
+
+    def _add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def _remove(self, x: float) -> None:
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.n -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.n
+        self.m2 -= delta * (x - self.mean)
+
+    def push(self, x: float) -> None:
+        if len(self.values) == self.window:
+            old = self.values.pop(0)
+            if not np.isnan(old):
+                self._remove(old)
+        self.values.append(x)
+        if not np.isnan(x):
+            self._add(x)
+
+    def z_score(self, x: float, min_periods: int) -> float:
+        if np.isnan(x) or self.n < max(min_periods, 2):
+            return np.nan
+        std = np.sqrt(max(self.m2, 0.0) / (self.n - 1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return float(np.float64(x - self.mean) / std)
+
+def _load_state(source: str, series_id: str) -> dict | None:
+    try:
+        with open(_state_path(source, series_id), "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if state.get("window") != WINDOW or state.get("min_periods") != MIN_PERIODS:
+        return None  # Parameters changed, rebuild
+    return state
+
+def _head_digest(dates: np.ndarray, values: np.ndarray, rows: int) -> str:
+    """Fingerprint of the first `rows` observations (everything older than the persisted tail)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(dates[:rows].astype("datetime64[ns]").tobytes())
+    digest.update(values[:rows].tobytes())
+    return digest.hexdigest()
+
+def _save_state(source: str, series_id: str, dates: np.ndarray, values: np.ndarray, stats: _WindowStats) -> None:
+    head_rows = max(0, len(values) - TAIL_ROWS)
+    state = {
+        "window": WINDOW,
+        "min_periods": MIN_PERIODS,
+        "n": stats.n,
+        "mean": stats.mean,
+        "m2": stats.m2,
+        "tail_dates": dates[-TAIL_ROWS:].astype("datetime64[ns]").astype(np.int64).tolist(),
+        "tail_values": values[-TAIL_ROWS:].tolist(),
+        "head_rows": head_rows,
+        "head_digest": _head_digest(dates, values, head_rows),
+    }
+    path = _state_path(source, series_id)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+def _resume_row(state: dict, dates: np.ndarray, values: np.ndarray) -> tuple[int, bool]:
+    """First row whose z-score is stale, and whether the persisted tail is still intact.
+
+    Intact means a pure append (resume right after the tail). Otherwise resume at the earliest revised row,
+    or 0 when the change reaches past the persisted tail (full rebuild).
+    """
+    head_rows = state.get("head_rows", -1)
+    if head_rows > len(values) or _head_digest(dates, values, max(head_rows, 0)) != state.get("head_digest"):
+        return 0, False  # History older than the tail changed
+    tail_dates = np.array(state["tail_dates"], dtype=np.int64).astype("datetime64[ns]")
+    tail_values = np.array(state["tail_values"], dtype=float)
+    if len(tail_dates) == 0:
+        return 0, False
+
+    pos = np.searchsorted(dates, tail_dates)
+    in_range = pos < len(dates)
+    clipped = np.minimum(pos, len(dates) - 1)
+    same_value = (values[clipped] == tail_values) | (np.isnan(values[clipped]) & np.isnan(tail_values))
+    ok = in_range & (dates[clipped] == tail_dates) & same_value & (pos == pos[0] + np.arange(len(pos)))
+    if ok.all():
+        return int(pos[-1]) + 1, True
+    first_bad = int(np.argmin(ok))
+    return (0 if first_bad == 0 else int(pos[0]) + first_bad), False
+
+def _series_lock(source: str, series_id: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault((source, series_id), threading.Lock())
+
+def update_anomalies(source: str, series_id: str) -> None:
+    """Bring the stored z-scores of a series up to date with the stored values.
+
+    A plain append costs O(new rows); a revision recomputes from the earliest revised row.
+    The first run (or a change older than the persisted tail) does one full vectorized pass.
+    Updates of one series are serialized, so its state and z-scores are always written as a pair.
+    """
+    with _series_lock(source, series_id):
+        _update(source, series_id)
+
+def _update(source: str, series_id: str) -> None:
+    df = store.get_series(source, series_id)
+    if df is None or df.empty:
+        return
+    dates = df["date"].to_numpy(dtype="datetime64[ns]")
+    values = df["value"].to_numpy(dtype=float)
+
+    state = _load_state(source, series_id)
+    if store.get_series(source, _zscore_key(series_id)) is None:
+        state = None
+    start, intact = (0, False) if state is None else _resume_row(state, dates, values)
+
+    if start == 0:
+        rolling = df["value"].rolling(window=WINDOW, min_periods=MIN_PERIODS)
+        z_score = (df["value"] - rolling.mean()) / rolling.std()
+        store.put_series(source, _zscore_key(series_id), pd.DataFrame({"date": dates, "value": z_score.to_numpy()}))
+        _save_state(source, series_id, dates, values, _WindowStats.from_values(WINDOW, values))
+        return
+    if start == len(values):
+        return  # Nothing new
+
+    if intact:
+        # Pure append: continue from the persisted statistics
+        stats = _WindowStats(WINDOW, state["tail_values"], state["n"], state["mean"], state["m2"])
+    else:
+        stats = _WindowStats.from_values(WINDOW, values[max(0, start - WINDOW):start])
+
+    z_new = np.empty(len(values) - start)
+    for i, x in enumerate(values[start:]):
+        stats.push(x)
+        z_new[i] = stats.z_score(x, MIN_PERIODS)
+    store.merge_series(source, _zscore_key(series_id), pd.DataFrame({"date": dates[start:], "value": z_new}),
+                       since=dates[start])
+    _save_state(source, series_id, dates, values, stats)
+
+def get_anomalies(source: str, series_id: str, start=None, end=None, threshold: float = THRESHOLD) -> pd.DataFrame | None:
+    """Stored z-scores of a series in [start, end] as a date/z_score/anomaly DataFrame (None if never computed)."""
+    z = store.get_series(source, _zscore_key(series_id), start, end)
+    if z is None:
+        return None
+    z = z.rename(columns={"value": "z_score"})
+    z["anomaly"] = z["z_score"].abs() > threshold
+    return z
+
+def zscore_versions(specs) -> tuple:
+    """Data versions of the stored z-scores of (source, series_id) pairs, for keys of anything built from them."""
+    return tuple(store.data_version(source, _zscore_key(series_id)) for source, series_id in specs)
+
+def anomalies_panel(specs: dict, index: pd.DatetimeIndex, threshold: float = THRESHOLD) -> dict:
+    """Stored z-scores of several series aligned onto a sorted period-end index.
+
+    Each row gets the z-score of the series' last observation in (previous index date, this date], i.e. the
+    observation the month-end panel shows there; rows with no observation of their own stay NaN (no forward
+    fill, so one quarterly anomaly isn't repeated over three months).
+    specs maps column name to (source, series_id). Returns {"z_score": DataFrame, "anomaly": DataFrame of bools}.
+    """
+    ends = index.to_numpy(dtype="datetime64[ns]")
+    columns = {}
+    for name, (source, series_id) in specs.items():
+        z = get_anomalies(source, series_id, end=index.max(), threshold=threshold)
+        column = np.full(len(index), np.nan)
+        if z is not None and not z.empty:
+            hi = np.searchsorted(z["date"].to_numpy(dtype="datetime64[ns]"), ends, side="right")
+            lo = np.concatenate([[0], hi[:-1]])
+            has = hi > lo
+            column[has] = z["z_score"].to_numpy(dtype=float)[hi[has] - 1]
+        columns[name] = column
+    z_score = pd.DataFrame(columns, index=index)
+    return {"z_score": z_score, "anomaly": z_score.abs() > threshold}
@@ -1,61 +1,125 @@
-import requests
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-import os
 from datetime import datetime
-import json
-from config.settings import BLS_API_KEY
+from config.settings import BLS_API_KEY, require
+from utils import perf, refresher, store
+from utils.http_client import request
+import streamlit as st  # For warnings in app context
 
-CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "cached")
-os.makedirs(CACHE_DIR, exist_ok=True)
+BLS_URL = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
 
-def _cache_filename(series_id: str) -> str:
-    return os.path.join(CACHE_DIR, f"bls_{series_id}.json")
+# BLS v2 limits per request for registered keys
+MAX_SERIES_PER_REQUEST = 50
+MAX_YEARS_PER_REQUEST = 20
 
-def get_bls_series(series_id: str = "CES0500000003", years: int = 20, force_refresh: bool = False) -> pd.DataFrame:
+# Period code prefix -> months per period step (M01 = Jan, Q02 = Apr, S02 = Jul, A01 = Jan)
+_PERIOD_MONTHS = {"M": 1, "Q": 3, "S": 6, "A": 12}
+# Annual-average codes that sit alongside the sub-annual observations
+_ANNUAL_AVERAGE_CODES = {"M13", "Q05", "S03"}
+
+def get_bls_series(series_id: str = "CES0500000003", years: int = 20, force_refresh: bool = False,
+                   start=None, end=None) -> pd.DataFrame:
     """Fetch BLS series (CES0500000003 = Average Hourly Earnings Private)."""
-    cache_file = _cache_filename(series_id)
-    
-    if not force_refresh and os.path.exists(cache_file):
-        cache_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_file))
-        if cache_age.total_seconds() < 86400:
-            with open(cache_file, "r") as f:
-                data = json.load(f)
-            return _parse_bls_response(data)
-    
-    url = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
+    frames = get_bls_series_batch([series_id], years=years, force_refresh=force_refresh, start=start, end=end)
+    if series_id not in frames:
+        raise ValueError(f"BLS returned no data for {series_id}")
+    return frames[series_id]
+
+@perf.timed("bls.get_series")
+def get_bls_series_batch(series_ids: list[str], years: int = 20, force_refresh: bool = False,
+                         start=None, end=None) -> dict[str, pd.DataFrame]:
+    """Fetch many BLS series in as few POSTs as the API allows.
+
+    Series are packed MAX_SERIES_PER_REQUEST to a request and long histories are split into
+    MAX_YEARS_PER_REQUEST windows; all chunks are fetched in parallel. Returns {series_id: date/value df},
+    omitting series BLS has no data for. Expired series are returned as cached while utils.refresher
+    re-fetches them in the background; only missing ones (or force_refresh) wait on BLS, and if that
+    fails with every series already cached, the cached copies are used.
+    """
+    missing, expired = [], []
+    for series_id in series_ids:
+        if force_refresh or store.age_seconds("bls", series_id) is None:
+            missing.append(series_id)
+        elif not refresher.is_fresh("bls", series_id):
+            expired.append(series_id)
+    if expired:
+        refresher.schedule("bls", expired, lambda ids: _refresh(ids, years))
+    perf.annotate(cache="miss" if missing else "hit", series=len(series_ids), missing=len(missing), stale=len(expired))
+
+    if missing:
+        try:
+            _refresh(missing, years)
+        except Exception as e:
+            if any(store.age_seconds("bls", series_id) is None for series_id in missing):
+                raise
+            st.warning(f"BLS API error: {str(e)}. Showing the cached copy instead.")
+
+    results = {}
+    for series_id in series_ids:
+        df = store.get_series("bls", series_id, start, end)
+        if df is not None:
+            results[series_id] = df
+    return results
+
+def _refresh(series_ids: list[str], years: int = 20) -> None:
+    """Fetch series in packed, year-windowed chunks (in parallel) into the store; no Streamlit calls."""
+    end_year = datetime.now().year
+    start_year = end_year - years
+    chunks = [
+        (series_ids[i:i + MAX_SERIES_PER_REQUEST], window_start, min(window_start + MAX_YEARS_PER_REQUEST - 1, end_year))
+        for i in range(0, len(series_ids), MAX_SERIES_PER_REQUEST)
+        for window_start in range(start_year, end_year + 1, MAX_YEARS_PER_REQUEST)
+    ]
+    with ThreadPoolExecutor(max_workers=min(8, len(chunks))) as pool:
+        frames = list(pool.map(lambda chunk: _parse_bls_response(_post_chunk(*chunk)), chunks))
+
+    fetched = pd.concat(frames, ignore_index=True)
+    for series_id, df in fetched.groupby("series_id", sort=False):
+        store.put_series("bls", series_id, df)
+
+def _post_chunk(series_ids: list[str], start_year: int, end_year: int) -> dict:
+    require("bls")
     headers = {"Content-type": "application/json"}
-    start_year = str(datetime.now().year - years)
-    end_year = str(datetime.now().year)
     payload = {
-        "seriesid": [series_id],
-        "startyear": start_year,
-        "endyear": end_year,
+        "seriesid": series_ids,
+        "startyear": str(start_year),
+        "endyear": str(end_year),
         "registrationkey": BLS_API_KEY
     }
-    
-    response = requests.post(url, json=payload, headers=headers)
-    response.raise_for_status()
-    json_data = response.json()
-    
-    with open(cache_file, "w") as f:
-        json.dump(json_data, f)
-    
-    return _parse_bls_response(json_data)
+    response = request("POST", BLS_URL, source="bls", json=payload, headers=headers)
+    return response.json()
 
+@perf.timed("bls.parse")
 def _parse_bls_response(json_data: dict) -> pd.DataFrame:
+    """Flatten a BLS response into series_id/date/value rows (vectorized period parsing)."""
     if json_data["status"] != "REQUEST_SUCCEEDED":
         raise ValueError(f"BLS error: {json_data.get('message', 'Unknown')}")
-    
-    series = json_data["Results"]["series"][0]
-    data = series["data"]
-    
-    rows = []
-    for item in data:
-        year = int(item["year"])
-        month = int(item["period"].replace("M", ""))
-        date = pd.to_datetime(f"{year}-{month:02d}-01")
-        value = float(item["value"])
-        rows.append({"date": date, "value": value})
-    
-    df = pd.DataFrame(rows).sort_values("date")
-    return df
\ No newline at end of file
+
+    frames = [
+        pd.DataFrame(series["data"], columns=["year", "period", "value"]).assign(series_id=series["seriesID"])
+        for series in json_data["Results"]["series"]
+    ]
+    raw = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["year", "period", "value", "series_id"])
+
+    period = raw["period"].astype(str)
+    prefix = period.str[0]
+    number = pd.to_numeric(period.str[1:], errors="coerce")
+    step = prefix.map(_PERIOD_MONTHS)
+
+    # Annual averages duplicate the sub-annual data—keep them only for annual-only series
+    is_average = period.isin(_ANNUAL_AVERAGE_CODES)
+    has_subannual = (~is_average & (prefix != "A")).groupby(raw["series_id"]).transform("any")
+    keep = step.notna() & number.notna() & ~(is_average & has_subannual)
+
+    month = np.where(is_average, 1, (number - 1) * step + 1)[keep.to_numpy()]
+    year = pd.to_numeric(raw.loc[keep, "year"], errors="coerce").to_numpy()
+    dates = pd.to_datetime(pd.DataFrame({"year": year, "month": month, "day": 1}), errors="coerce").to_numpy()
+
+    df = pd.DataFrame({
+        "series_id": raw.loc[keep, "series_id"],
+        "date": dates,
+        "value": pd.to_numeric(raw.loc[keep, "value"], errors="coerce"),
+    })
+    perf.annotate(rows=len(df))
+    return df.dropna(subset=["date"]).sort_values(["series_id", "date"])
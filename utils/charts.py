@@ -1,14 +1,24 @@
 import plotly.express as px
 import pandas as pd
 import streamlit as st
+from utils import memo
+from utils.downsample import chart_series, downsample
 
-def plot_series(df: pd.DataFrame, title: str) -> None:
-    """Simple line chart with nice defaults."""
+def plot_series(df: pd.DataFrame, title: str, key=None, start=None, end=None) -> None:
+    """Simple line chart with nice defaults.
+
+    The line is downsampled to a bounded number of points (memoized when key identifies df's data);
+    start/end zoom into a date range. Summary statistics use every point.
+    """
     if df.empty:
         st.warning("No data to plot.")
         return
 
-    fig = px.line(df, x="date", y="value", title=title,
+    if key is not None:
+        points = chart_series(df, key, start, end)
+    else:
+        points = downsample(memo.slice_range(df.sort_values("date"), start, end))
+    fig = px.line(points, x="date", y="value", title=title,
                   labels={"value": "Value", "date": "Date"},
                   template="streamlit")  # dark/light auto
     fig.update_layout(hovermode="x unified", height=600)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from config.settings import CHART_DOWNSAMPLE, CHART_MAX_POINTS
+from utils import memo, perf
+
+# Server-side downsampling for line charts, so the Plotly payload stays bounded however long the history:
+# a chart never gets more than CHART_MAX_POINTS points (roughly two per pixel of a wide chart).
+# lttb:   Largest-Triangle-Three-Buckets; one point per bucket, the one forming the largest triangle with
+#         the previously kept point and the next bucket's average, so peaks and turns survive
+# minmax: the min and max of every bucket; exact envelope, best for noisy daily data
+# Results are memoized per (series key, range, points, method), so reruns and other sessions reuse them.
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the n_out points LTTB keeps (always the first and last); all of them if n_out >= len(x)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # n_out - 2 buckets between the first and last point; each is at least one point wide
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+def minmax(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Sorted indices of each bucket's min and max ((n_out - 2) // 2 equal-count buckets) plus the endpoints."""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    size = -(-n // ((n_out - 2) // 2))  # Points per bucket, rounded up
+    buckets = -(-n // size)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    rows = padded.reshape(buckets, size)
+    base = np.arange(buckets) * size
+    idx = np.concatenate([[0, n - 1], base + np.nanargmin(rows, axis=1), base + np.nanargmax(rows, axis=1)])
+    return np.unique(idx)
+
+METHODS = {"lttb": lttb, "minmax": minmax}
+
+@perf.timed()
+def downsample(df: pd.DataFrame, max_points: int = CHART_MAX_POINTS, method: str = CHART_DOWNSAMPLE,
+               x: str = "date", y: str = "value") -> pd.DataFrame:
+    """Rows of a date-sorted frame that keep the line's shape in at most max_points points.
+
+    Returned as-is when already small enough; otherwise missing values are dropped first (gaps close up).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    perf.annotate(points_in=len(df), method=method)
+    if len(df) <= max_points:
+        return df
+    df = df[df[y].notna()]
+    xs = df[x].to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(float)
+    idx = METHODS[method](xs, df[y].to_numpy(dtype=float), max_points)
+    perf.annotate(points_out=len(idx))
+    return df.iloc[idx]
+
+def chart_series(df: pd.DataFrame, key, start=None, end=None, max_points: int = CHART_MAX_POINTS,
+                 method: str = CHART_DOWNSAMPLE) -> pd.DataFrame:
+    """date/value rows of df within [start, end] (the zoom range), downsampled for plotting.
+
+    key identifies df's contents (e.g. a view key and column, or a stored series and its data version); the
+    result is memoized on (key, start, end, max_points, method).
+    """
+    return memo.get_or_compute(("chart", key, start, end, max_points, method),
+                               lambda: downsample(memo.slice_range(df, start, end), max_points, method))
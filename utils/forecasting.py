@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from utils import perf
+from utils.analytics import future_dates, t_quantile, _rows_per_year
+
+# Forecast models written against a batch of equal-length histories Y (batch x time), so the same code
+# serves a single chart forecast (batch of 1) and a rolling-origin backtest over every series and origin
+# at once. Each returns (yhat, sd): point forecasts and forecast standard deviations, both batch x horizon.
+
+HOLT_ALPHAS = (0.1, 0.3, 0.5, 0.7, 0.9)
+HOLT_BETAS = (0.01, 0.05, 0.1, 0.2)
+HOLT_GAMMAS = (0.05, 0.15, 0.3)
+AR_ORDER = 3
+
+def _linear_batch(Y: np.ndarray, horizon: int, season: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Global linear trend (OLS on time), the model behind analytics.forecast_linear."""
+    n = Y.shape[1]
+    x = np.arange(n, dtype=float)
+    dx = x - x.mean()
+    sxx = dx @ dx
+    slope = (Y - Y.mean(axis=1, keepdims=True)) @ dx / sxx
+    intercept = Y.mean(axis=1) - slope * x.mean()
+    resid = Y - (intercept[:, None] + slope[:, None] * x[None, :])
+    s2 = (resid ** 2).sum(axis=1) / max(n - 2, 1)
+
+    future_x = np.arange(n, n + horizon, dtype=float)
+    yhat = intercept[:, None] + slope[:, None] * future_x[None, :]
+    sd = np.sqrt(s2[:, None] * (1 + 1 / n + (future_x - x.mean())[None, :] ** 2 / sxx))
+    return yhat, sd
+
+def _ar_batch(Y: np.ndarray, horizon: int, season: int | None = None, order: int = AR_ORDER) -> tuple[np.ndarray, np.ndarray]:
+    """ARIMA(p,1,0) with drift: AR(p) least squares on first differences, integrated back to levels."""
+    d = np.diff(Y, axis=1)
+    batch, m = d.shape
+    p = min(order, max(m // 4, 1))
+    rows = m - p
+    # Design matrix per batch row: [1, d[t-1], ..., d[t-p]] for t = p..m-1
+    X = np.ones((batch, rows, p + 1))
+    for lag in range(1, p + 1):
+        X[:, :, lag] = d[:, p - lag:m - lag]
+    target = d[:, p:]
+    xtx = np.einsum("bri,brj->bij", X, X) + 1e-8 * np.eye(p + 1)
+    xty = np.einsum("bri,br->bi", X, target)
+    coef = np.linalg.solve(xtx, xty[..., None])[..., 0]
+    resid = target - np.einsum("bri,bi->br", X, coef)
+    sigma2 = (resid ** 2).sum(axis=1) / max(rows - p - 1, 1)
+
+    history = list(d[:, -p:].T)  # Most recent p differences, oldest first
+    psi = [np.ones(batch)]
+    level = Y[:, -1].copy()
+    yhat = np.empty((batch, horizon))
+    for h in range(horizon):
+        step = coef[:, 0] + sum(coef[:, lag] * history[-lag] for lag in range(1, p + 1))
+        history.append(step)
+        level = level + step
+        yhat[:, h] = level
+        if h > 0:
+            psi.append(sum(coef[:, lag] * psi[-lag] for lag in range(1, min(p, h) + 1)))
+    # Level error after h steps accumulates the cumulative psi weights of the differenced process
+    cum_psi = np.cumsum(np.array(psi), axis=0)  # horizon x batch
+    sd = np.sqrt(sigma2[:, None] * np.cumsum(cum_psi.T ** 2, axis=1))
+    return yhat, sd
+
+def _holt_winters_batch(Y: np.ndarray, horizon: int, season: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Holt's linear exponential smoothing, with additive Holt-Winters seasonality when `season` fits twice.
+
+    Smoothing parameters are picked per batch row from a small grid by in-sample one-step SSE; every
+    (row, parameter) lane runs through the recursion together.
+    """
+    batch, n = Y.shape
+    seasonal = season is not None and season > 1 and n >= 2 * season
+    m = season if seasonal else 1
+    gammas = HOLT_GAMMAS if seasonal else (0.0,)
+    grid = np.array([(a, b, g) for a in HOLT_ALPHAS for b in HOLT_BETAS for g in gammas])
+    alpha, beta, gamma = (np.tile(grid[:, k], batch) for k in range(3))
+    lanes = np.repeat(Y, len(grid), axis=0)
+
+    if seasonal:
+        first, second = lanes[:, :m].mean(axis=1), lanes[:, m:2 * m].mean(axis=1)
+        trend = (second - first) / m
+        # Seasonals net of the trend within the first season; the level sits at its end (t = m - 1)
+        offsets = np.arange(m) - (m - 1) / 2
+        seas = np.ascontiguousarray((lanes[:, :m] - first[:, None] - trend[:, None] * offsets[None, :]).T)  # slot x lane
+        level = first + trend * (m - 1) / 2
+        start = m
+    else:
+        level, trend = lanes[:, 0], lanes[:, 1] - lanes[:, 0]
+        seas = np.zeros((1, len(lanes)))
+        start = 1
+
+    lanes_t = np.ascontiguousarray(lanes.T)  # Time-major so each step reads one contiguous row
+    sse = np.zeros(len(lanes))
+    for t in range(start, n):
+        y = lanes_t[t]
+        s_prev = seas[t % m]
+        err = y - (level + trend + s_prev)
+        sse += err * err
+        new_level = level + trend + alpha * err
+        trend = trend + beta * (new_level - level - trend)
+        if seasonal:
+            seas[t % m] = s_prev + gamma * (y - new_level - s_prev)
+        level = new_level
+
+    best = (sse.reshape(batch, len(grid)).argmin(axis=1) + np.arange(batch) * len(grid))
+    h = np.arange(1, horizon + 1)
+    season_idx = (n + h - 1) % m
+    yhat = level[best, None] + trend[best, None] * h[None, :] + seas[:, best].T[:, season_idx]
+    sigma2 = sse[best] / max(n - start - 2, 1)
+    a, b = alpha[best, None], beta[best, None]
+    j = np.arange(horizon)[None, :]
+    sd = np.sqrt(sigma2[:, None] * (1 + np.cumsum(np.where(j > 0, (a * (1 + j * b)) ** 2, 0.0), axis=1)))
+    return yhat, sd
+
+def _seasonal_naive_batch(Y: np.ndarray, horizon: int, season: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Repeat the last full season (plain naive / random walk without a seasonal period)."""
+    n = Y.shape[1]
+    m = season if season and n > season else 1
+    h = np.arange(1, horizon + 1)
+    yhat = Y[:, n - m + (h - 1) % m]
+    resid = Y[:, m:] - Y[:, :-m]
+    sigma = np.sqrt((resid ** 2).mean(axis=1))
+    sd = sigma[:, None] * np.sqrt((h - 1) // m + 1)[None, :]
+    return yhat, sd
+
+MODELS = {
+    "linear": ("Linear Trend", _linear_batch),
+    "ar": ("ARIMA(3,1,0)", _ar_batch),
+    "holt_winters": ("Holt-Winters", _holt_winters_batch),
+    "seasonal_naive": ("Seasonal Naive", _seasonal_naive_batch),
+}
+
+def season_length(dates) -> int | None:
+    """Seasonal period implied by the data's frequency (monthly 12, quarterly 4, weekly 52), else None."""
+    rows_per_year = _rows_per_year(pd.DatetimeIndex(dates))
+    return rows_per_year if rows_per_year in (4, 12, 52) else None
+
+@perf.timed()
+def forecast(df: pd.DataFrame, model: str = "linear", periods: int = 12, level: float = 0.95) -> pd.DataFrame:
+    """Forecast a date/value series with one of MODELS; same output columns as forecast_linear."""
+    df = df.dropna(subset=["value"]).sort_values("date")
+    if len(df) < 12:
+        raise ValueError("Need ~12+ points for a reliable forecast")
+    _, fn = MODELS[model]
+    yhat, sd = fn(df["value"].to_numpy(dtype=float)[None, :], periods, season_length(df["date"]))
+    conf = t_quantile(0.5 + level / 2, len(df) - 2) * sd[0]
+    return pd.DataFrame({
+        "date": future_dates(df["date"], periods),
+        "yhat": yhat[0],
+        "yhat_lower": yhat[0] - conf,
+        "yhat_upper": yhat[0] + conf,
+    })
+
+@perf.timed()
+def backtest(wide: pd.DataFrame, models=None, horizon: int = 12, origins: int = 12, window: int = 120,
+             step: int = 1) -> pd.DataFrame:
+    """Rolling-origin backtest of every model on every column of a date-indexed frame.
+
+    Origins are the last `origins` cut points (every `step` rows) that leave `horizon` rows to score; each
+    fits on the preceding `window` rows (shortened to fit the data). All series x origins go through each
+    model as one batch; windows touching missing values are skipped. Returns one row per (series, model)
+    with MAE, RMSE, MAPE (%) and the number of scored origins.
+    """
+    models = list(models or MODELS)
+    values = wide.to_numpy(dtype=float).T  # series x time
+    n_series, n = values.shape
+    window = min(window, n - horizon - (origins - 1) * step)
+    if window < 12:
+        raise ValueError("Not enough history for a rolling-origin backtest")
+
+    # Every (train window + horizon) slice, then keep the last `origins` cut points
+    spans = sliding_window_view(values, window + horizon, axis=1)[:, ::-1][:, ::step][:, :origins][:, ::-1]
+    spans = spans.reshape(-1, window + horizon)
+    complete = ~np.isnan(spans).any(axis=1)
+    train, actual = spans[complete, :window], spans[complete, window:]
+    series_of = np.repeat(np.arange(n_series), spans.shape[0] // n_series)[complete]
+    season = season_length(wide.index)
+
+    rows = []
+    for model in models:
+        label, fn = MODELS[model]
+        if len(train):
+            yhat, _ = fn(train, horizon, season)
+            err = yhat - actual
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pct = np.abs(err / actual) * 100
+        for i, name in enumerate(wide.columns):
+            sel = series_of == i if len(train) else np.zeros(0, dtype=bool)
+            if not sel.any():
+                rows.append({"series": name, "model": model, "label": label, "mae": np.nan, "rmse": np.nan,
+                             "mape": np.nan, "origins": 0})
+                continue
+            e = err[sel]
+            rows.append({
+                "series": name, "model": model, "label": label,
+                "mae": float(np.abs(e).mean()),
+                "rmse": float(np.sqrt((e ** 2).mean())),
+                "mape": float(np.nanmean(np.where(np.isfinite(pct[sel]), pct[sel], np.nan))),
+                "origins": int(sel.sum()),
+            })
+    return pd.DataFrame(rows)
+
+def best_models(metrics: pd.DataFrame, metric: str = "rmse") -> dict:
+    """Lowest-error model per series from backtest() output."""
+    scored = metrics.dropna(subset=[metric])
+    if scored.empty:
+        return {}
+    best = scored.loc[scored.groupby("series")[metric].idxmin()]
+    return dict(zip(best["series"], best["model"]))
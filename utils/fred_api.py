@@ -1,80 +1,117 @@
 import requests
 import pandas as pd
-import os
-from datetime import datetime
-import json
-from config.settings import FRED_API_KEY
+from config.settings import FRED_API_KEY, require
+from utils import perf, refresher, store
+from utils.http_client import request
 import streamlit as st  # For error messages in app context
 
-CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "cached")
-os.makedirs(CACHE_DIR, exist_ok=True)
+PAGE_LIMIT = 10000  # FRED max observations per request
+REVISION_WINDOW_DAYS = 180  # Re-pull this much trailing history on refresh to catch revisions
 
-def _cache_filename(series_id: str) -> str:
-    return os.path.join(CACHE_DIR, f"{series_id}.json")
+@perf.timed("fred.parse")
+def _parse_observations(data: dict) -> pd.DataFrame:
+    df = pd.DataFrame(data["observations"])
+    if df.empty:
+        raise ValueError("No data returned")
+    df["date"] = pd.to_datetime(df["date"])
+    df["value"] = pd.to_numeric(df["value"], errors="coerce")
+    perf.annotate(rows=len(df))
+    return df[["date", "value"]]
 
-def get_series_observations(series_id: str, force_refresh: bool = False) -> pd.DataFrame:
-    """Fetch FRED series with caching, timeout, and error handling."""
-    cache_file = _cache_filename(series_id)
-    
-    # Try cache first
-    if not force_refresh and os.path.exists(cache_file):
-        cache_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_file))
-        if cache_age.total_seconds() < 86400:
-            try:
-                with open(cache_file, "r") as f:
-                    data = json.load(f)
-                df = pd.DataFrame(data["observations"])
-                if not df.empty:
-                    df["date"] = pd.to_datetime(df["date"])
-                    df["value"] = pd.to_numeric(df["value"], errors="coerce")
-                    return df
-            except Exception:
-                pass  # Bad cache—fall through to fetch
-    
-    # Live fetch with timeout and retry logic
+def _fetch_observations(series_id: str, observation_start: str | None = None) -> pd.DataFrame:
+    """Pull observations from FRED, following offsets past the 10k-row limit."""
+    require("fred")
     url = "https://api.stlouisfed.org/fred/series/observations"
     params = {
         "series_id": series_id.upper(),
         "api_key": FRED_API_KEY,
         "file_type": "json",
-        "limit": 10000
+        "limit": PAGE_LIMIT
     }
-    
-    try:
-        response = requests.get(url, params=params, timeout=30)  # 30s timeout
-        response.raise_for_status()
+    if observation_start:
+        params["observation_start"] = observation_start
+
+    pages = []
+    offset = 0
+    while True:
+        params["offset"] = offset
+        response = request("GET", url, source="fred", params=params, timeout=30)  # 30s timeout, pooled + retried
         data = response.json()
-        
-        df = pd.DataFrame(data["observations"])
-        if df.empty:
-            raise ValueError("No data returned")
-        
-        df["date"] = pd.to_datetime(df["date"])
-        df["value"] = pd.to_numeric(df["value"], errors="coerce")
-        
-        # Cache successful
-        with open(cache_file, "w") as f:
-            json.dump(data, f)
-        
-        return df
-    
+        pages.append(_parse_observations(data))
+        offset += len(data["observations"])
+        if offset >= int(data.get("count", 0)) or not data["observations"]:
+            break
+    return pd.concat(pages, ignore_index=True)
+
+def _refresh(series_ids) -> None:
+    """Pull new observations into the store (no Streamlit calls, so it can run in the background refresher).
+
+    Delta fetch when we already hold history (from the last cached date minus a revision window), full pull otherwise.
+    """
+    for series_id in series_ids:
+        last_cached = store.last_date("fred", series_id)
+        observation_start = None
+        if last_cached is not None:
+            observation_start = (last_cached - pd.Timedelta(days=REVISION_WINDOW_DAYS)).strftime("%Y-%m-%d")
+
+        df = _fetch_observations(series_id, observation_start)
+        if observation_start is None:
+            store.put_series("fred", series_id, df)
+        else:
+            store.merge_series("fred", series_id, df, since=observation_start)
+
+@perf.timed("fred.get_series")
+def get_series_observations(series_id: str, force_refresh: bool = False, start=None, end=None) -> pd.DataFrame:
+    """Fetch FRED series with caching, timeout, and error handling.
+
+    Cached observations are read straight from the local store; start/end limit the returned range. Once
+    they pass the TTL they're still returned immediately while utils.refresher updates them in the background.
+    Only a missing series (or force_refresh) waits on FRED, and if that fetch fails a cached copy is used.
+    """
+    cached = store.get_series("fred", series_id, start, end)
+    has_cache = store.last_date("fred", series_id) is not None  # Stored at all (the range slice may be empty)
+    if has_cache and not force_refresh:
+        stale = not refresher.is_fresh("fred", series_id)
+        if stale:
+            refresher.schedule("fred", [series_id], _refresh)
+        perf.annotate(cache="hit", stale=stale, series=series_id, rows=len(cached))
+        return cached
+    perf.annotate(cache="miss", series=series_id)
+
+    try:
+        _refresh([series_id])
+        return store.get_series("fred", series_id, start, end)
+
     except requests.Timeout:
+        if has_cache:
+            st.warning("FRED API timeout—showing the cached copy instead.")
+            return cached
         st.error("FRED API timeout—network issue or slow response. Try again or shorter range. Using cache if available.")
         raise
     except requests.RequestException as e:
+        if has_cache:
+            st.warning(f"FRED API error: {str(e)}. Showing the cached copy instead.")
+            return cached
         st.error(f"FRED API error: {str(e)}. Check connection or try later.")
         raise
     except Exception as e:
+        if has_cache:
+            st.warning(f"Data processing error: {str(e)}. Showing the cached copy instead.")
+            return cached
         st.error(f"Data processing error: {str(e)}")
         raise
 
-def get_series_info(series_id: str) -> dict:
+def fetch_series_info(series_id: str) -> dict:
+    """FRED series metadata; raises on failure (no Streamlit calls, for background threads and scripts)."""
+    require("fred")
     url = "https://api.stlouisfed.org/fred/series"
     params = {"series_id": series_id.upper(), "api_key": FRED_API_KEY, "file_type": "json"}
+    response = request("GET", url, source="fred", params=params, timeout=30)
+    return response.json()["seriess"][0]
+
+def get_series_info(series_id: str) -> dict:
     try:
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        return response.json()["seriess"][0]
+        return fetch_series_info(series_id)
     except Exception as e:
         st.warning(f"Metadata fetch failed: {str(e)}")
-        return {}
\ No newline at end of file
+        return {}
@@ -0,0 +1,111 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import API_REPLAY
+from utils import perf
+
+DEFAULT_TIMEOUT = 30
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+POOL_SIZE = 16
+
+# Max in-flight requests per source—keeps us polite with each API's rate limits
+SOURCE_CONCURRENCY = {"fred": 4, "bls": 2, "treasury": 4}
+
+_lock = threading.Lock()
+_sessions = {}  # host -> keep-alive session
+_semaphores = {}  # source -> BoundedSemaphore
+_transport = None  # Adapter mounted on every session instead of a pooled HTTPAdapter (see set_transport)
+
+def _adapter():
+    if _transport is not None:
+        return _transport
+    if API_REPLAY:
+        from utils.replay import shared_adapter  # Offline stand-in, configured from settings
+        return shared_adapter()
+    return HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+
+def get_session(url: str) -> requests.Session:
+    """Shared keep-alive session (with its own connection pool) for the URL's host."""
+    host = urlsplit(url).netloc
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = _adapter()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+        return session
+
+def set_transport(adapter) -> None:
+    """Mount `adapter` (e.g. utils.replay.ReplayAdapter) on every session, now and future; None restores HTTP."""
+    global _transport
+    with _lock:
+        _transport = adapter
+        for session in _sessions.values():
+            mounted = _adapter()
+            session.mount("https://", mounted)
+            session.mount("http://", mounted)
+
+def _semaphore(source: str | None):
+    if source is None:
+        return None
+    with _lock:
+        if source not in _semaphores:
+            _semaphores[source] = threading.BoundedSemaphore(SOURCE_CONCURRENCY.get(source, 4))
+        return _semaphores[source]
+
+def _backoff(attempt: int, retry_after: str | None = None) -> float:
+    """Full-jitter exponential backoff, honouring Retry-After when the server sends one."""
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+def request(method: str, url: str, source: str | None = None, timeout: float = DEFAULT_TIMEOUT,
+            retries: int = MAX_RETRIES, **kwargs) -> requests.Response:
+    """Pooled HTTP request with bounded retries and per-source concurrency limits.
+
+    Raises the usual requests exceptions once retries are exhausted. Timed as a "<source>.http" span
+    (attempts, status and payload bytes; streamed bodies only count when the server sends Content-Length).
+    """
+    with perf.span(f"{source or 'http'}.http", method=method, host=urlsplit(url).netloc) as span:
+        response = _request_with_retries(method, url, source, timeout, retries, **kwargs)
+        length = response.headers.get("Content-Length")
+        span.set(status=response.status_code,
+                 bytes=int(length) if length else (0 if kwargs.get("stream") else len(response.content)))
+        return response
+
+def _request_with_retries(method: str, url: str, source: str | None, timeout: float, retries: int,
+                          **kwargs) -> requests.Response:
+    session = get_session(url)
+    semaphore = _semaphore(source)
+
+    for attempt in range(retries + 1):
+        perf.annotate(attempts=attempt + 1)
+        try:
+            if semaphore is not None:
+                with semaphore:
+                    response = session.request(method, url, timeout=timeout, **kwargs)
+            else:
+                response = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+            time.sleep(_backoff(attempt))
+            continue
+
+        if response.status_code in RETRY_STATUSES and attempt < retries:
+            time.sleep(_backoff(attempt, response.headers.get("Retry-After")))
+            continue
+
+        response.raise_for_status()
+        return response
@@ -1,17 +1,134 @@
-import google.generativeai as genai
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from config.settings import GOOGLE_API_KEY, GEMINI_MODEL
+from config.settings import (API_REPLAY, GOOGLE_API_KEY, GEMINI_MODEL, GEMINI_REQUESTS_PER_MINUTE,
+                             GEMINI_MAX_CONCURRENCY, require)
+from utils import perf
 from utils.analytics import detect_trend
 from utils.rag import retrieve_context
 
-genai.configure(api_key=GOOGLE_API_KEY)
+_model = None
+_model_lock = threading.Lock()
 
-model = genai.GenerativeModel(GEMINI_MODEL)
+def _get_model():
+    """Gemini client, created on first use so pages that never ask don't import the SDK."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None and API_REPLAY:
+                from utils.replay import gemini_model  # Offline stand-in, configured from settings
+                _model = gemini_model()
+            elif _model is None:
+                require("llm")
+                import google.generativeai as genai
+                genai.configure(api_key=GOOGLE_API_KEY)
+                _model = genai.GenerativeModel(GEMINI_MODEL)
+    return _model
 
-def ask_gemini(user_prompt: str, context: str = "", df: pd.DataFrame = None) -> str:
+# On-disk response cache shared by every session and worker process on the host
+RESPONSE_CACHE_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "cached", "llm_responses.sqlite3")
+RESPONSE_CACHE_TTL_SECONDS = 86400
+RESPONSE_CACHE_MAX_ENTRIES = 2000
+
+def _df_fingerprint(df: pd.DataFrame | None) -> str:
+    """Cheap content hash of the analytics frame (values, index and column names)."""
+    if df is None or df.empty:
+        return ""
+    digest = hashlib.sha256(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    return digest.hexdigest()
+
+def _cache_key(full_prompt: str, df: pd.DataFrame | None) -> str:
+    # full_prompt already embeds the user prompt, data context and RAG context
+    return hashlib.sha256("\x1e".join([GEMINI_MODEL, full_prompt, _df_fingerprint(df)]).encode("utf-8")).hexdigest()
+
+def _cache_connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(RESPONSE_CACHE_PATH), exist_ok=True)
+    conn = sqlite3.connect(RESPONSE_CACHE_PATH, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")  # Concurrent readers across worker processes
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS responses "
+        "(key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+    )
+    return conn
+
+def _cache_get(key: str) -> str | None:
+    try:
+        conn = _cache_connect()
+        try:
+            now = time.time()
+            with conn:
+                row = conn.execute(
+                    "SELECT response FROM responses WHERE key = ? AND created > ?",
+                    (key, now - RESPONSE_CACHE_TTL_SECONDS),
+                ).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return row[0] if row else None
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None  # Cache trouble never blocks an answer
+
+def _cache_put(key: str, response: str) -> None:
+    try:
+        conn = _cache_connect()
+        try:
+            now = time.time()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, response, now, now))
+                # Expire by TTL, then evict least recently used beyond the size bound
+                conn.execute("DELETE FROM responses WHERE created <= ?", (now - RESPONSE_CACHE_TTL_SECONDS,))
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (RESPONSE_CACHE_MAX_ENTRIES,),
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+
+class _RateLimiter:
+    """Sliding-window limiter: at most `per_minute` calls in any 60s window."""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self.calls = deque()
+        self.lock = threading.Lock()
+
+    @perf.timed("llm.rate_limit_wait")
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.calls and now - self.calls[0] >= 60:
+                    self.calls.popleft()
+                if len(self.calls) < self.per_minute:
+                    self.calls.append(now)
+                    return
+                wait = 60 - (now - self.calls[0])
+            time.sleep(wait)
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def _rate_limiter(api_key: str) -> _RateLimiter:
+    with _limiters_lock:
+        if api_key not in _limiters:
+            _limiters[api_key] = _RateLimiter(GEMINI_REQUESTS_PER_MINUTE)
+        return _limiters[api_key]
+
+@perf.timed("llm.build_prompt")
+def _build_prompt(user_prompt: str, context: str = "", df: pd.DataFrame = None) -> str:
     # RAG context first
     rag_context = retrieve_context(user_prompt)
-    
+
     # Analytics
     analytics_context = ""
     if df is not None and not df.empty:
@@ -21,10 +138,10 @@ def ask_gemini(user_prompt: str, context: str = "", df: pd.DataFrame = None) ->
                 val = df["yoy_pct"].iloc[-1]
                 if not pd.isna(val):
                     latest_yoy = f"{val:.2f}%"
-            
+
             trend = detect_trend(df).get("recent_trend", "N/A")
             anoms_last_year = len(df[df["anomaly"]].tail(12)) if "anomaly" in df.columns else 0
-            
+
             analytics_context = f"""
 Key Analytics:
 - Latest YoY Change: {latest_yoy}
@@ -33,7 +150,7 @@ Key Analytics:
 """
         except Exception:
             analytics_context = "Analytics unavailable."
-    
+
     full_prompt = f"""
 You are an expert economic analyst advising business leaders on strategy and pricing.
 Expert Knowledge (from FRED metadata and curated notes): {rag_context}
@@ -44,8 +161,81 @@ Question: {user_prompt}
 
 Respond professionally in bullets, with clear business implications.
 """
+    perf.annotate(chars=len(full_prompt))
+    return full_prompt
+
+@perf.timed("llm.ask")
+def ask_gemini(user_prompt: str, context: str = "", df: pd.DataFrame = None) -> str:
+    full_prompt = _build_prompt(user_prompt, context, df)
+    key = _cache_key(full_prompt, df)
+    cached = _cache_get(key)
+    if cached is not None:
+        perf.annotate(cache="hit")
+        return cached
+    perf.annotate(cache="miss")
+
     try:
-        response = model.generate_content(full_prompt)
-        return response.text.strip()
+        _rate_limiter(GOOGLE_API_KEY).acquire()
+        with perf.span("llm.generate", model=GEMINI_MODEL, prompt_chars=len(full_prompt)) as span:
+            response = _get_model().generate_content(full_prompt)
+            text = response.text.strip()
+            span.set(bytes=len(text.encode("utf-8")))
     except Exception as e:
-        return f"Gemini error: {str(e)}. Try again."
\ No newline at end of file
+        return f"Gemini error: {str(e)}. Try again."
+    if text:
+        _cache_put(key, text)  # Errors and empty answers aren't cached
+    return text
+
+def ask_gemini_stream(user_prompt: str, context: str = "", df: pd.DataFrame = None):
+    """Same as ask_gemini but yields text as Gemini generates it (for st.write_stream).
+
+    Timing is recorded once the stream ends (spans can't stay open across yields): "llm.ask_stream" for the
+    whole answer and "llm.generate_stream" with time to first chunk.
+    """
+    start = time.perf_counter()
+    full_prompt = _build_prompt(user_prompt, context, df)
+    key = _cache_key(full_prompt, df)
+    cached = _cache_get(key)
+    if cached is not None:
+        perf.record("llm.ask_stream", (time.perf_counter() - start) * 1000, cache="hit")
+        yield cached
+        return
+
+    parts = []
+    first_chunk_ms = None
+    try:
+        _rate_limiter(GOOGLE_API_KEY).acquire()
+        generate_start = time.perf_counter()
+        for chunk in _get_model().generate_content(full_prompt, stream=True):
+            try:
+                text = chunk.text
+            except ValueError:
+                continue  # Chunks without text parts (e.g. a bare finish chunk)
+            if text:
+                if first_chunk_ms is None:
+                    first_chunk_ms = (time.perf_counter() - generate_start) * 1000
+                parts.append(text)
+                yield text
+    except Exception as e:
+        perf.record("llm.ask_stream", (time.perf_counter() - start) * 1000, cache="miss", error=type(e).__name__)
+        yield f"Gemini error: {str(e)}. Try again."
+        return
+    answer = "".join(parts).strip()
+    perf.record("llm.generate_stream", (time.perf_counter() - generate_start) * 1000, model=GEMINI_MODEL,
+                prompt_chars=len(full_prompt), first_chunk_ms=first_chunk_ms, bytes=len(answer.encode("utf-8")))
+    perf.record("llm.ask_stream", (time.perf_counter() - start) * 1000, cache="miss")
+    if not answer:
+        yield "Gemini returned no text (the response may have been blocked). Try rephrasing."
+        return  # Not cached, so the next ask tries again
+    _cache_put(key, answer)
+
+def ask_gemini_many(requests: list[tuple]) -> list[str]:
+    """Run independent ask_gemini calls concurrently.
+
+    requests holds (user_prompt, context, df) tuples; answers come back in the same order.
+    Calls share the per-key rate limiter, so bursts queue rather than hit quota errors.
+    """
+    if not requests:
+        return []
+    with ThreadPoolExecutor(max_workers=min(GEMINI_MAX_CONCURRENCY, len(requests))) as pool:
+        return list(pool.map(lambda args: ask_gemini(*args), requests))
@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from utils.fred_api import get_series_observations
+from utils.bls_api import get_bls_series, get_bls_series_batch
+from utils.treasury_api import get_fiscaldata_series
+from utils.anomalies import update_anomalies
+
+MAX_WORKERS = 16
+
+def fetch_series(source: str, series_id: str | None, force_refresh: bool = False, start=None, end=None) -> pd.DataFrame:
+    """Fetch one series from its source client as a date/value DataFrame."""
+    if source == "fred":
+        return get_series_observations(series_id, force_refresh=force_refresh, start=start, end=end)
+    if source == "bls":
+        return get_bls_series(series_id, force_refresh=force_refresh, start=start, end=end)
+    if source == "treasury":
+        return get_fiscaldata_series(series_id or "debt_to_penny", force_refresh=force_refresh, start=start, end=end)
+    raise ValueError(f"Unknown source: {source}")
+
+def load_series(specs: dict, force_refresh: bool = False, start=None, end=None) -> tuple[dict, dict]:
+    """Fetch every (source, series_id) in specs concurrently.
+
+    specs maps a display name to (source, series_id). Returns (frames, errors), both keyed by name,
+    so one failing series doesn't sink the others. Per-source concurrency is capped in utils.http_client.
+    """
+    if not specs:
+        return {}, {}
+
+    ctx = get_script_run_ctx()  # Lets st.error/st.warning from the clients reach the page
+
+    def _run(fn, *args):
+        if ctx is not None:
+            add_script_run_ctx(ctx=ctx)
+        return fn(*args)
+
+    def _fetch_one(name):
+        source, series_id = specs[name]
+        df = fetch_series(source, series_id, force_refresh=force_refresh, start=start, end=end)
+        update_anomalies(source, series_id)  # O(new rows) once the series has been seen before
+        return df
+
+    def _fetch_bls(names):
+        # One batched BLS call packs every selected BLS series into as few POSTs as possible
+        by_id = get_bls_series_batch([specs[name][1] for name in names], force_refresh=force_refresh, start=start, end=end)
+        for series_id in by_id:
+            update_anomalies("bls", series_id)
+        return {name: by_id.get(specs[name][1]) for name in names}
+
+    bls_names = [name for name in specs if specs[name][0] == "bls"]
+    frames, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(specs))) as pool:
+        futures = {name: pool.submit(_run, _fetch_one, name) for name in specs if name not in bls_names}
+        bls_future = pool.submit(_run, _fetch_bls, bls_names) if bls_names else None
+
+        for name, future in futures.items():
+            try:
+                frames[name] = future.result()
+            except Exception as e:
+                errors[name] = e
+        if bls_future is not None:
+            try:
+                for name, df in bls_future.result().items():
+                    if df is None:
+                        errors[name] = ValueError(f"BLS returned no data for {specs[name][1]}")
+                    else:
+                        frames[name] = df
+            except Exception as e:
+                errors.update({name: e for name in bls_names})
+    return frames, errors
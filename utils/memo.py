@@ -0,0 +1,162 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from utils import store
+
+# Process-wide memo shared by every Streamlit session and rerun. Keys embed the data versions of the
+# stored series they derive from, so a refresh naturally misses and stale entries age out of the LRU.
+# Cached values are shared: callers must treat them as read-only (copy before mutating).
+# persist=True adds a disk layer under the store (pickles keyed by the key's repr), which jobs/refresh.py
+# fills ahead of time and every worker process reads.
+# Cached ndarrays are made read-only, so an in-place write fails instead of leaking into other sessions.
+
+MAX_ENTRIES = 512
+MAX_BYTES = 512 * 1024 * 1024
+PERSIST_SUBDIR = "derived"
+_MISSING = object()
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # key -> (value, nbytes)
+_total_bytes = 0
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "disk_hits": 0}
+
+def nbytes(value) -> int:
+    """Approximate bytes held by frames/arrays in value (containers summed, anything else counted as 64)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(nbytes(v) for v in value)
+    return 64
+
+def _freeze(value) -> None:
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for v in value.values():
+            _freeze(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _freeze(v)
+
+def _evict() -> None:
+    global _total_bytes
+    while _entries and (len(_entries) > MAX_ENTRIES or _total_bytes > MAX_BYTES):
+        _, (_, nbytes) = _entries.popitem(last=False)
+        _total_bytes -= nbytes
+        _stats["evictions"] += 1
+
+def _persisted_path(key) -> str:
+    digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+    return os.path.join(store.STORE_DIR, PERSIST_SUBDIR, f"{digest}.pkl")
+
+def _load_persisted(key):
+    path = _persisted_path(key)
+    try:
+        with open(path, "rb") as f:
+            stored_key, value = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return _MISSING
+    if stored_key != repr(key):
+        return _MISSING  # Hash collision (or a file from an incompatible version)
+    os.utime(path)  # Recently read entries survive prune_persisted
+    return value
+
+def _save_persisted(key, value) -> None:
+    path = _persisted_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump((repr(key), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+def get_or_compute(key, compute, persist: bool = False):
+    """Return the memoized value for key, computing (outside the lock) and storing it on a miss.
+
+    With persist=True a memory miss first tries the disk layer, and computed values are written to it.
+    """
+    global _total_bytes
+    with _lock:
+        if key in _entries:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            return _entries[key][0]
+        _stats["misses"] += 1
+
+    value = _load_persisted(key) if persist else _MISSING
+    if value is _MISSING:
+        value = compute()
+        if persist:
+            _save_persisted(key, value)
+    elif persist:
+        with _lock:
+            _stats["disk_hits"] += 1
+    _freeze(value)
+    size = nbytes(value)
+    with _lock:
+        if key not in _entries:
+            _entries[key] = (value, size)
+            _total_bytes += size
+            _evict()
+    return value
+
+def clear() -> None:
+    global _total_bytes
+    with _lock:
+        _entries.clear()
+        _total_bytes = 0
+
+def prune_persisted(max_age_seconds: float) -> int:
+    """Delete disk-layer entries not written or read for max_age_seconds; returns how many went."""
+    directory = os.path.join(store.STORE_DIR, PERSIST_SUBDIR)
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+def stats() -> dict:
+    """Entry count, approximate bytes held and hit/miss/eviction counters."""
+    with _lock:
+        return {"entries": len(_entries), "bytes": _total_bytes, **_stats}
+
+def versions(specs) -> tuple:
+    """Data versions of (source, series_id) pairs, for use in derived keys."""
+    return tuple(store.data_version(source, series_id) for source, series_id in specs)
+
+def slice_range(df: pd.DataFrame, start=None, end=None, column: str | None = "date") -> pd.DataFrame:
+    """Rows of a date-sorted frame within [start, end] by binary search (column=None uses the index)."""
+    dates = (df.index if column is None else df[column]).to_numpy(dtype="datetime64[ns]")
+    lo = 0 if start is None else np.searchsorted(dates, pd.Timestamp(start).as_unit("ns").to_datetime64(), side="left")
+    hi = len(df) if end is None else np.searchsorted(dates, pd.Timestamp(end).as_unit("ns").to_datetime64(), side="right")
+    return df.iloc[lo:hi]
+
+def get_series(source: str, series_id: str, start=None, end=None) -> pd.DataFrame | None:
+    """Stored series memoized in memory by (source, series_id, data_version); ranges are slices of it."""
+    version = store.data_version(source, series_id)
+    if version is None:
+        return None
+    full = get_or_compute(("series", source, series_id, version), lambda: store.get_series(source, series_id))
+    if full is None:
+        return None
+    return slice_range(full, start, end)
@@ -0,0 +1,102 @@
+import os
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+from config.settings import MEMORY_PANEL
+from utils import memo, store
+
+# Memory report for sizing workers: what this process holds once for everyone (memo, mapped store files) vs
+# what each session holds privately in st.session_state. Sessions are tracked when a page renders the panel
+# and forgotten after SESSION_IDLE_SECONDS without a rerun.
+SESSION_IDLE_SECONDS = 3600
+
+_lock = threading.Lock()
+_sessions = {}  # session id -> {"bytes", "keys", "last_seen"}
+
+def process_rss() -> int | None:
+    """Resident set size of this process in bytes (Linux /proc; peak RSS elsewhere), None if unknown."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def deep_size(value) -> int:
+    """Approximate bytes held by a session value (frames/arrays by their buffers, containers recursively)."""
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return memo.nbytes(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(deep_size(k) + deep_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(deep_size(v) for v in value)
+    return sys.getsizeof(value)
+
+def session_report(state) -> dict:
+    """Bytes per session_state key (largest first) and their total."""
+    sizes = {}
+    for key in list(state.keys()):
+        try:
+            sizes[str(key)] = deep_size(state[key])
+        except KeyError:
+            continue  # Removed by another thread mid-report
+    sizes = dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
+    return {"bytes": sum(sizes.values()), "keys": sizes}
+
+def track_session(session_id: str, state) -> dict:
+    """Record a session's current footprint for the process report; returns its session_report."""
+    report = session_report(state)
+    now = time.time()
+    with _lock:
+        _sessions[session_id] = {**report, "last_seen": now}
+        for idle in [sid for sid, s in _sessions.items() if now - s["last_seen"] > SESSION_IDLE_SECONDS]:
+            del _sessions[idle]
+    return report
+
+def process_report() -> dict:
+    """Shared (memo, memory-mapped store) vs per-session bytes for this process, plus its RSS."""
+    with _lock:
+        sessions = {sid: s["bytes"] for sid, s in _sessions.items()}
+    memo_stats = memo.stats()
+    return {
+        "pid": os.getpid(),
+        "rss_bytes": process_rss(),
+        "memo_bytes": memo_stats["bytes"],
+        "memo_entries": memo_stats["entries"],
+        "mapped_store_bytes": store.mapped_bytes(),
+        "sessions": len(sessions),
+        "session_bytes": sum(sessions.values()),
+        "per_session_bytes": sessions,
+    }
+
+def _mb(nbytes) -> str:
+    return "n/a" if nbytes is None else f"{nbytes / 1e6:,.1f} MB"
+
+def render_panel() -> None:
+    """Track this session and, when MEMORY_PANEL is set, show session/process memory in the sidebar."""
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    session = track_session(ctx.session_id if ctx else "local", st.session_state)
+    if not MEMORY_PANEL:
+        return
+
+    with st.sidebar.expander("Memory"):
+        report = process_report()
+        col1, col2 = st.columns(2)
+        col1.metric("This session", _mb(session["bytes"]))
+        col2.metric("Process RSS", _mb(report["rss_bytes"]))
+        st.caption(
+            f"Shared: memo {_mb(report['memo_bytes'])} ({report['memo_entries']} entries), "
+            f"mapped store {_mb(report['mapped_store_bytes'])}. "
+            f"{report['sessions']} active sessions hold {_mb(report['session_bytes'])} in total."
+        )
+        st.dataframe(pd.Series(session["keys"], name="bytes").rename_axis("session_state key"))
@@ -0,0 +1,212 @@
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from config.settings import PERF_PANEL, PERF_SPANS
+
+# Lightweight timing spans for the app's stages (HTTP, parsing, alignment, analytics, RAG, Gemini, page
+# blocks). Every span feeds a per-process histogram keyed by stage name, plus cache hit/miss, byte and row
+# counters from its attributes; the most recent spans are kept for an OpenTelemetry (OTLP/JSON) export.
+# Spans nest within a thread, so a page block's stages share its trace.
+
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+RECENT_SPANS = 2000
+SERVICE_NAME = "macro-econ-analytics-prototype"
+
+_lock = threading.Lock()
+_stages = {}  # stage name -> histogram/counter dict
+_recent = deque(maxlen=RECENT_SPANS)
+_current = contextvars.ContextVar("perf_span", default=None)
+_started_ns = time.time_ns()
+
+class Span:
+    """One timed stage; set() attaches attributes (cache="hit"/"miss", bytes, rows, ...)."""
+
+    __slots__ = ("name", "attrs", "trace_id", "span_id", "parent_id", "start_ns", "end_ns")
+
+    def __init__(self, name: str, attrs: dict, parent: "Span | None" = None):
+        self.name = name
+        self.attrs = attrs
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+def _new_stage() -> dict:
+    return {"count": 0, "sum_ms": 0.0, "min_ms": float("inf"), "max_ms": 0.0, "buckets": [0] * (len(BUCKETS_MS) + 1),
+            "cache_hits": 0, "cache_misses": 0, "bytes": 0, "rows": 0, "errors": 0}
+
+def _record(span: Span, ms: float) -> None:
+    with _lock:
+        stage = _stages.get(span.name)
+        if stage is None:
+            stage = _stages[span.name] = _new_stage()
+        stage["count"] += 1
+        stage["sum_ms"] += ms
+        stage["min_ms"] = min(stage["min_ms"], ms)
+        stage["max_ms"] = max(stage["max_ms"], ms)
+        stage["buckets"][bisect_left(BUCKETS_MS, ms)] += 1
+        cache = span.attrs.get("cache")
+        if cache == "hit":
+            stage["cache_hits"] += 1
+        elif cache == "miss":
+            stage["cache_misses"] += 1
+        stage["bytes"] += int(span.attrs.get("bytes", 0) or 0)
+        stage["rows"] += int(span.attrs.get("rows", 0) or 0)
+        stage["errors"] += "error" in span.attrs
+        _recent.append(span)
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time the enclosed block as stage `name`; yields the Span so callers can add attributes."""
+    if not PERF_SPANS:
+        yield Span(name, attrs)
+        return
+    current = Span(name, attrs, _current.get())
+    token = _current.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current.reset(token)
+        _record(current, (time.perf_counter() - start) * 1000)
+
+def record(name: str, ms: float, **attrs) -> None:
+    """Record an already-measured stage (e.g. a generator consumed elsewhere) without a context manager."""
+    if PERF_SPANS:
+        parent = _current.get()
+        done = Span(name, attrs, parent)
+        done.end_ns = time.time_ns()
+        done.start_ns = done.end_ns - int(ms * 1e6)
+        _record(done, ms)
+
+def annotate(**attrs) -> None:
+    """Attach attributes to the innermost open span in this thread (no-op outside a span)."""
+    current = _current.get()
+    if current is not None:
+        current.set(**attrs)
+
+def timed(name: str | None = None):
+    """Decorator: run the function inside a span named `name` (default module.function)."""
+    def decorate(fn):
+        stage = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def _quantile(stage: dict, q: float) -> float:
+    """Upper bound of the histogram bucket holding quantile q (capped at the observed max)."""
+    target = q * stage["count"]
+    seen = 0
+    for bound, count in zip(BUCKETS_MS + (float("inf"),), stage["buckets"]):
+        seen += count
+        if seen >= target:
+            return min(bound, stage["max_ms"])
+    return stage["max_ms"]
+
+def summary() -> list[dict]:
+    """One row per stage, slowest total first: count, mean/p50/p95/max ms, cache hit rate, bytes, rows, errors."""
+    with _lock:
+        stages = {name: dict(stage, buckets=list(stage["buckets"])) for name, stage in _stages.items()}
+    rows = []
+    for name, stage in stages.items():
+        lookups = stage["cache_hits"] + stage["cache_misses"]
+        rows.append({
+            "stage": name, "count": stage["count"], "total_ms": stage["sum_ms"], "mean_ms": stage["sum_ms"] / stage["count"],
+            "p50_ms": _quantile(stage, 0.5), "p95_ms": _quantile(stage, 0.95), "max_ms": stage["max_ms"],
+            "hit_rate": stage["cache_hits"] / lookups if lookups else None,
+            "bytes": stage["bytes"], "rows": stage["rows"], "errors": stage["errors"],
+        })
+    return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+def reset() -> None:
+    global _started_ns
+    with _lock:
+        _stages.clear()
+        _recent.clear()
+        _started_ns = time.time_ns()
+
+def export_json() -> dict:
+    """Raw per-process histograms (bucket upper bounds in BUCKETS_MS, last bucket unbounded) and counters."""
+    with _lock:
+        stages = {name: dict(stage, buckets=list(stage["buckets"])) for name, stage in _stages.items()}
+    return {"service": SERVICE_NAME, "pid": os.getpid(), "since_unix_ns": _started_ns, "exported_unix_ns": time.time_ns(),
+            "buckets_ms": list(BUCKETS_MS), "stages": stages}
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _otlp_attributes(attrs: dict) -> list[dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attrs.items() if value is not None]
+
+def export_otlp() -> dict:
+    """OTLP/JSON bodies for a collector: {"v1/traces": recent spans, "v1/metrics": stage duration histograms}."""
+    resource = {"attributes": _otlp_attributes({"service.name": SERVICE_NAME, "process.pid": os.getpid()})}
+    scope = {"name": "utils.perf"}
+    with _lock:
+        spans = list(_recent)
+        stages = {name: dict(stage, buckets=list(stage["buckets"])) for name, stage in _stages.items()}
+    now = str(time.time_ns())
+
+    traces = {"resourceSpans": [{"resource": resource, "scopeSpans": [{"scope": scope, "spans": [
+        {"traceId": s.trace_id, "spanId": s.span_id, "parentSpanId": s.parent_id or "", "name": s.name, "kind": 1,
+         "startTimeUnixNano": str(s.start_ns), "endTimeUnixNano": str(s.end_ns), "attributes": _otlp_attributes(s.attrs),
+         "status": {"code": 2 if "error" in s.attrs else 0}}
+        for s in spans
+    ]}]}]}
+    data_points = [
+        {"attributes": _otlp_attributes({"stage": name}), "startTimeUnixNano": str(_started_ns), "timeUnixNano": now,
+         "count": str(stage["count"]), "sum": stage["sum_ms"], "min": stage["min_ms"], "max": stage["max_ms"],
+         "bucketCounts": [str(c) for c in stage["buckets"]], "explicitBounds": [float(b) for b in BUCKETS_MS]}
+        for name, stage in stages.items()
+    ]
+    metrics = {"resourceMetrics": [{"resource": resource, "scopeMetrics": [{"scope": scope, "metrics": [
+        {"name": "app.stage.duration", "unit": "ms", "description": "Wall time per instrumented stage",
+         "histogram": {"aggregationTemporality": 2, "dataPoints": data_points}},  # 2 = cumulative
+    ]}]}]}
+    return {"v1/traces": traces, "v1/metrics": metrics}
+
+def render_panel() -> None:
+    """Sidebar expander with the stage table and JSON/OTLP downloads (only when PERF_PANEL is set)."""
+    if not PERF_PANEL:
+        return
+    import pandas as pd
+    import streamlit as st
+
+    with st.sidebar.expander("Performance (this process)"):
+        rows = summary()
+        if not rows:
+            st.caption("No spans recorded yet.")
+            return
+        table = pd.DataFrame(rows).set_index("stage")
+        st.dataframe(table[["count", "p50_ms", "p95_ms", "max_ms", "total_ms", "hit_rate", "bytes", "errors"]].round(2))
+        st.download_button("Histograms (JSON)", json.dumps(export_json()), file_name="perf_stages.json",
+                           mime="application/json")
+        st.download_button("Spans + metrics (OTLP JSON)", json.dumps(export_otlp()), file_name="perf_otlp.json",
+                           mime="application/json")
+        if st.button("Reset", key="perf_reset"):
+            reset()
@@ -1,23 +1,61 @@
 import os
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
+import threading
+from functools import lru_cache
+from utils import perf
 
 DB_PATH = os.path.join("rag", "vectorstore")
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+QUERY_CACHE_SIZE = 1024
+
+# Loaded once per process and shared by every Streamlit session/thread. The langchain/torch
+# imports happen on first use so importing this module stays cheap.
+_lock = threading.Lock()
+_embeddings = None
+_vectorstore = None
+
+def get_embeddings():
+    """Process-wide embedding model (loading it dominates first-query latency)."""
+    global _embeddings
+    if _embeddings is None:
+        with _lock:
+            if _embeddings is None:
+                with perf.span("rag.load_embeddings", model=EMBEDDING_MODEL):
+                    from langchain_huggingface import HuggingFaceEmbeddings
+                    _embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    return _embeddings
+
+def get_vectorstore():
+    """Process-wide handle on the persisted Chroma store."""
+    global _vectorstore
+    if _vectorstore is None:
+        if not os.path.exists(DB_PATH):
+            raise FileNotFoundError("RAG vectorstore not found—run rag/ingest.py first.")
+        embeddings = get_embeddings()
+        with _lock:
+            if _vectorstore is None:
+                with perf.span("rag.load_vectorstore"):
+                    from langchain_community.vectorstores import Chroma
+                    _vectorstore = Chroma(persist_directory=DB_PATH, embedding_function=embeddings)
+    return _vectorstore
 
 def get_retriever(k: int = 5):
     """Load or rebuild local Chroma retriever."""
-    if not os.path.exists(DB_PATH):
-        raise FileNotFoundError("RAG vectorstore not found—run rag/ingest.py first.")
-    
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    db = Chroma(persist_directory=DB_PATH, embedding_function=embeddings)
-    return db.as_retriever(search_kwargs={"k": k})
+    return get_vectorstore().as_retriever(search_kwargs={"k": k})
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _embed_query(query: str) -> tuple[float, ...]:
+    perf.annotate(cache="miss")  # Only runs on an lru_cache miss
+    return tuple(get_embeddings().embed_query(query))
 
 def retrieve_context(query: str, k: int = 5) -> str:
     """Retrieve top-k relevant chunks as context string."""
     try:
-        retriever = get_retriever(k=k)
-        docs = retriever.invoke(query)
+        store = get_vectorstore()
+        with perf.span("rag.embed_query", cache="hit", chars=len(query)):
+            vector = list(_embed_query(query))
+        with perf.span("rag.search", k=k) as span:
+            docs = store.similarity_search_by_vector(vector, k=k)
+            span.set(rows=len(docs))
         if not docs:
             return "No relevant expert context found."
         context = "\n\n".join([
@@ -26,4 +64,4 @@ def retrieve_context(query: str, k: int = 5) -> str:
         ])
         return context
     except Exception as e:
-        return f"RAG retrieval error: {str(e)}"
\ No newline at end of file
+        return f"RAG retrieval error: {str(e)}"
@@ -0,0 +1,83 @@
+import queue
+import threading
+import time
+from config.settings import CACHE_TTL_SECONDS, SERIES_CACHE_TTL_SECONDS
+from utils import perf, store
+
+# Stale-while-revalidate for the series store. Clients serve an expired series straight away and hand its
+# refresh to one background thread; a key that is already queued or in flight isn't queued again, so any
+# number of sessions asking for the same stale series cause a single upstream fetch.
+DEFAULT_TTL_SECONDS = 86400
+RETRY_AFTER_FAILURE_SECONDS = 300  # Don't hammer an API that just failed; stale data keeps being served
+
+_lock = threading.Lock()
+_jobs = queue.Queue()
+_pending = set()  # (source, series_id) queued or being refreshed
+_failures = {}  # (source, series_id) -> (unix time, error message) of the last failed refresh
+_thread = None
+
+def ttl_seconds(source: str, series_id: str) -> float:
+    """Freshness window for a series: per-series override, else the source's TTL."""
+    return SERIES_CACHE_TTL_SECONDS.get((source, series_id), CACHE_TTL_SECONDS.get(source, DEFAULT_TTL_SECONDS))
+
+def is_fresh(source: str, series_id: str) -> bool:
+    age = store.age_seconds(source, series_id)
+    return age is not None and age < ttl_seconds(source, series_id)
+
+def _worker() -> None:
+    from utils.anomalies import update_anomalies  # Keep z-scores in step with refreshed values
+
+    while True:
+        source, series_ids, fetch = _jobs.get()
+        error = None
+        try:
+            with perf.span(f"{source}.background_refresh", series=len(series_ids)):
+                fetch(series_ids)
+                for series_id in series_ids:
+                    update_anomalies(source, series_id)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        with _lock:
+            for series_id in series_ids:
+                _pending.discard((source, series_id))
+                if error is None:
+                    _failures.pop((source, series_id), None)
+                else:
+                    _failures[(source, series_id)] = (time.time(), error)
+
+def schedule(source: str, series_ids, fetch) -> list[str]:
+    """Queue fetch(ids) for the series that aren't already pending or in failure backoff.
+
+    fetch must write the store itself (and not touch Streamlit). Returns the ids actually queued.
+    """
+    global _thread
+    now = time.time()
+    with _lock:
+        queued = [
+            series_id for series_id in dict.fromkeys(series_ids)
+            if (source, series_id) not in _pending
+            and now - _failures.get((source, series_id), (0.0, None))[0] >= RETRY_AFTER_FAILURE_SECONDS
+        ]
+        if not queued:
+            return []
+        _pending.update((source, series_id) for series_id in queued)
+        if _thread is None:
+            _thread = threading.Thread(target=_worker, name="series-refresher", daemon=True)
+            _thread.start()
+    _jobs.put((source, queued, fetch))
+    return queued
+
+def status() -> dict:
+    """Pending refreshes and the last failure per series still in backoff."""
+    with _lock:
+        return {"pending": sorted(_pending), "failures": dict(_failures)}
+
+def wait_idle(timeout: float = 30.0) -> bool:
+    """Block until nothing is pending (for scripts and benchmarks); False on timeout."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with _lock:
+            if not _pending:
+                return True
+        time.sleep(0.05)
+    return False
@@ -0,0 +1,393 @@
+import hashlib
+import io
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import date
+from functools import lru_cache
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import pandas as pd
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from config import settings
+from utils import synthetic
+from utils.http_client import POOL_SIZE
+
+# Offline stand-in for the FRED, BLS, Treasury and Gemini APIs, for load tests and benchmarks without
+# network access. ReplayAdapter is a requests transport mounted on the http_client sessions, so every
+# client (and rag/ingest.py) runs its real paging/retry/caching code against it. Modes:
+#   synthetic - generated responses in each API's own JSON shape (utils/synthetic.py), seeded per series
+#   replay    - recorded responses from REPLAY_DIR only; anything unrecorded is a 404
+#   record    - call the live API and save every successful response to REPLAY_DIR
+# Latency (with +/-50% jitter), injected 5xx errors, timeouts and a page-size cap are configurable.
+# Set API_REPLAY (and friends, see config/settings.py) to route the whole app through it.
+
+REPLAY_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "replay")
+MODES = ("synthetic", "replay", "record")
+SECRET_PARAMS = {"api_key", "registrationkey"}  # Never part of recording keys or files
+
+# Synthetic FRED series: id -> (frequency, history start, starting value); anything else is monthly
+FRED_SERIES = {
+    "GDP": ("Q", "1947-01-01", 2000.0),
+    "CPIAUCSL": ("M", "1947-01-01", 22.0),
+    "UNRATE": ("M", "1948-01-01", 5.0),
+    "FEDFUNDS": ("M", "1954-07-01", 3.0),
+    "PPIACO": ("M", "1913-01-01", 12.0),
+    "GS10": ("M", "1953-04-01", 3.0),
+    "PCEPI": ("M", "1959-01-01", 15.0),
+    "RSXFS": ("M", "1992-01-01", 150000.0),
+}
+# Synthetic FiscalData datasets: name -> (frequency, starting value in charted units)
+TREASURY_SERIES = {
+    "debt_to_penny": ("D", 5600.0),
+    "avg_interest_rate_marketable": ("M", 6.0),
+    "dts_tga_closing_balance": ("D", 50.0),
+}
+BLS_HISTORY_START = "1990-01-01"
+LISTING_SIZE = 2500  # Series per synthetic FRED category/release
+CATALOG_SIZE = 2000  # Rows per synthetic BLS catalog file
+BLS_SURVEYS = {"CE": "Employment, Hours, and Earnings from the CES survey", "CU": "Consumer Price Index - All Urban Consumers",
+               "LN": "Labor Force Statistics from the Current Population Survey", "JT": "Job Openings and Labor Turnover Survey"}
+
+def _seed(key: str) -> int:
+    return zlib.crc32(key.encode("utf-8"))
+
+@lru_cache(maxsize=256)
+def _history(key: str, freq: str, start: str, start_value: float) -> pd.DataFrame:
+    """Full synthetic history for one series, from `start` to today (memoized; treat as read-only)."""
+    dates = pd.date_range(start, pd.Timestamp(date.today()), freq=synthetic.FREQUENCIES[freq])
+    return synthetic.synthetic_series(len(dates), freq, seed=_seed(key), end=dates[-1], start_value=start_value)
+
+def _fred_meta(series_id: str) -> dict:
+    freq, start, _ = FRED_SERIES.get(series_id, ("M", "1990-01-01", 100.0))
+    return {
+        "id": series_id, "title": f"Synthetic series {series_id}", "observation_start": start,
+        "observation_end": date.today().isoformat(), "frequency": {"Q": "Quarterly", "M": "Monthly"}[freq],
+        "frequency_short": freq, "units": "Index", "seasonal_adjustment": "Seasonally Adjusted",
+        "last_updated": f"{date.today().isoformat()} 07:45:00-05", "popularity": 50,
+        "notes": f"Offline stand-in for {series_id}; values are a seeded random walk.",
+    }
+
+def _page(params: dict, default_limit: int, page_size: int | None) -> tuple[int, int]:
+    offset = int(params.get("offset", 0))
+    limit = int(params.get("limit", default_limit))
+    return offset, min(limit, page_size) if page_size else limit
+
+def _fred(path: str, params: dict, page_size: int | None):
+    if path.endswith("/series/observations"):
+        series_id = params["series_id"].upper()
+        freq, start, start_value = FRED_SERIES.get(series_id, ("M", "1990-01-01", 100.0))
+        history = _history(f"fred:{series_id}", freq, start, start_value)
+        if params.get("observation_start"):
+            history = history[history["date"] >= pd.Timestamp(params["observation_start"])].reset_index(drop=True)
+        offset, limit = _page(params, 100000, page_size)
+        return 200, synthetic.fred_observations_payload(history, offset, limit, seed=_seed(series_id))
+    if path.endswith("/category/series") or path.endswith("/release/series"):
+        parent = params.get("category_id") or params.get("release_id")
+        offset, limit = _page(params, 1000, page_size)
+        ids = [f"SYN{parent}X{i:05d}" for i in range(offset, min(offset + limit, LISTING_SIZE))]
+        return 200, {"count": LISTING_SIZE, "offset": offset, "limit": limit, "seriess": [_fred_meta(i) for i in ids]}
+    if path.endswith("/series"):
+        return 200, {"seriess": [_fred_meta(params["series_id"].upper())]}
+    return 404, {"error_code": 404, "error_message": f"Unknown FRED endpoint {path}"}
+
+def _bls(path: str, body: dict):
+    if path.rstrip("/").endswith("/timeseries/data"):
+        start, end = int(body["startyear"]), int(body["endyear"])
+        series = {}
+        for series_id in body["seriesid"]:
+            history = _history(f"bls:{series_id}", "M", BLS_HISTORY_START, 30.0)
+            years = history["date"].dt.year
+            series[series_id] = history[(years >= start) & (years <= end)]
+        return 200, synthetic.bls_timeseries_payload(series)
+    if path.rstrip("/").endswith("/surveys"):
+        surveys = [{"survey_abbreviation": abbr, "survey_name": name} for abbr, name in BLS_SURVEYS.items()]
+        return 200, {"status": "REQUEST_SUCCEEDED", "responseTime": 40, "message": [], "Results": {"survey": surveys}}
+    return 404, {"status": "REQUEST_NOT_PROCESSED", "message": [f"Unknown BLS endpoint {path}"]}
+
+def _bls_catalog(path: str) -> tuple[int, str]:
+    """Tab-separated time.series catalog, like download.bls.gov/pub/time.series/<survey>/<survey>.series."""
+    abbr = path.rstrip("/").split("/")[-1].split(".")[0].upper()
+    lines = ["series_id\tseasonal\tseries_title\tfootnote_codes\tbegin_year\tbegin_period\tend_year\tend_period"]
+    lines += [f"{abbr}U{i:010d}\tS\tSynthetic {abbr} series {i}\t\t1990\tM01\t{date.today().year}\tM01"
+              for i in range(CATALOG_SIZE)]
+    return 200, "\n".join(lines) + "\n"
+
+def _treasury(path: str, params: dict, page_size: int | None):
+    from utils.treasury_api import FISCALDATA_DATASETS
+    name = next((n for n, spec in FISCALDATA_DATASETS.items() if path.endswith(spec["endpoint"])), None)
+    if name is None:
+        return 404, {"error": "Not Found", "message": f"Unknown FiscalData endpoint {path}"}
+    spec = FISCALDATA_DATASETS[name]
+    freq, start_value = TREASURY_SERIES.get(name, ("D", 100.0))
+    history = _history(f"treasury:{name}", freq, "2000-01-01", start_value)
+    for clause in params.get("filter", "").split(","):
+        field, op, value = (clause.split(":", 2) + ["", ""])[:3]
+        if field == spec.get("date_field", "record_date") and op in ("gt", "gte"):
+            bound = pd.Timestamp(value)
+            history = history[history["date"] > bound if op == "gt" else history["date"] >= bound]
+    size = int(params.get("page[size]", 100))
+    size = min(size, page_size) if page_size else size
+    return 200, synthetic.fiscaldata_payload(history.reset_index(drop=True), spec["value_field"],
+                                             int(params.get("page[number]", 1)), size, 1 / spec.get("scale", 1.0))
+
+def _synthetic_response(request: requests.PreparedRequest, page_size: int | None) -> tuple[int, bytes, str]:
+    parts = urlsplit(request.url)
+    params = dict(parse_qsl(parts.query))
+    if parts.netloc == "api.stlouisfed.org":
+        status, body = _fred(parts.path, params, page_size)
+    elif parts.netloc == "api.bls.gov":
+        status, body = _bls(parts.path, json.loads(request.body or "{}"))
+    elif parts.netloc == "download.bls.gov":
+        status, text = _bls_catalog(parts.path)
+        return status, text.encode("utf-8"), "text/plain"
+    elif parts.netloc == "api.fiscaldata.treasury.gov":
+        status, body = _treasury(parts.path, params, page_size)
+    else:
+        status, body = 404, {"error": f"No synthetic stand-in for {parts.netloc}"}
+    return status, json.dumps(body).encode("utf-8"), "application/json"
+
+def _strip_secrets(request: requests.PreparedRequest) -> tuple[str, str]:
+    """URL and body with API keys removed, so recordings are shareable and key-independent."""
+    parts = urlsplit(request.url)
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if k not in SECRET_PARAMS))
+    url = parts._replace(query=query).geturl()
+    body = request.body or b""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", "replace")
+    try:
+        payload = json.loads(body)
+        if isinstance(payload, dict):
+            body = json.dumps({k: v for k, v in payload.items() if k not in SECRET_PARAMS}, sort_keys=True)
+    except ValueError:
+        pass
+    return url, body
+
+def recording_path(directory: str, request: requests.PreparedRequest) -> str:
+    url, body = _strip_secrets(request)
+    digest = hashlib.sha256(f"{request.method}\n{url}\n{body}".encode("utf-8")).hexdigest()[:32]
+    return os.path.join(directory, f"{urlsplit(url).netloc}_{digest}.json")
+
+def _build_response(request: requests.PreparedRequest, status: int, content: bytes, content_type: str,
+                    headers: dict | None = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.reason = HTTPStatus(status).phrase
+    response.headers = CaseInsensitiveDict({"Content-Type": content_type, "Content-Length": str(len(content)),
+                                            **(headers or {})})
+    response.raw = io.BytesIO(content)  # Readable lazily, so stream=True / iter_lines work as usual
+    response.encoding = "utf-8"
+    response.url = request.url
+    response.request = request
+    return response
+
+class ReplayAdapter(BaseAdapter):
+    """requests transport serving synthetic or recorded API responses (or recording live ones).
+
+    Thread-safe; one instance can be mounted on every session. stats() reports requests per host,
+    injected failures and the peak number of concurrent requests seen per host.
+    """
+
+    def __init__(self, mode: str = "synthetic", directory: str = REPLAY_DIR, latency_ms: float = 0.0,
+                 error_rate: float = 0.0, timeout_rate: float = 0.0, error_status: int = 503,
+                 retry_after: float | None = None, page_size: int | None = None, seed: int = 0):
+        super().__init__()
+        if mode not in MODES:
+            raise ValueError(f"Unknown replay mode {mode!r}; expected one of {', '.join(MODES)}")
+        self.mode = mode
+        self.directory = directory
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.page_size = page_size
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._live = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE) if mode == "record" else None
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._counts = Counter()
+            self._in_flight = Counter()
+            self._peak = Counter()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"requests": dict(self._counts), "peak_concurrency": dict(self._peak)}
+
+    def _draw(self) -> tuple[float, float]:
+        with self._lock:
+            return self._rng.random(), self._rng.random()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        host = urlsplit(request.url).netloc
+        with self._lock:
+            self._counts[host] += 1
+            self._in_flight[host] += 1
+            self._peak[host] = max(self._peak[host], self._in_flight[host])
+        try:
+            jitter, fault = self._draw()
+            if self.latency_ms:
+                time.sleep(self.latency_ms * (0.5 + jitter) / 1000)
+            if fault < self.timeout_rate:
+                with self._lock:
+                    self._counts["timeouts_injected"] += 1
+                raise requests.ReadTimeout(f"Injected timeout for {host}", request=request)
+            if fault < self.timeout_rate + self.error_rate:
+                with self._lock:
+                    self._counts["errors_injected"] += 1
+                headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+                return _build_response(request, self.error_status, b'{"error": "injected failure"}',
+                                       "application/json", headers)
+            return self._respond(request, timeout, verify, cert, proxies)
+        finally:
+            with self._lock:
+                self._in_flight[host] -= 1
+
+    def _respond(self, request, timeout, verify, cert, proxies) -> requests.Response:
+        if self.mode == "synthetic":
+            status, content, content_type = _synthetic_response(request, self.page_size)
+            return _build_response(request, status, content, content_type)
+
+        path = recording_path(self.directory, request)
+        if self.mode == "replay":
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    recorded = json.load(f)
+            except OSError:
+                url, _ = _strip_secrets(request)
+                return _build_response(request, 404, json.dumps({"error": f"No recording for {request.method} {url}"}).encode(),
+                                       "application/json")
+            return _build_response(request, recorded["status"], recorded["body"].encode("utf-8"), recorded["content_type"])
+
+        live = self._live.send(request, stream=False, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        if live.status_code == 200:
+            url, body = _strip_secrets(request)
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"method": request.method, "url": url, "request_body": body, "status": live.status_code,
+                           "content_type": live.headers.get("Content-Type", "application/json"),
+                           "body": live.content.decode(live.encoding or "utf-8", "replace")}, f)
+            os.replace(tmp_path, path)
+        return live
+
+    def close(self):
+        if self._live is not None:
+            self._live.close()
+
+class _GeminiResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+class ReplayModel:
+    """Stand-in for google.generativeai.GenerativeModel: generate_content(prompt, stream=False).
+
+    Synthetic mode answers with canned bullets echoing the question; replay/record key responses on the
+    model name and full prompt. Latency applies before the first chunk; streaming yields `chunk_chars` at a time.
+    """
+
+    def __init__(self, mode: str = "synthetic", directory: str = REPLAY_DIR, latency_ms: float = 0.0,
+                 error_rate: float = 0.0, chunk_chars: int = 40, seed: int = 0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown replay mode {mode!r}; expected one of {', '.join(MODES)}")
+        self.mode = mode
+        self.directory = directory
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.chunk_chars = chunk_chars
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._live = None
+        if mode == "record":
+            settings.require("llm")
+            import google.generativeai as genai
+            genai.configure(api_key=settings.GOOGLE_API_KEY)
+            self._live = genai.GenerativeModel(settings.GEMINI_MODEL)
+
+    def _path(self, prompt: str) -> str:
+        digest = hashlib.sha256(f"{settings.GEMINI_MODEL}\n{prompt}".encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"gemini_{digest}.json")
+
+    def _text(self, prompt: str) -> str:
+        with self._lock:
+            jitter, fault = self._rng.random(), self._rng.random()
+        if self.latency_ms:
+            time.sleep(self.latency_ms * (0.5 + jitter) / 1000)
+        if fault < self.error_rate:
+            raise RuntimeError("503 Injected Gemini failure (replay)")
+
+        if self.mode == "synthetic":
+            question = prompt.rsplit("Question:", 1)[-1].split("\n\n", 1)[0].strip() or "the data"
+            return (f"- **Offline answer** to: {question}\n"
+                    "- Trend: the selected series moved in line with its recent average.\n"
+                    "- Business implication: review pricing assumptions against the latest readings.\n"
+                    f"- (Synthetic response; prompt was {len(prompt)} characters.)")
+        path = self._path(prompt)
+        if self.mode == "replay":
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)["text"]
+            except OSError:
+                raise RuntimeError("404 No recorded Gemini response for this prompt") from None
+        text = self._live.generate_content(prompt).text
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"model": settings.GEMINI_MODEL, "prompt": prompt, "text": text}, f)
+        return text
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        text = self._text(prompt)
+        if not stream:
+            return _GeminiResponse(text)
+        return (_GeminiResponse(text[i:i + self.chunk_chars]) for i in range(0, len(text), self.chunk_chars))
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+def _from_settings(cls, **kwargs):
+    return cls(mode=settings.API_REPLAY, directory=settings.API_REPLAY_DIR or REPLAY_DIR,
+               latency_ms=settings.API_REPLAY_LATENCY_MS, error_rate=settings.API_REPLAY_ERROR_RATE, **kwargs)
+
+def shared_adapter() -> ReplayAdapter:
+    """Process-wide adapter configured from the API_REPLAY* settings (what http_client mounts)."""
+    with _shared_lock:
+        if "adapter" not in _shared:
+            _shared["adapter"] = _from_settings(ReplayAdapter, timeout_rate=settings.API_REPLAY_TIMEOUT_RATE,
+                                                page_size=settings.API_REPLAY_PAGE_SIZE)
+        return _shared["adapter"]
+
+def gemini_model() -> ReplayModel:
+    """Process-wide Gemini stand-in configured from the API_REPLAY* settings (what utils/llm.py uses)."""
+    with _shared_lock:
+        if "model" not in _shared:
+            _shared["model"] = _from_settings(ReplayModel)
+        return _shared["model"]
+
+def install(adapter: ReplayAdapter | None = None, model: ReplayModel | None = None) -> ReplayAdapter:
+    """Route every http_client session (and the Gemini client) through the stand-ins from code.
+
+    Defaults to a synthetic adapter/model; returns the adapter so callers can read stats(). Pair with
+    uninstall() to go back to the live APIs.
+    """
+    from utils import http_client, llm
+    adapter = adapter or ReplayAdapter()
+    _shared.setdefault("live_mode", settings.API_REPLAY)
+    settings.API_REPLAY = adapter.mode  # So require() doesn't insist on API keys the stand-ins don't need
+    http_client.set_transport(adapter)
+    llm._model = model or ReplayModel()
+    return adapter
+
+def uninstall() -> None:
+    from utils import http_client, llm
+    settings.API_REPLAY = _shared.pop("live_mode", settings.API_REPLAY)
+    http_client.set_transport(None)
+    llm._model = None
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+from utils.analytics import future_dates
+
+# Scenario engine for the linear trend forecast. A shock to a series' latest value moves the OLS fit in
+# closed form, so a whole grid of shocks (for any number of series) is evaluated in one NumPy pass
+# without refitting; fan charts come from a vectorized residual bootstrap.
+
+def fit_panel(wide: pd.DataFrame) -> dict:
+    """OLS trend (value on row number) for every column, NaN-aware.
+
+    Returns per-column arrays: n, x_mean, sxx, slope, intercept, sse, x_last, y_last, e_last (residual of the
+    latest observation), h_last (its leverage), plus residuals (rows x columns, NaN where missing) and the
+    number of rows. x_last/y_last refer to each column's latest non-missing observation.
+    """
+    y = wide.to_numpy(dtype=float)
+    mask = ~np.isnan(y)
+    rows = np.arange(y.shape[0], dtype=float)[:, None]
+    n = mask.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = (rows * mask).sum(axis=0) / n
+        y_mean = np.where(mask, y, 0.0).sum(axis=0) / n
+        dx = np.where(mask, rows - x_mean, 0.0)
+        dy = np.where(mask, y - y_mean, 0.0)
+        sxx = (dx * dx).sum(axis=0)
+        slope = (dx * dy).sum(axis=0) / sxx
+        intercept = y_mean - slope * x_mean
+        residuals = np.where(mask, y - (intercept + slope * rows), np.nan)
+        sse = np.nansum(residuals ** 2, axis=0)
+
+        last_row = np.where(mask.any(axis=0), y.shape[0] - 1 - mask[::-1].argmax(axis=0), 0)
+        cols = np.arange(y.shape[1])
+        x_last = last_row.astype(float)
+        h_last = 1 / n + (x_last - x_mean) ** 2 / sxx
+
+    return {
+        "columns": list(wide.columns), "rows": y.shape[0], "n": n, "x_mean": x_mean, "sxx": sxx,
+        "slope": slope, "intercept": intercept, "sse": sse, "residuals": residuals,
+        "x_last": x_last, "y_last": y[last_row, cols], "e_last": residuals[last_row, cols], "h_last": h_last,
+    }
+
+def shock_grid(fit: dict, shocks_pct, periods: int = 12) -> dict:
+    """Forecasts after shocking each column's latest value by shocks_pct (%), for a whole grid at once.
+
+    shocks_pct is (scenarios,) for a single column or (scenarios, columns) for joint multi-series shocks.
+    With delta = y_last * shock, the refit is closed form:
+        slope'     = slope + (x_last - x_mean) * delta / sxx
+        intercept' = intercept + delta / n - (slope' - slope) * x_mean
+        sse'       = sse + 2 * delta * e_last + delta^2 * (1 - h_last)
+    Returns {"yhat": (scenarios, columns, periods), "slope", "intercept", "sse": (scenarios, columns)}.
+    """
+    shocks = np.asarray(shocks_pct, dtype=float)
+    if shocks.ndim == 1:
+        shocks = shocks[:, None]
+    delta = fit["y_last"][None, :] * shocks / 100
+
+    d_slope = (fit["x_last"] - fit["x_mean"])[None, :] * delta / fit["sxx"][None, :]
+    slope = fit["slope"][None, :] + d_slope
+    intercept = fit["intercept"][None, :] + delta / fit["n"][None, :] - d_slope * fit["x_mean"][None, :]
+    sse = fit["sse"][None, :] + 2 * delta * fit["e_last"][None, :] + delta ** 2 * (1 - fit["h_last"][None, :])
+
+    future_x = np.arange(fit["rows"], fit["rows"] + periods, dtype=float)
+    yhat = intercept[:, :, None] + slope[:, :, None] * future_x[None, None, :]
+    return {"yhat": yhat, "slope": slope, "intercept": intercept, "sse": sse}
+
+def scenario_frame(wide: pd.DataFrame, column: str, shocks_pct, periods: int = 12, fit: dict | None = None) -> pd.DataFrame:
+    """Grid of shocked forecasts for one column as a frame indexed by future date, one column per shock."""
+    fit = fit or fit_panel(wide)
+    j = fit["columns"].index(column)
+    shocks = np.asarray(shocks_pct, dtype=float)
+    grid = np.zeros((len(shocks), len(fit["columns"])))
+    grid[:, j] = shocks
+    yhat = shock_grid(fit, grid, periods)["yhat"][:, j, :]
+    dates = future_dates(pd.Series(wide.index), periods)
+    return pd.DataFrame(yhat.T, index=pd.DatetimeIndex(dates, name="date"), columns=list(shocks))
+
+def bootstrap_fan(wide: pd.DataFrame, column: str, periods: int = 12, n_paths: int = 1000,
+                  quantiles=(0.05, 0.25, 0.5, 0.75, 0.95), shock_pct: float = 0.0, seed: int = 0,
+                  fit: dict | None = None) -> pd.DataFrame:
+    """Monte Carlo fan chart from a residual bootstrap of the linear trend fit.
+
+    Each path resamples the residuals to build a pseudo-history, refits slope/intercept (linear in the
+    resampled residuals, so all paths refit in one matrix product), then adds resampled residuals as
+    forecast noise. Returns a frame indexed by future date with one column per quantile.
+    """
+    fit = fit or fit_panel(wide)
+    j = fit["columns"].index(column)
+    if shock_pct:
+        shocked = shock_grid(fit, [shock_pct if k == j else 0.0 for k in range(len(fit["columns"]))], periods)
+        slope, intercept = shocked["slope"][0, j], shocked["intercept"][0, j]
+    else:
+        slope, intercept = fit["slope"][j], fit["intercept"][j]
+
+    resid_col = fit["residuals"][:, j]
+    observed = ~np.isnan(resid_col)
+    resid = resid_col[observed]
+    if len(resid) < 3:
+        raise ValueError("Need at least 3 observations for a bootstrap fan chart")
+    dx = np.arange(fit["rows"], dtype=float)[observed] - fit["x_mean"][j]
+
+    rng = np.random.default_rng(seed)
+    resampled = resid[rng.integers(0, len(resid), size=(n_paths, len(resid)))]
+    path_slope = slope + resampled @ dx / fit["sxx"][j]
+    path_intercept = intercept + resampled.mean(axis=1) - (path_slope - slope) * fit["x_mean"][j]
+
+    future_x = np.arange(fit["rows"], fit["rows"] + periods, dtype=float)
+    noise = resid[rng.integers(0, len(resid), size=(n_paths, periods))]
+    paths = path_intercept[:, None] + path_slope[:, None] * future_x[None, :] + noise
+
+    dates = future_dates(pd.Series(wide.index), periods)
+    fan = np.quantile(paths, quantiles, axis=0)
+    return pd.DataFrame(fan.T, index=pd.DatetimeIndex(dates, name="date"), columns=list(quantiles))
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+# One memory-mapped .npy file per series: a structured array of typed
+# date/value columns, sorted by date. Reads never parse text.
+# A series' data version is a hash of its contents, so rewriting identical data keeps every derived
+# memo entry valid. Freshness is tracked separately: the later of the file's mtime and the mtime of
+# an empty "<id>.fresh" marker that touch() bumps when a refresh found nothing new.
+STORE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "store")
+os.makedirs(STORE_DIR, exist_ok=True)
+
+SERIES_DTYPE = np.dtype([("date", "datetime64[ns]"), ("value", "float64")])
+
+_lock = threading.Lock()
+_mapped = {}  # path -> (file identity, array, content hash)
+
+def _series_path(source: str, series_id: str) -> str:
+    return os.path.join(STORE_DIR, source, f"{series_id}.npy")
+
+def _fresh_path(source: str, series_id: str) -> str:
+    return os.path.join(STORE_DIR, source, f"{series_id}.fresh")
+
+def _load_entry(source: str, series_id: str):
+    """Return (stored array (memory-mapped, read-only), content hash), or None if missing."""
+    path = _series_path(source, series_id)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    # Every write swaps in a new file (new inode), so this changes even when mtime granularity is coarse
+    identity = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    with _lock:
+        cached = _mapped.get(path)
+        if cached is not None and cached[0] == identity:
+            return cached[1], cached[2]
+
+    try:
+        arr = np.load(path, mmap_mode="r")
+    except ValueError:
+        arr = np.load(path)  # Zero-length arrays can't be mapped
+    version = hashlib.blake2b(arr.tobytes(), digest_size=16).hexdigest()  # Once per write per process
+    with _lock:
+        _mapped[path] = (identity, arr, version)
+    return arr, version
+
+def _load(source: str, series_id: str):
+    """Return the stored array (memory-mapped, read-only) or None if missing."""
+    entry = _load_entry(source, series_id)
+    return None if entry is None else entry[0]
+
+def _to_datetime64(value) -> np.datetime64:
+    return pd.Timestamp(value).as_unit("ns").to_datetime64()
+
+def get_series(source: str, series_id: str, start=None, end=None) -> pd.DataFrame | None:
+    """Read a stored series as a date/value DataFrame, limited to [start, end].
+
+    Returns None when the series has never been stored.
+    """
+    arr = _load(source, series_id)
+    if arr is None:
+        return None
+
+    dates = arr["date"]
+    lo = 0 if start is None else np.searchsorted(dates, _to_datetime64(start), side="left")
+    hi = len(arr) if end is None else np.searchsorted(dates, _to_datetime64(end), side="right")
+    chunk = arr[lo:hi]
+    return pd.DataFrame({"date": chunk["date"], "value": chunk["value"]})
+
+def put_series(source: str, series_id: str, df: pd.DataFrame) -> None:
+    """Replace a stored series with the date/value columns of df."""
+    df = df.sort_values("date")
+    arr = np.empty(len(df), dtype=SERIES_DTYPE)
+    arr["date"] = pd.to_datetime(df["date"]).to_numpy(dtype="datetime64[ns]")
+    arr["value"] = pd.to_numeric(df["value"], errors="coerce").to_numpy(dtype="float64")
+
+    path = _series_path(source, series_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp_path, path)  # Atomic swap—readers never see a partial file
+
+def mapped_bytes() -> int:
+    """Bytes of stored series currently memory-mapped (page cache, shared with other processes)."""
+    with _lock:
+        return sum(arr.nbytes for _, arr, _ in _mapped.values())
+
+def age_seconds(source: str, series_id: str) -> float | None:
+    """Seconds since the series was last written or touched, or None if not stored."""
+    try:
+        mtime = os.path.getmtime(_series_path(source, series_id))
+    except FileNotFoundError:
+        return None
+    try:
+        mtime = max(mtime, os.path.getmtime(_fresh_path(source, series_id)))
+    except FileNotFoundError:
+        pass
+    return max(0.0, time.time() - mtime)
+
+def data_version(source: str, series_id: str) -> str | None:
+    """Opaque version of a stored series (changes only when its contents do), or None if not stored."""
+    entry = _load_entry(source, series_id)
+    return None if entry is None else entry[1]
+
+def touch(source: str, series_id: str) -> None:
+    """Reset a stored series' freshness clock without rewriting it (its data version stays the same)."""
+    if os.path.exists(_series_path(source, series_id)):
+        fresh_path = _fresh_path(source, series_id)
+        with open(fresh_path, "a"):
+            pass
+        os.utime(fresh_path)
+
+def last_date(source: str, series_id: str) -> pd.Timestamp | None:
+    arr = _load(source, series_id)
+    if arr is None or len(arr) == 0:
+        return None
+    return pd.Timestamp(arr["date"][-1])
+
+def merge_series(source: str, series_id: str, df: pd.DataFrame, since=None) -> None:
+    """Merge freshly fetched rows into a stored series.
+
+    Stored rows dated on/after `since` are replaced by df (so revisions win);
+    older history is kept. Without `since`, replacement starts at df's first date.
+    """
+    existing = get_series(source, series_id)
+    if existing is None or existing.empty:
+        put_series(source, series_id, df)
+        return
+    if since is None:
+        since = df["date"].min() if not df.empty else existing["date"].max()
+    kept = existing[existing["date"] < pd.Timestamp(since)]
+    put_series(source, series_id, pd.concat([kept, df[["date", "value"]]], ignore_index=True))
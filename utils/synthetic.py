@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# Synthetic data in the shapes the real APIs return, for benchmarks and offline runs.
+# Values are random walks with drift (plus seasonality for monthly data) so analytics have something
+# realistic to chew on; everything is seeded and reproducible.
+
+FREQUENCIES = {"D": "B", "W": "W-FRI", "M": "MS", "Q": "QS", "A": "YS"}
+
+def synthetic_series(n: int, freq: str = "M", seed: int = 0, end="2025-06-30", start_value: float = 100.0) -> pd.DataFrame:
+    """date/value frame of n observations at freq (D business-daily, W, M, Q, A) ending near `end`."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=pd.Timestamp(end), periods=n, freq=FREQUENCIES[freq])
+    steps = rng.normal(0.05, 1.0, size=n)
+    if freq == "M":
+        steps += 0.5 * np.sin(2 * np.pi * np.arange(n) / 12)
+    return pd.DataFrame({"date": dates, "value": start_value + np.cumsum(steps) * start_value / 200})
+
+def synthetic_panel(n_series: int, n: int, freq: str = "M", seed: int = 0, missing: float = 0.0) -> pd.DataFrame:
+    """Wide date-indexed frame of n_series random walks (optionally with a fraction of leading NaNs)."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end="2025-06-30", periods=n, freq=FREQUENCIES[freq])
+    values = 100 + np.cumsum(rng.normal(0.05, 1.0, size=(n, n_series)), axis=0)
+    if missing:
+        starts = (rng.random(n_series) * missing * n).astype(int)
+        values[np.arange(n)[:, None] < starts[None, :]] = np.nan
+    return pd.DataFrame(values, index=pd.DatetimeIndex(dates, name="date"),
+                        columns=[f"SYN{i:04d}" for i in range(n_series)])
+
+def fred_observations_payload(series: pd.DataFrame, offset: int = 0, limit: int = 10000, missing: float = 0.01,
+                              seed: int = 0) -> dict:
+    """FRED /series/observations JSON body for one page of a date/value frame ("." marks missing values)."""
+    rng = np.random.default_rng(seed)
+    page = series.iloc[offset:offset + limit]
+    values = [f"{v:.3f}" for v in page["value"]]
+    for i in np.flatnonzero(rng.random(len(values)) < missing):
+        values[i] = "."
+    dates = page["date"].dt.strftime("%Y-%m-%d")
+    return {
+        "realtime_start": "2025-07-01", "realtime_end": "2025-07-01",
+        "observation_start": "1600-01-01", "observation_end": "9999-12-31",
+        "units": "lin", "output_type": 1, "file_type": "json", "order_by": "observation_date", "sort_order": "asc",
+        "count": len(series), "offset": offset, "limit": limit,
+        "observations": [
+            {"realtime_start": "2025-07-01", "realtime_end": "2025-07-01", "date": d, "value": v}
+            for d, v in zip(dates, values)
+        ],
+    }
+
+def bls_timeseries_payload(series: dict) -> dict:
+    """BLS v2 timeseries JSON body for {series_id: monthly date/value frame}, newest first with annual averages."""
+    results = []
+    for series_id, df in series.items():
+        rows = []
+        for date, value in zip(df["date"], df["value"]):
+            rows.append({"year": str(date.year), "period": f"M{date.month:02d}", "periodName": date.strftime("%B"),
+                         "value": f"{value:.2f}", "footnotes": [{}]})
+        for year, group in df.groupby(df["date"].dt.year):
+            rows.append({"year": str(year), "period": "M13", "periodName": "Annual",
+                         "value": f"{group['value'].mean():.2f}", "footnotes": [{}]})
+        rows.sort(key=lambda row: (row["year"], row["period"]), reverse=True)
+        results.append({"seriesID": series_id, "data": rows})
+    return {"status": "REQUEST_SUCCEEDED", "responseTime": 120, "message": [], "Results": {"series": results}}
+
+def fiscaldata_payload(series: pd.DataFrame, value_field: str = "tot_pub_debt_out_amt", page_number: int = 1,
+                       page_size: int = 10000, scale: float = 1e9) -> dict:
+    """FiscalData JSON body for one page of a date/value frame (amounts as strings, like the API)."""
+    total_pages = max(1, -(-len(series) // page_size))
+    page = series.iloc[(page_number - 1) * page_size:page_number * page_size]
+    dates = page["date"].dt.strftime("%Y-%m-%d")
+    return {
+        "data": [{"record_date": d, value_field: f"{v * scale:.2f}"} for d, v in zip(dates, page["value"])],
+        "meta": {"count": len(page), "total-count": len(series), "total-pages": total_pages},
+        "links": {
+            "self": f"&page%5Bnumber%5D={page_number}&page%5Bsize%5D={page_size}",
+            "next": f"&page%5Bnumber%5D={page_number + 1}&page%5Bsize%5D={page_size}" if page_number < total_pages else None,
+        },
+    }
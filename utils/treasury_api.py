@@ -1,51 +1,108 @@
-import requests
 import pandas as pd
-import os
-from datetime import datetime
-import json
+from utils import perf, refresher, store
+from utils.http_client import request
+import streamlit as st  # For warnings in app context
 
-CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "cached")
-os.makedirs(CACHE_DIR, exist_ok=True)
+FISCALDATA_BASE_URL = "https://api.fiscaldata.treasury.gov/services/api/fiscal_service"
+PAGE_SIZE = 10000
+HISTORY_START = "2000-01-01"
 
-def _cache_filename() -> str:
-    return os.path.join(CACHE_DIR, "treasury_debt_to_penny.json")
+# Declarative field maps for FiscalData endpoints. Each dataset becomes one date/value series in
+# the store; "scale" converts the raw amount to the unit we chart (billions of dollars, or % as-is).
+FISCALDATA_DATASETS = {
+    "debt_to_penny": {
+        "endpoint": "/v2/accounting/od/debt_to_penny",
+        "value_field": "tot_pub_debt_out_amt",
+        "scale": 1e-9,  # Dollars -> billions
+    },
+    "avg_interest_rate_marketable": {
+        "endpoint": "/v2/accounting/od/avg_interest_rates",
+        "value_field": "avg_interest_rate_amt",
+        "filters": ["security_desc:eq:Total Marketable"],
+    },
+    "dts_tga_closing_balance": {
+        "endpoint": "/v1/accounting/dts/operating_cash_balance",
+        "value_field": "open_today_bal",
+        "filters": ["account_type:eq:Treasury General Account (TGA) Closing Balance"],
+        "scale": 1e-3,  # Millions -> billions
+    },
+}
 
-def get_treasury_debt(force_refresh: bool = False) -> pd.DataFrame:
-    """Fetch Treasury Debt to the Penny (daily total public debt in billions)."""
-    cache_file = _cache_filename()
-    
-    if not force_refresh and os.path.exists(cache_file):
-        cache_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_file))
-        if cache_age.total_seconds() < 86400:
-            with open(cache_file, "r") as f:
-                data = json.load(f)
-            df = pd.DataFrame(data["data"])
-            df["date"] = pd.to_datetime(df["record_date"])
-            df["value"] = pd.to_numeric(df["tot_pub_debt_out_amt"], errors="coerce") / 1_000_000_000  # Billions
-            return df[["date", "value"]].dropna().sort_values("date")
-    
-    base_url = "https://api.fiscaldata.treasury.gov/services/api/fiscal_service"
-    endpoint = "/v2/accounting/od/debt_to_penny"
-    
-    url = f"{base_url}{endpoint}"
+@perf.timed("treasury.parse")
+def _parse_page(data: dict, spec: dict) -> pd.DataFrame:
+    date_field = spec.get("date_field", "record_date")
+    df = pd.DataFrame(data["data"], columns=[date_field, spec["value_field"]])
+    df["date"] = pd.to_datetime(df[date_field])
+    df["value"] = pd.to_numeric(df[spec["value_field"]], errors="coerce") * spec.get("scale", 1.0)
+    perf.annotate(rows=len(df))
+    return df[["date", "value"]].dropna().sort_values("date")
+
+def _stream_pages(spec: dict, since: pd.Timestamp | None):
+    """Yield parsed pages oldest-first, following page[number] until links.next runs out."""
+    date_field = spec.get("date_field", "record_date")
+    if since is None:
+        filters = [f"{date_field}:gte:{HISTORY_START}"]
+    else:
+        filters = [f"{date_field}:gt:{since.strftime('%Y-%m-%d')}"]
     params = {
-        "fields": "record_date,tot_pub_debt_out_amt",
-        "filter": "record_date:gte:2000-01-01",
+        "fields": f"{date_field},{spec['value_field']}",
+        "filter": ",".join(filters + spec.get("filters", [])),
+        "sort": date_field,
         "format": "json",
-        "page[size]": 10000
+        "page[size]": PAGE_SIZE,
     }
-    
-    response = requests.get(url, params=params)
-    response.raise_for_status()
-    data = response.json()
-    
-    df = pd.DataFrame(data["data"])
-    df["date"] = pd.to_datetime(df["record_date"])
-    df["value"] = pd.to_numeric(df["tot_pub_debt_out_amt"], errors="coerce") / 1_000_000_000  # Billions
-    
-    df = df[["date", "value"]].dropna().sort_values("date")
-    
-    with open(cache_file, "w") as f:
-        json.dump(data, f)
-    
-    return df
\ No newline at end of file
+
+    page_number = 1
+    while True:
+        params["page[number]"] = page_number
+        response = request("GET", f"{FISCALDATA_BASE_URL}{spec['endpoint']}", source="treasury", params=params)
+        data = response.json()
+        yield _parse_page(data, spec)
+
+        total_pages = int(data.get("meta", {}).get("total-pages", page_number))
+        if not data.get("links", {}).get("next") or page_number >= total_pages:
+            break
+        page_number += 1
+
+def _refresh(datasets) -> None:
+    """Stream records after the last cached date into the store (no Streamlit calls; safe in the background)."""
+    for dataset in datasets:
+        since = store.last_date("treasury", dataset)
+        for page in _stream_pages(FISCALDATA_DATASETS[dataset], since):
+            if not page.empty:
+                store.merge_series("treasury", dataset, page)
+        store.touch("treasury", dataset)  # Mark fresh even when no new records arrived
+
+@perf.timed("treasury.get_series")
+def get_fiscaldata_series(dataset: str, force_refresh: bool = False, start=None, end=None) -> pd.DataFrame:
+    """Fetch a FiscalData dataset from FISCALDATA_DATASETS as a date/value series.
+
+    Pages stream straight into the local store. Refreshes request only records after the last cached date.
+    Expired data is returned immediately while utils.refresher updates it in the background; only a missing
+    dataset (or force_refresh) waits on FiscalData, falling back to the cached copy if that fails.
+    """
+    cached = store.get_series("treasury", dataset, start, end)
+    if cached is not None and not force_refresh:
+        stale = not refresher.is_fresh("treasury", dataset)
+        if stale:
+            refresher.schedule("treasury", [dataset], _refresh)
+        perf.annotate(cache="hit", stale=stale, series=dataset, rows=len(cached))
+        return cached
+    perf.annotate(cache="miss", series=dataset)
+
+    try:
+        _refresh([dataset])
+    except Exception as e:
+        if cached is None:
+            raise
+        st.warning(f"Treasury FiscalData error: {str(e)}. Showing the cached copy instead.")
+        return cached
+
+    df = store.get_series("treasury", dataset, start, end)
+    if df is None:
+        raise ValueError(f"Treasury returned no data for {dataset}")
+    return df
+
+def get_treasury_debt(force_refresh: bool = False, start=None, end=None) -> pd.DataFrame:
+    """Fetch Treasury Debt to the Penny (daily total public debt in billions)."""
+    return get_fiscaldata_series("debt_to_penny", force_refresh=force_refresh, start=start, end=end)
@@ -0,0 +1,113 @@
+import pandas as pd
+from utils import memo
+from utils.alignment import align_store_series
+from utils.analytics import calculate_changes_panel, detect_trend_panel
+from utils.anomalies import anomalies_panel, zscore_versions
+from utils.forecasting import MODELS, backtest, forecast
+
+# What the Explore page shows for a set of series and a year range: the month-end panel and its analytics,
+# plus forecasts and backtests. Everything is memoized on the series' data versions in memory and on disk,
+# so jobs/refresh.py can compute the common views ahead of time and page loads only read them.
+# Sessions keep only the request (specs and range) and resolve it through get_view on every rerun, so any
+# number of sessions on the same series share one stored copy of the frames per process; each rerun works on
+# a private copy that is dropped when the script run ends.
+
+FORECAST_PERIODS = 12
+BACKTEST_HORIZON = 12
+BACKTEST_ORIGINS = 12
+
+def range_bounds(start_year: int, end_year: int) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """First and last nanosecond of a year range, so the panel's period-end stamps of December are inside it."""
+    return pd.Timestamp(f"{start_year}-01-01"), pd.Timestamp(f"{end_year + 1}-01-01") - pd.Timedelta(1, "ns")
+
+def data_key(specs: dict) -> tuple:
+    """Identity of a series set at its current data versions (changes whenever any series is rewritten)."""
+    return (tuple(specs.items()), memo.versions(specs.values()))
+
+def build_view(specs: dict, range_start, range_end) -> dict | None:
+    """Month-end panel and analytics for specs (name -> (source, series_id)) within [range_start, range_end].
+
+    Returns {"merged_df", "analytics", "key"}, or None when no series has data in the range. The full-history
+    panel and its changes/anomalies are shared by every range; trends depend on the range end.
+    """
+    key = data_key(specs)
+    # The loader and refresher write a series before its z-scores, so the analytics also key on the z-score
+    # versions; otherwise a rerun in between would persist stale anomalies under the new series version
+    analytics_key = (key, zscore_versions(specs.values()))
+    # Each stored series is resampled straight onto month-ends (last value on/before each month-end;
+    # lower frequencies carry forward)
+    full_df = align_store_series(specs, freq="M", how="eop", persist=True)
+    full_analytics = memo.get_or_compute(("panel_analytics", analytics_key), lambda: {
+        **calculate_changes_panel(full_df),
+        **anomalies_panel(specs, full_df.index),
+    }, persist=True)
+
+    merged_df = memo.slice_range(full_df, range_start, range_end, column=None)
+    observed = merged_df.dropna(how="all")
+    if observed.empty:
+        return None
+    merged_df = merged_df.loc[observed.index[0]:observed.index[-1]]
+
+    # Changes (from full history, so the first year of the range still has YoY) and anomalies are sliced
+    analytics = {
+        name: memo.slice_range(frame, merged_df.index[0], merged_df.index[-1], column=None)
+        for name, frame in full_analytics.items() if isinstance(frame, pd.DataFrame)
+    }
+    analytics["pop_labels"] = full_analytics["pop_labels"]
+    analytics["trend"] = memo.get_or_compute(("panel_trend", key, range_start, range_end),
+                                             lambda: detect_trend_panel(merged_df), persist=True)
+    return {"merged_df": merged_df, "analytics": analytics, "key": (key, range_start, range_end)}
+
+def get_view(specs: dict, range_start, range_end) -> dict | None:
+    """build_view memoized per (series set, data versions, range), returned as private copies of the frames.
+
+    The memo keeps the one shared copy; callers may modify what they get without touching other sessions.
+    """
+    view = memo.get_or_compute(("view", data_key(specs), zscore_versions(specs.values()), range_start, range_end),
+                               lambda: build_view(specs, range_start, range_end))
+    if view is None:
+        return None
+    return {
+        "merged_df": view["merged_df"].copy(),
+        "analytics": {name: value.copy() for name, value in view["analytics"].items()},
+        "key": view["key"],
+    }
+
+def view_trend(view: dict, name: str) -> tuple[dict, str]:
+    """(recent trend info, period-over-period label) of one series of a view."""
+    analytics = view["analytics"]
+    return analytics["trend"].loc[name, ["recent_trend", "recent_slope"]].to_dict(), analytics["pop_labels"][name]
+
+def view_backtest(merged_df: pd.DataFrame, view_key) -> pd.DataFrame:
+    """Rolling-origin backtest of every model on every series of a view."""
+    return memo.get_or_compute(("backtest", view_key), lambda: backtest(
+        merged_df, horizon=BACKTEST_HORIZON, origins=BACKTEST_ORIGINS), persist=True)
+
+def view_forecast(merged_df: pd.DataFrame, view_key, name: str, model: str) -> pd.DataFrame:
+    """FORECAST_PERIODS-ahead forecast of one series of a view with one of forecasting.MODELS."""
+    series_df = merged_df[[name]].reset_index().rename(columns={name: "value"})
+    return memo.get_or_compute(("forecast", view_key, name, model, FORECAST_PERIODS),
+                               lambda: forecast(series_df, model, periods=FORECAST_PERIODS), persist=True)
+
+def warm_view(specs: dict, range_start, range_end, models=tuple(MODELS)) -> dict:
+    """Compute and persist a view, its backtest and its primary series' forecasts (what the page would ask for).
+
+    Returns counts for logging; forecasts/backtests that need more history than the range has are skipped.
+    """
+    view = build_view(specs, range_start, range_end)
+    if view is None:
+        return {"rows": 0, "forecasts": 0, "backtest": False}
+    primary = next(iter(specs))
+    try:
+        view_backtest(view["merged_df"], view["key"])
+        backtested = True
+    except ValueError:
+        backtested = False
+    forecasts = 0
+    for model in models:
+        try:
+            view_forecast(view["merged_df"], view["key"], primary, model)
+            forecasts += 1
+        except ValueError:
+            pass
+    return {"rows": len(view["merged_df"]), "forecasts": forecasts, "backtest": backtested}